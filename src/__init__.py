@@ -1,25 +1,36 @@
 # src/__init__.py
 
-from .analysis import arburg_vector, arburg_matrix
-from .synthesis import gen_ts
-from .utils import freqz, arcoeff_to_cep, cep_to_arcoeff
-from .plot import real_time_plot
-from .stock_simulation import fetch_stock_price
-from .convert_to_excel import save_to_excel
-from .gui import CreateGUI
+import importlib
 
 __version__ = '0.1.0'
 __author__ = 'Your Name'
 
-__all__ = [
-    'arburg_vector',
-    'arburg_matrix',
-    'gen_ts',
-    'freqz',
-    'arcoeff_to_cep',
-    'cep_to_arcoeff',
-    'real_time_plot',
-    'fetch_stock_price',
-    'save_to_excel',
-    'CreateGUI',
-]
+# Public name -> submodule defining it. Submodules are imported on first
+# access, so using the analysis functions never loads the GUI stack,
+# pandas or the simulator.
+_EXPORTS = {
+    'arburg_vector': 'analysis',
+    'arburg_matrix': 'analysis',
+    'gen_ts': 'synthesis',
+    'freqz': 'utils',
+    'arcoeff_to_cep': 'utils',
+    'cep_to_arcoeff': 'utils',
+    'real_time_plot': 'plot',
+    'fetch_stock_price': 'stock_simulation',
+    'save_to_excel': 'convert_to_excel',
+    'CreateGUI': 'gui',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
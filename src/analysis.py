@@ -1,13 +1,64 @@
 import numpy as np
+try:
+    from . import kernels
+except ImportError:  # Run as a flat module from src/
+    import kernels
 
 # --------------------------------------------------------------
 # LPC (Linear Predictive Coding) Analysis Functions
 # --------------------------------------------------------------
 
+def ref_to_arcoeff(ref):
+    """
+    Converts reflection coefficients to LPC coefficients (Levinson step-up).
+
+    Since Burg is order-recursive, ref[:p] of an order-P fit gives the order-p model.
+
+    Parameters:
+        ref (numpy.ndarray): Reflection coefficients. Shape: (order,) or (order, obs).
+
+    Returns:
+        numpy.ndarray: LPC coefficients without the leading 1, same shape as ref.
+    """
+    ref = np.asarray(ref)
+    a = np.zeros((ref.shape[0] + 1,) + ref.shape[1:], dtype=ref.dtype)
+    a[0] = 1
+    for m in range(ref.shape[0]):
+        a[1:m + 2] = a[1:m + 2] + ref[m] * np.conj(a[m::-1])
+    return a[1:]
+
+
+def ref_to_arcoeff_ladder(ref):
+    """
+    LPC coefficients of every order 1..P from one set of reflection coefficients.
+
+    Row p - 1 holds the order-p model, zero-padded to length P; these are
+    the intermediate results of the Levinson step-up in ref_to_arcoeff.
+
+    Parameters:
+        ref (numpy.ndarray): Reflection coefficients. Shape: (P,).
+
+    Returns:
+        numpy.ndarray: Lower-triangular coefficient matrix. Shape: (P, P).
+    """
+    ref = np.asarray(ref)
+    order = ref.shape[0]
+    ladder = np.zeros((order, order), dtype=ref.dtype)
+    a = np.zeros(order + 1, dtype=ref.dtype)
+    a[0] = 1
+    for m in range(order):
+        a[1:m + 2] = a[1:m + 2] + ref[m] * np.conj(a[m::-1])
+        ladder[m, :m + 1] = a[1:m + 2]
+    return ladder
+
+
 def arburg_vector(x, order=1):
     """
     Calculates LPC coefficients from time series data.
 
+    Real-valued input runs through the compiled kernel when numba is
+    available (see kernels.set_backend).
+
     Parameters:
         x (numpy.ndarray): Vector of time series data.
         order (int): LPC order. Must be > 0.
@@ -21,6 +72,10 @@ def arburg_vector(x, order=1):
     if order <= 0:
         raise ValueError("Order must be > 0")
 
+    burg = kernels.kernel("burg")
+    if burg is not None and not np.iscomplexobj(x):
+        return burg(np.ascontiguousarray(x, dtype=np.float64), order)
+
     # Initialization
     efp = x[1:]
     ebp = x[:-1]
@@ -78,11 +133,12 @@ def arburg_matrix(X, order=1):
     a[0, :] = 1
     ref = np.zeros((order, obs))
 
+    epsilon = 1e-10  # Small constant to avoid division by zero
+
     for m in range(order):
         # Calculate reflection coefficients
-        k = (-2 * np.einsum('ij,ij->j', ebp, efp)) / (
-            np.einsum('ij,ij->j', efp, efp) + np.einsum('ij,ij->j', ebp, ebp)
-        )
+        denominator = np.einsum('ij,ij->j', efp, efp) + np.einsum('ij,ij->j', ebp, ebp)
+        k = np.where(denominator != 0, (-2 * np.einsum('ij,ij->j', ebp, efp)) / (denominator + epsilon), 0)
         ref[m, :] = k
 
         # Update forward and backward prediction errors
@@ -102,14 +158,124 @@ def arburg_matrix(X, order=1):
     return a[1:, :], E, ref
 
 
+def arburg_batch(X, order=1, lengths=None, dtype=np.float64, chunk_size=1024):
+    """
+    Calculates LPC coefficients for a large batch of time series of possibly different lengths.
+
+    Every series occupies the last lengths[j] rows of its column, so series
+    of different lengths are aligned on their most recent sample. Columns
+    are processed chunk_size at a time with preallocated prediction-error
+    buffers that are updated in place, which bounds working memory to a
+    few (n, chunk_size) arrays regardless of the number of series.
+
+    Parameters:
+        X (numpy.ndarray or list): Matrix of time series data. Shape: (n, obs).
+            A list of 1-D series of different lengths is also accepted.
+        order (int): LPC order. Must be > 0.
+        lengths (numpy.ndarray): Number of valid samples in each column. Defaults to n for all columns.
+        dtype (numpy.dtype): Working precision, numpy.float32 or numpy.float64.
+        chunk_size (int): Number of series processed at once.
+
+    Returns:
+        tuple: LPC coefficient matrix (a), error power (E), and reflection coefficients (ref).
+    """
+    if order <= 0:
+        raise ValueError("Order must be > 0")
+
+    if isinstance(X, (list, tuple)):
+        # Pack ragged series into a matrix, aligned on their last sample
+        lengths = np.array([len(series) for series in X])
+        x = np.zeros((lengths.max(), len(X)), dtype=dtype)
+        for j, series in enumerate(X):
+            x[x.shape[0] - lengths[j]:, j] = series
+    else:
+        x = np.asarray(X, dtype=dtype)
+    N, obs = x.shape
+
+    lengths = np.full(obs, N) if lengths is None else np.asarray(lengths)
+    if lengths.shape != (obs,) or np.any(lengths > N) or np.any(lengths < 0):
+        raise ValueError("lengths must hold one value in [0, n] per column")
+
+    a = np.zeros((order, obs), dtype=dtype)
+    E = np.zeros(obs, dtype=dtype)
+    ref = np.zeros((order, obs), dtype=dtype)
+    epsilon = 1e-10  # Small constant to avoid division by zero
+
+    # Working buffers, allocated once and reused by every chunk. Forward
+    # errors of order m live in f[m + 1:], backward errors in b[:N - 1 - m].
+    chunk_size = max(1, min(chunk_size, obs))
+    f = np.empty((N, chunk_size), dtype=dtype)
+    b = np.empty((N, chunk_size), dtype=dtype)
+    fk = np.empty((N, chunk_size), dtype=dtype)
+    bk = np.empty((N, chunk_size), dtype=dtype)
+    rows = np.arange(N)[:, None]
+
+    for start in range(0, obs, chunk_size):
+        stop = min(start + chunk_size, obs)
+        width = stop - start
+        fc, bc, fkc, bkc = f[:, :width], b[:, :width], fk[:, :width], bk[:, :width]
+        chunk_lengths = lengths[start:stop]
+
+        # Rows before the start of each series are masked out
+        invalid = rows < (N - chunk_lengths)
+        ragged = bool(np.any(chunk_lengths < N))
+
+        np.copyto(fc, x[:, start:stop])
+        if ragged:
+            np.copyto(fc, 0, where=invalid)
+        np.copyto(bc, fc)
+        E[start:stop] = np.einsum('ij,ij->j', fc, fc) / np.maximum(chunk_lengths, 1)
+
+        for m in range(order):
+            L = N - 1 - m
+            efp = fc[m + 1:]
+            ebp = bc[:L]
+            if ragged:
+                np.copyto(efp, 0, where=invalid[:L])
+                np.copyto(ebp, 0, where=invalid[:L])
+
+            # Calculate reflection coefficients
+            denominator = np.einsum('ij,ij->j', efp, efp) + np.einsum('ij,ij->j', ebp, ebp)
+            k = np.where(denominator != 0, (-2 * np.einsum('ij,ij->j', ebp, efp)) / (denominator + epsilon), 0)
+            k = k.astype(dtype, copy=False)
+            ref[m, start:stop] = k
+
+            # Update forward and backward prediction errors in place
+            np.multiply(ebp[1:], k, out=bkc[:L - 1])
+            np.multiply(efp[:-1], k, out=fkc[:L - 1])
+            ebp[:-1] += fkc[:L - 1]
+            efp[1:] += bkc[:L - 1]
+
+            # Update prediction error
+            E[start:stop] *= 1 - k * k
+
+        a[:, start:stop] = ref_to_arcoeff(ref[:, start:stop])
+
+    return a, E, ref
+
+
 # --------------------------------------------------------------
 # Frequency-Warped LPC Functions
 # --------------------------------------------------------------
 
+def _allpass(ebp, warp_factor, length):
+    """
+    Runs backward prediction errors through the first-order warping all-pass.
+
+    Computes bb[i] = ebp[i] - warp_factor * (ebp[i + 1] - bb[i - 1]) for
+    i < length along the first axis with a single compiled lfilter call.
+    """
+    from scipy.signal import lfilter  # Deferred: scipy.signal alone takes most of a second to import
+
+    return lfilter([-warp_factor, 1], [1, -warp_factor], ebp[1:length + 1], axis=0, zi=ebp[:1])[0]
+
+
 def arburg_warped_vector(x, order=1, warp_factor=0):
     """
     Calculates frequency-warped LPC coefficients from time series data.
 
+    Runs through the compiled kernel when numba is available (see kernels.set_backend).
+
     Parameters:
         x (numpy.ndarray): Vector of time series data.
         order (int): LPC order. Must be > 0.
@@ -118,29 +284,292 @@ def arburg_warped_vector(x, order=1, warp_factor=0):
     Returns:
         tuple: LPC coefficients (a), error power (E), and reflection coefficients (ref).
     """
+    x = np.array(x, dtype=float)
     N = len(x)
+
+    if order <= 0:
+        raise ValueError("Order must be > 0")
+
+    warped_burg = kernels.kernel("warped_burg")
+    if warped_burg is not None:
+        return warped_burg(x, order, float(warp_factor))
+
     E = np.dot(x, x) / N
     ref = np.zeros(order)
-    ebp = x.copy()
-    efp = x.copy()
+    ebp = x
+    efp = x
+    epsilon = 1e-10  # Small constant to avoid division by zero
 
     for index in range(1, order + 1):
-        bb = np.zeros(N - index)
-        bb[0] = ebp[0] - warp_factor * ebp[1]
-        for i in range(1, N - index):
-            bb[i] = ebp[i] - warp_factor * (ebp[i + 1] - bb[i - 1])
+        if index > N:  # No prediction errors left; the remaining reflection coefficients stay 0
+            break
+        bb = _allpass(ebp, warp_factor, N - index)
         F = efp[1:]
-        k = (-2 * np.dot(F.T, bb)) / (np.dot(F.T, F) + np.dot(bb.T, bb))
+        denominator = np.dot(F, F) + np.dot(bb, bb)
+        k = (-2 * np.dot(F, bb)) / (denominator + epsilon) if denominator != 0 else 0
         ref[index - 1] = k
         efp = F + k * bb
         ebp = bb + k * F
         E = (1 - np.conj(k) * k) * E
 
-    # Calculate LPC coefficients
-    a = np.array([1])
-    for index in range(order):
-        aa = np.concatenate((a, [0]))
-        J = np.eye(len(aa))[::-1]
-        a = aa + ref[index]
+    # Calculate LPC coefficients (Levinson step-up)
+    return ref_to_arcoeff(ref), E, ref
 
-    return a, E, ref
+
+def arburg_warped_matrix(X, order=1, warp_factor=0):
+    """
+    Calculates frequency-warped LPC coefficients for multiple time series data.
+
+    Parameters:
+        X (numpy.ndarray): Matrix of time series data. Shape: (n, obs).
+        order (int): LPC order. Must be > 0.
+        warp_factor (float): Frequency warping factor.
+
+    Returns:
+        tuple: LPC coefficient matrix (a), error power (E), and reflection coefficients (ref).
+    """
+    x = np.array(X, dtype=float)
+    N, obs = x.shape
+
+    if order <= 0:
+        raise ValueError("Order must be > 0")
+
+    E = np.einsum('ij,ij->j', x, x) / N
+    ref = np.zeros((order, obs))
+    ebp = x
+    efp = x
+    epsilon = 1e-10  # Small constant to avoid division by zero
+
+    for index in range(1, order + 1):
+        bb = _allpass(ebp, warp_factor, N - index)
+        F = efp[1:, :]
+        denominator = np.einsum('ij,ij->j', F, F) + np.einsum('ij,ij->j', bb, bb)
+        k = np.where(denominator != 0, (-2 * np.einsum('ij,ij->j', F, bb)) / (denominator + epsilon), 0)
+        ref[index - 1, :] = k
+        efp = F + k * bb
+        ebp = bb + k * F
+        E = (1 - np.conj(k) * k) * E
+
+    # Calculate LPC coefficients (Levinson step-up)
+    return ref_to_arcoeff(ref), E, ref
+
+
+# --------------------------------------------------------------
+# Streaming LPC Estimators
+# --------------------------------------------------------------
+
+class StreamingBurg:
+    """
+    Base class for stateful Burg lattice estimators.
+
+    Each call to update() pushes one sample through the lattice, so the
+    reflection coefficients are refreshed in O(order) instead of refitting
+    the whole history. Subclasses decide how old lattice statistics are
+    discounted. Only real-valued series are supported.
+
+    This is an adaptive approximation of Burg, not a refit: the prediction
+    errors of each sample are computed once, with the reflection coefficients
+    current at its arrival, and are never recomputed as the coefficients
+    move. On stationary data the result tracks arburg_vector() over the same
+    samples closely; when the coefficients drift (for example a stage near
+    k = -1 on raw prices) the two can differ markedly.
+    """
+
+    epsilon = 1e-10  # Small constant to avoid division by zero
+
+    def __init__(self, order=1):
+        if order <= 0:
+            raise ValueError("Order must be > 0")
+        self.order = order
+        self.reset()
+
+    def reset(self):
+        """Clears all lattice state."""
+        self.count = 0
+        self.num = [0.0] * self.order  # Accumulated forward/backward cross terms
+        self.den = [0.0] * self.order  # Accumulated forward/backward energies
+        self.power = 0.0               # Accumulated final-stage prediction error energy
+        self.weight = 0.0              # Effective number of accumulated samples
+        self.backward = [0.0] * self.order  # Backward errors b_m(n-1)
+        self.ref = np.zeros(self.order)
+
+    def state(self):
+        """Returns the complete lattice state as a dict of NumPy arrays (np.savez-compatible)."""
+        return {name: np.array(value) for name, value in vars(self).items()}
+
+    def load_state(self, state):
+        """
+        Restores a state() taken from an estimator of the same class and settings.
+
+        Parameters:
+            state (dict): As returned by state().
+        """
+        current = vars(self)
+        for name in ("order", "window", "forgetting"):
+            if name in current and current[name] != state[name]:
+                raise ValueError(f"State was taken with {name}={state[name]}, not {current[name]}")
+        for name, value in current.items():
+            saved = np.asarray(state[name])
+            if isinstance(value, list):
+                current[name] = saved.tolist()
+            elif isinstance(value, np.ndarray):
+                current[name] = saved.astype(value.dtype)
+            else:
+                current[name] = type(value)(saved)
+
+    def _begin(self):
+        """Discounts or retires old statistics and advances weight."""
+        raise NotImplementedError
+
+    def _stage(self, m, num_term, den_term):
+        """Folds the newest terms of stage m in and returns its (num, den)."""
+        raise NotImplementedError
+
+    def _end(self, num_terms, den_terms, power_term):
+        """Folds the newest final-stage error energy into power once all stages have been updated."""
+        self.power += power_term
+
+    def update(self, x):
+        """
+        Pushes a new sample through the lattice.
+
+        Only the reflection coefficients are refreshed, so an update stays
+        O(order). Call coefficients() for the LPC polynomial when it is needed.
+
+        Parameters:
+            x (float): Newest sample of the series.
+
+        Returns:
+            np.ndarray: Reflection coefficients (ref) after the update.
+        """
+        x = float(x)
+        order = self.order
+        backward = self.backward
+        num_terms = [0.0] * order
+        den_terms = [0.0] * order
+        new_backward = [0.0] * order
+        ref = self.ref
+
+        # Stage terms must be folded in one stage at a time, because the
+        # forward error entering stage m + 1 depends on the fresh k_m.
+        self._begin()
+        f = x
+        b_cur = x
+        for m in range(order):
+            b_prev = backward[m]
+            num_terms[m] = f * b_prev
+            den_terms[m] = f * f + b_prev * b_prev
+            num, den = self._stage(m, num_terms[m], den_terms[m])
+            k = (-2 * num) / (den + self.epsilon) if den != 0 else 0.0
+            ref[m] = k
+
+            # Update forward and backward prediction errors
+            new_backward[m] = b_cur
+            b_cur = b_prev + k * f
+            f = f + k * b_prev
+
+        self._end(num_terms, den_terms, 0.5 * (f * f + b_cur * b_cur))
+        self.backward = new_backward
+        self.count += 1
+        return ref.copy()
+
+    def coefficients(self):
+        """
+        Returns the current model without pushing a new sample.
+
+        The LPC coefficients are stepped up from the reflection coefficients
+        on every call, which costs O(order^2).
+
+        Returns:
+            tuple: LPC coefficients (a), error power (E) as the mean squared
+            final-stage prediction error per sample, and reflection coefficients (ref).
+        """
+        E = self.power / self.weight if self.weight > 0 else 0.0
+        return ref_to_arcoeff(self.ref), E, self.ref.copy()
+
+
+class SlidingWindowBurg(StreamingBurg):
+    """
+    Streaming Burg estimator whose statistics cover the most recent `window` samples.
+
+    The lattice terms of every sample are kept in a ring so they can be
+    subtracted again once the sample leaves the window. Those terms were
+    computed with the coefficients of their own time step, so the model
+    approximates, rather than equals, arburg_vector() of the window.
+
+    Parameters:
+        order (int): LPC order. Must be > 0.
+        window (int): Number of samples the model is fitted over. Must be > order.
+    """
+
+    def __init__(self, order=1, window=50):
+        if window <= order:
+            raise ValueError("Window must be > order")
+        self.window = window
+        super().__init__(order)
+
+    def reset(self):
+        super().reset()
+        self._num_hist = np.zeros((self.window, self.order))
+        self._den_hist = np.zeros((self.window, self.order))
+        self._power_hist = np.zeros(self.window)
+        self._pos = 0
+        self._old_num = [0.0] * self.order
+        self._old_den = [0.0] * self.order
+
+    def _begin(self):
+        pos = self._pos
+        if self.count >= self.window:
+            # Oldest sample is about to be overwritten: retire its terms
+            self._old_num = self._num_hist[pos].tolist()
+            self._old_den = self._den_hist[pos].tolist()
+            self.power -= self._power_hist[pos]
+        else:
+            self.weight += 1
+
+    def _stage(self, m, num_term, den_term):
+        self.num[m] += num_term - self._old_num[m]
+        self.den[m] += den_term - self._old_den[m]
+        return self.num[m], self.den[m]
+
+    def _end(self, num_terms, den_terms, power_term):
+        super()._end(num_terms, den_terms, power_term)
+        pos = self._pos
+        self._num_hist[pos] = num_terms
+        self._den_hist[pos] = den_terms
+        self._power_hist[pos] = power_term
+        self._pos = (pos + 1) % self.window
+        if self._pos == 0:
+            # Resynchronise the running sums once per window to stop
+            # add/subtract rounding error from drifting
+            self.num = self._num_hist.sum(axis=0).tolist()
+            self.den = self._den_hist.sum(axis=0).tolist()
+            self.power = float(self._power_hist.sum())
+
+
+class ForgettingBurg(StreamingBurg):
+    """
+    Streaming Burg estimator with exponential forgetting.
+
+    Like SlidingWindowBurg this is an adaptive approximation; with
+    forgetting = 1 it is not a Burg fit of the full history either.
+
+    Parameters:
+        order (int): LPC order. Must be > 0.
+        forgetting (float): Forgetting factor in (0, 1]. Memory is roughly 1 / (1 - forgetting) samples.
+    """
+
+    def __init__(self, order=1, forgetting=0.99):
+        if not 0 < forgetting <= 1:
+            raise ValueError("Forgetting factor must be in (0, 1]")
+        self.forgetting = forgetting
+        super().__init__(order)
+
+    def _begin(self):
+        self.power = self.forgetting * self.power
+        self.weight = self.forgetting * self.weight + 1
+
+    def _stage(self, m, num_term, den_term):
+        self.num[m] = self.forgetting * self.num[m] + num_term
+        self.den[m] = self.forgetting * self.den[m] + den_term
+        return self.num[m], self.den[m]
@@ -0,0 +1,129 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from analysis import arburg_batch
+from metrics import rolling_std
+
+CHUNK_TICKS = 20_000  # Ticks evaluated at once per window size
+
+RESULT_DTYPE = np.dtype([
+    ("lpc_order", np.int64),
+    ("window_size", np.int64),
+    ("decay_factor", np.float64),
+    ("predictions", np.int64),
+    ("successes", np.int64),
+    ("success_rate", np.float64),
+    ("mse", np.float64),
+    ("mae", np.float64),
+])
+
+
+def _backtest_window(prices, window_size, lpc_orders, decay_factors, chunk_ticks=CHUNK_TICKS):
+    """
+    Score every (order, decay) pair for one window size.
+
+    One Burg fit of the highest order per window gives all lower orders as
+    well, since ref[:p] of an order-P fit is the order-p model.
+    """
+    prices = np.asarray(prices, dtype=float)
+    lpc_orders = sorted({p for p in lpc_orders if p < window_size})
+    if not lpc_orders or len(prices) < window_size:
+        return np.empty(0, dtype=RESULT_DTYPE)
+
+    max_order = max(lpc_orders)
+    order_index = {order: i for i, order in enumerate(lpc_orders)}
+    decay_factors = np.asarray(decay_factors, dtype=float)
+    windows = sliding_window_view(prices, window_size)  # (T, window_size), zero-copy
+    margins = rolling_std(prices, window_size) * 0.5  # Half the recent volatility
+    targets = prices[window_size - 1:]
+
+    shape = (len(lpc_orders), len(decay_factors))
+    successes = np.zeros(shape, dtype=np.int64)
+    squared = np.zeros(shape)
+    absolute = np.zeros(shape)
+
+    for start in range(0, len(windows), chunk_ticks):
+        stop = min(start + chunk_ticks, len(windows))
+        chunk = windows[start:stop].T  # (window_size, ticks) as arburg_matrix expects
+        _, _, ref = arburg_batch(chunk, max_order)
+
+        # Levinson step-up one order at a time: the intermediate models are
+        # exactly the lower-order fits
+        a = np.zeros((max_order + 1, stop - start))
+        a[0] = 1
+        for m in range(max_order):
+            a[1:m + 2] = a[1:m + 2] + ref[m] * a[m::-1]
+            if m + 1 not in order_index:
+                continue
+            i, order = order_index[m + 1], m + 1
+            weights = np.exp(-np.outer(decay_factors, np.arange(order)))  # apply_decay for every decay
+
+            # Same rule as the live loop: -dot(decayed coeffs, last `order` prices)
+            predictions = -(weights @ (a[1:order + 1] * chunk[window_size - order:]))
+            errors = predictions - targets[start:stop]
+            successes[i] += np.count_nonzero(np.abs(errors) <= margins[start:stop], axis=1)
+            squared[i] += np.einsum('dt,dt->d', errors, errors)
+            absolute[i] += np.abs(errors).sum(axis=1)
+
+    n = len(windows)
+    results = np.empty(len(lpc_orders) * len(decay_factors), dtype=RESULT_DTYPE)
+    grid = list(itertools.product(lpc_orders, decay_factors))
+    results["lpc_order"] = [order for order, _ in grid]
+    results["window_size"] = window_size
+    results["decay_factor"] = [decay for _, decay in grid]
+    results["predictions"] = n
+    results["successes"] = successes.ravel()
+    results["success_rate"] = successes.ravel() / n * 100
+    results["mse"] = squared.ravel() / n
+    results["mae"] = absolute.ravel() / n
+    return results
+
+
+def backtest(prices, lpc_orders, window_sizes, decay_factors, n_workers=None, chunk_ticks=CHUNK_TICKS):
+    """
+    Walk-forward evaluation of the real-time prediction rule over a parameter grid.
+
+    At every tick an LPC model is fitted with Burg's method over the last
+    window_size prices, decayed with apply_decay(), and the next-price
+    prediction is scored against the margin of error (half the standard
+    deviation of the same window), as in the live pipeline. The live
+    pipeline uses a streaming approximation of the windowed fit; the
+    backtest refits every window exactly. The first window_size - 1 ticks
+    are warm-up and not scored, and orders >= window_size are skipped.
+
+    Parameters:
+        prices (numpy.ndarray): Historical prices.
+        lpc_orders (list): LPC orders to evaluate.
+        window_sizes (list): Window sizes to evaluate.
+        decay_factors (list): Decay factors to evaluate.
+        n_workers (int): Fan window sizes out over this many processes. Runs serially if None.
+        chunk_ticks (int): Ticks evaluated at once; bounds memory.
+
+    Returns:
+        numpy.ndarray: Structured array with one row per parameter combination
+        (lpc_order, window_size, decay_factor, predictions, successes, success_rate, mse, mae).
+        Pass it to pandas.DataFrame for a table view.
+    """
+    prices = np.asarray(prices, dtype=float)
+    args = [(prices, window, lpc_orders, decay_factors, chunk_ticks) for window in window_sizes]
+
+    if n_workers is None:
+        tables = [_backtest_window(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            tables = list(pool.map(_backtest_window, *zip(*args)))
+
+    return np.concatenate(tables) if tables else np.empty(0, dtype=RESULT_DTYPE)
+
+
+if __name__ == "__main__":
+    from stock_simulation import driftless_simulator
+
+    history = driftless_simulator().fetch(50_000)[:, 0]
+    table = backtest(history, lpc_orders=range(1, 21, 4), window_sizes=[50, 100, 200],
+                     decay_factors=np.linspace(0.01, 1.0, 5))
+    best = np.sort(table, order="success_rate")[::-1][:5]
+    for row in best:
+        print(f"order={row['lpc_order']:2d} window={row['window_size']:3d} decay={row['decay_factor']:.2f} "
+              f"success={row['success_rate']:.2f}% mse={row['mse']:.4f}")
@@ -0,0 +1,472 @@
+import sys
+import json
+import time
+import platform
+import warnings
+import argparse
+import itertools
+import numpy as np
+from scipy import signal as sig
+import kernels
+from analysis import arburg_vector, arburg_batch, arburg_matrix, arburg_warped_vector
+from synthesis import gen_ts
+from utils import (arcoeff_warp_matrix, arcoeff_warp, arcoeff_to_cep, cep_to_arcoeff, freqz,
+                   arcoeff_to_cep_matrix, cep_to_arcoeff_matrix, freqz_matrix)
+
+SIZES = {"n": (200, 2000), "order": (10, 20), "n_series": (100, 1000)}
+QUICK_SIZES = {"n": (200,), "order": (10,), "n_series": (100,)}
+THRESHOLD = 0.10  # Relative slowdown reported as a regression
+# Smallest speedup of a batched function over its reference loop that `speedup` accepts
+MIN_SPEEDUP = {"arcoeff_to_cep_matrix": 50, "cep_to_arcoeff_matrix": 50, "freqz_matrix": 5, "arcoeff_warp_matrix": 1000}
+
+
+def best_time(func, repeat=3):
+    """Return the best wall-clock time in seconds over `repeat` calls of func()."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def random_walks(n, n_series, seed=0):
+    """Simulated price windows, one series per column. Shape: (n, n_series)."""
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(size=(n, n_series)), axis=0)
+
+
+def bench_arburg_batch(n_series=10000, n=200, order=20, dtype=np.float64, chunk_size=1024):
+    """Compare arburg_batch throughput with a loop over arburg_vector on ragged windows."""
+    X = random_walks(n, n_series)
+    lengths = np.random.default_rng(1).integers(n // 2, n + 1, n_series)
+
+    batch_time = best_time(lambda: arburg_batch(X, order, lengths=lengths, dtype=dtype, chunk_size=chunk_size))
+    loop_time = best_time(lambda: [arburg_vector(X[n - l:, j], order) for j, l in enumerate(lengths)], repeat=1)
+
+    print(f"arburg_batch  ({np.dtype(dtype).name}): {n_series / batch_time:12.0f} series/s")
+    print(f"arburg_vector (loop)   : {n_series / loop_time:12.0f} series/s")
+    print(f"Speedup: {loop_time / batch_time:.1f}x")
+    return n_series / batch_time, n_series / loop_time
+
+
+def arcoeff_warp_roots(a, warp_factor, task="warp"):
+    """Reference warp through tf2zpk/zpk2tf pole mapping (the previous utils.arcoeff_warp)."""
+    s = -1 if task == "warp" else 1
+    a = np.insert(a, 0, 1)
+    b = np.zeros_like(a)
+    b[0] = 1
+    z, p, k = sig.tf2zpk(b, a)
+    p_new = (p + s * warp_factor) / (1 + s * warp_factor * p)
+    b, a = sig.zpk2tf(z, p_new, k)
+    return np.real(a[1:])
+
+
+def bench_arcoeff_warp(orders=(10, 20, 30, 40), n_models=1000, warp_factor=0.4):
+    """
+    Compare speed and warp/unwarp round-trip error of arcoeff_warp_matrix with a loop of root-finding warps.
+
+    Returns:
+        float: Smallest speedup over the orders.
+    """
+    speedups = []
+    for order in orders:
+        A, _, _ = arburg_matrix(random_walks(500, n_models), order)
+
+        matrix_time = best_time(lambda: arcoeff_warp_matrix(A, warp_factor))
+        roots_time = best_time(lambda: [arcoeff_warp_roots(A[:, j], warp_factor) for j in range(n_models)], repeat=1)
+
+        roundtrip = arcoeff_warp_matrix(arcoeff_warp_matrix(A, warp_factor), warp_factor, "unwarp")
+        roots_roundtrip = np.column_stack([
+            arcoeff_warp_roots(arcoeff_warp_roots(A[:, j], warp_factor), warp_factor, "unwarp")
+            for j in range(n_models)
+        ])
+        speedups.append(roots_time / matrix_time)
+        print(f"order {order:2d}: {speedups[-1]:8.0f}x faster, round-trip error "
+              f"{np.abs(roundtrip - A).max():.2e} (roots: {np.abs(roots_roundtrip - A).max():.2e})")
+    return min(speedups)
+
+
+def arcoeff_to_cep_loop(a, sigma_squared, N):
+    """Reference LPC -> cepstrum recursion for one model in pure Python (the previous utils.arcoeff_to_cep)."""
+    c = [0] * N
+    c[0] = np.log(sigma_squared)
+    c[1] = -a[0]
+    for n in range(2, N):
+        if n <= len(a):
+            c[n] = -a[n - 1] - sum((1 - m / n) * a[m - 1] * c[n - m] for m in range(1, n))
+        else:
+            c[n] = -sum((1 - m / n) * a[m - 1] * c[n - m] for m in range(1, len(a) + 1))
+    return c
+
+
+def cep_to_arcoeff_loop(c, order):
+    """Reference cepstrum -> LPC recursion for one model in pure Python (the previous utils.cep_to_arcoeff)."""
+    a = [0] * order
+    a[0] = -c[1]
+    for i in range(2, order + 1):
+        a[i - 1] = -c[i] - sum((1 - m / i) * c[i - m] * a[m - 1] for m in range(1, i))
+    return a
+
+
+def bench_cepstrum(order=20, n_models=10000, n_cep=40):
+    """
+    Compare the batched cepstrum conversions with a loop over the single-model reference.
+
+    Returns:
+        dict: Speedup per batched function.
+    """
+    A, E, _ = arburg_matrix(random_walks(500, n_models), order)
+    C = arcoeff_to_cep_matrix(A, E, n_cep)
+    speedups = {}
+    for name, matrix, loop in (
+        ("arcoeff_to_cep_matrix", lambda: arcoeff_to_cep_matrix(A, E, n_cep),
+         lambda: [arcoeff_to_cep_loop(A[:, j], E[j], n_cep) for j in range(n_models)]),
+        ("cep_to_arcoeff_matrix", lambda: cep_to_arcoeff_matrix(C, order),
+         lambda: [cep_to_arcoeff_loop(C[:, j], order) for j in range(n_models)]),
+    ):
+        speedups[name] = best_time(loop, repeat=1) / best_time(matrix)
+        print(f"{name} ({n_models} models, order {order}): {speedups[name]:.0f}x faster than the loop")
+    return speedups
+
+
+def freqz_scipy(a, sigma_squared=1, worN=1000, whole=False, fs=500):
+    """Reference power spectrum of one model through scipy.signal.freqz (the previous utils.freqz)."""
+    a = np.insert(a, 0, 1)
+    b = np.zeros_like(a)
+    b[0] = 1
+    w, h = sig.freqz(b, a, worN=worN, whole=whole, fs=fs)
+    return w, 20 * np.log10(abs(h) * np.sqrt(sigma_squared))
+
+
+def bench_freqz_matrix(order=20, n_models=10000, worN=1000):
+    """
+    Compare freqz_matrix with a loop of scipy.signal.freqz calls, one per model.
+
+    Returns:
+        float: Speedup of freqz_matrix.
+    """
+    A, E, _ = arburg_matrix(random_walks(500, n_models), order)
+    matrix_time = best_time(lambda: freqz_matrix(A, E, worN))
+    loop_time = best_time(lambda: [freqz_scipy(A[:, j], E[j], worN) for j in range(n_models)], repeat=1)
+    error = np.abs(freqz_matrix(A[:, :100], E[:100], worN)[1]
+                   - np.column_stack([freqz_scipy(A[:, j], E[j], worN)[1] for j in range(100)])).max()
+    speedup = loop_time / matrix_time
+    print(f"freqz_matrix ({n_models} models, order {order}, {worN} points): {speedup:.0f}x faster "
+          f"than the loop, max difference {error:.1e} dB")
+    return speedup
+
+
+# --------------------------------------------------------------
+# Regression Suite
+# --------------------------------------------------------------
+
+def time_per_call(func, repeat=5, min_time=0.02):
+    """
+    Return the best time in seconds of one func() call.
+
+    Calls are grouped so that every timed group lasts at least min_time,
+    which keeps timer resolution out of microsecond-scale results. One
+    untimed call first takes JIT compilation, numba cache loads and lazy
+    imports out of the calibration.
+    """
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _case_arburg_vector(n, order):
+    x = random_walks(n, 1)[:, 0]
+    return lambda: arburg_vector(x, order)
+
+
+def _case_arburg_matrix(n, order, n_series):
+    X = random_walks(n, n_series)
+    return lambda: arburg_matrix(X, order)
+
+
+def _case_arburg_warped_vector(n, order):
+    x = random_walks(n, 1)[:, 0]
+    return lambda: arburg_warped_vector(x, order, 0.4)
+
+
+def _case_arcoeff_to_cep(n, order):
+    a, E, _ = arburg_vector(random_walks(max(n, order + 1), 1)[:, 0], order)
+    return lambda: arcoeff_to_cep(a, E, n)
+
+
+def _case_cep_to_arcoeff(n, order):
+    a, E, _ = arburg_vector(random_walks(max(n, order + 1), 1)[:, 0], order)
+    c = arcoeff_to_cep(a, E, max(n, order + 1))
+    return lambda: cep_to_arcoeff(c, order)
+
+
+def _case_arcoeff_to_cep_matrix(n, order, n_series):
+    A, E, _ = arburg_matrix(random_walks(max(n, order + 1), n_series), order)
+    return lambda: arcoeff_to_cep_matrix(A, E, n)
+
+
+def _case_cep_to_arcoeff_matrix(n, order, n_series):
+    A, E, _ = arburg_matrix(random_walks(max(n, order + 1), n_series), order)
+    C = arcoeff_to_cep_matrix(A, E, max(n, order + 1))
+    return lambda: cep_to_arcoeff_matrix(C, order)
+
+
+def _case_freqz(n, order):
+    a, E, _ = arburg_vector(random_walks(max(n, order + 1), 1)[:, 0], order)
+    return lambda: freqz(a, E, worN=n)
+
+
+def _case_freqz_matrix(n, order, n_series):
+    A, E, _ = arburg_matrix(random_walks(max(n, order + 1), n_series), order)
+    return lambda: freqz_matrix(A, E, worN=n)
+
+
+def _case_arcoeff_warp(order):
+    a, _, _ = arburg_vector(random_walks(500, 1)[:, 0], order)
+    return lambda: arcoeff_warp(a, 0.4)
+
+
+def _case_arcoeff_warp_matrix(order, n_series):
+    A, _, _ = arburg_matrix(random_walks(500, n_series), order)
+    return lambda: arcoeff_warp_matrix(A, 0.4)
+
+
+def _case_gen_ts(n, order):
+    a, _, _ = arburg_vector(np.diff(random_walks(500, 1)[:, 0]), order)
+    return lambda: gen_ts(a, sigma=1, n_samples=n)
+
+
+def _case_ensemble_tick(n, order):
+    """One EnsembleForecaster update: every order up to `order`, 10 horizons. n is the window size."""
+    from forecast import EnsembleForecaster
+
+    prices = itertools.cycle(random_walks(100_000, 1)[:, 0])
+    ensemble = EnsembleForecaster(max_order=order, window_size=n, horizon=10)
+    for _ in range(n):
+        ensemble.update(next(prices))
+    return lambda: ensemble.update(next(prices))
+
+
+def _case_plot_tick(n, order):
+    """
+    One tick of the live loop without Tk: estimator and metrics stages called
+    directly, followed by a BlitRenderer frame on an off-screen Agg canvas.
+    n is the window size.
+    """
+    import queue
+    import threading
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from buffers import RingBuffer
+    from pipeline import EstimatorStage, MetricsStage
+    from plot import BlitRenderer
+
+    prices = itertools.cycle(random_walks(100_000, 1)[:, 0])
+    raw_prices, filtered_prices = RingBuffer(100_000), RingBuffer(100_000)
+    stop = threading.Event()
+    estimator = EstimatorStage(stop, queue.Queue(), queue.Queue(), order, n, 0.1)
+    metrics = MetricsStage(stop, queue.Queue(), n, raw_prices, filtered_prices)
+    fig = Figure(figsize=(8, 4))
+    renderer = BlitRenderer(fig, fig.add_subplot(), FigureCanvasAgg(fig))
+
+    # Fill the window and the visible range first, so ticks are measured in steady state
+    for _ in range(max(n, renderer.visible)):
+        metrics.process(estimator.process((time.perf_counter(), next(prices))))
+        renderer.push(raw_prices[-1], filtered_prices[-1])
+
+    def tick():
+        metrics.process(estimator.process((time.perf_counter(), next(prices))))
+        renderer.push(raw_prices[-1], filtered_prices[-1])
+        renderer.draw("benchmark")
+    return tick
+
+
+CASES = {
+    "arburg_vector": _case_arburg_vector,
+    "arburg_matrix": _case_arburg_matrix,
+    "arburg_warped_vector": _case_arburg_warped_vector,
+    "arcoeff_to_cep": _case_arcoeff_to_cep,
+    "cep_to_arcoeff": _case_cep_to_arcoeff,
+    "arcoeff_to_cep_matrix": _case_arcoeff_to_cep_matrix,
+    "cep_to_arcoeff_matrix": _case_cep_to_arcoeff_matrix,
+    "freqz": _case_freqz,
+    "freqz_matrix": _case_freqz_matrix,
+    "arcoeff_warp": _case_arcoeff_warp,
+    "arcoeff_warp_matrix": _case_arcoeff_warp_matrix,
+    "gen_ts": _case_gen_ts,
+    "ensemble_tick": _case_ensemble_tick,
+    "plot_tick": _case_plot_tick,
+}
+
+
+def _case_params(case, sizes):
+    """Every combination of the sizes a case takes, as keyword dicts."""
+    names = case.__code__.co_varnames[:case.__code__.co_argcount]
+    return [dict(zip(names, values)) for values in itertools.product(*(sizes[name] for name in names))]
+
+
+def _key(result):
+    params = ",".join(f"{name}={value}" for name, value in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def run_suite(cases=None, sizes=SIZES, repeat=5, verbose=True):
+    """
+    Time every case over the size matrix.
+
+    Parameters:
+        cases (list): Names from CASES. Defaults to all of them.
+        sizes (dict): Values of n, order and n_series; each case uses the ones it takes.
+        repeat (int): Timed repetitions; the best one is kept.
+        verbose (bool): Print every result as it is measured.
+
+    Returns:
+        dict: Environment metadata and a list of results with name, params and seconds per call.
+    """
+    results = []
+    for name in cases or CASES:
+        case = CASES[name]
+        for params in _case_params(case, sizes):
+            seconds = time_per_call(case(**params), repeat=repeat)
+            results.append({"name": name, "params": params, "seconds": seconds})
+            if verbose:
+                print(f"{_key(results[-1]):55s} {seconds * 1e6:12.2f} us")
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "backend": kernels.get_backend(),
+        "results": results,
+    }
+
+
+def save_results(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, threshold=THRESHOLD, verbose=True):
+    """
+    Compare two reports from run_suite().
+
+    Parameters:
+        baseline (dict): Reference report.
+        current (dict): New report.
+        threshold (float): Relative slowdown above which a case counts as a regression.
+        verbose (bool): Print one line per case present in both reports.
+
+    Returns:
+        list: (case, baseline seconds, current seconds, ratio) of every regression.
+    """
+    backends = baseline.get("backend"), current.get("backend")
+    if backends[0] != backends[1]:
+        warnings.warn(f"Reports use different Burg kernel backends ({backends[0]} -> {backends[1]}); "
+                      f"differences in the Burg cases reflect the backend, not a regression", stacklevel=2)
+    reference = {_key(result): result["seconds"] for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = _key(result)
+        if key not in reference:
+            continue
+        ratio = result["seconds"] / reference[key]
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append((key, reference[key], result["seconds"], ratio))
+        if verbose:
+            flag = "REGRESSION" if regressed else ("faster" if ratio < 1 - threshold else "")
+            print(f"{key:55s} {reference[key] * 1e6:12.2f} -> {result['seconds'] * 1e6:12.2f} us "
+                  f"{ratio:6.2f}x {flag}")
+    return regressions
+
+
+def main(argv=None):
+    """
+    Command-line entry point of the benchmark suite.
+
+    run      Time the suite, optionally save it and compare it with a baseline.
+    compare  Compare two saved reports.
+    speedup  The batched functions against loops over their reference implementations.
+
+    Returns 1 when a comparison finds regressions or a speedup falls below
+    MIN_SPEEDUP, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks", description="DSP benchmark and regression suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time the suite")
+    run.add_argument("--cases", nargs="+", choices=sorted(CASES), help="cases to run (default: all)")
+    run.add_argument("--quick", action="store_true", help="smallest size of every dimension only")
+    run.add_argument("--n", type=int, nargs="+", help="series lengths")
+    run.add_argument("--order", type=int, nargs="+", help="LPC orders")
+    run.add_argument("--n-series", type=int, nargs="+", help="numbers of series")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--backend", choices=kernels.BACKENDS, default="auto", help="Burg kernel backend")
+    run.add_argument("--output", "-o", help="save the report as JSON")
+    run.add_argument("--baseline", help="report to compare against")
+    run.add_argument("--threshold", type=float, default=THRESHOLD)
+
+    compare = commands.add_parser("compare", help="compare two saved reports")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=THRESHOLD)
+
+    commands.add_parser("speedup", help="batched functions against loops over reference implementations")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "speedup":
+        bench_arburg_batch(dtype=np.float64)
+        bench_arburg_batch(dtype=np.float32)
+        speedups = bench_cepstrum()
+        speedups["freqz_matrix"] = bench_freqz_matrix()
+        speedups["arcoeff_warp_matrix"] = bench_arcoeff_warp()
+        slow = {name: speedup for name, speedup in speedups.items() if speedup < MIN_SPEEDUP[name]}
+        for name, speedup in slow.items():
+            print(f"REGRESSION: {name} is {speedup:.0f}x faster than its loop, expected at least {MIN_SPEEDUP[name]}x")
+        return 1 if slow else 0
+
+    if args.command == "compare":
+        baseline, current = load_results(args.baseline), load_results(args.current)
+    else:
+        kernels.set_backend(args.backend)
+        sizes = dict(QUICK_SIZES if args.quick else SIZES)
+        for name in sizes:
+            if getattr(args, name) is not None:
+                sizes[name] = tuple(getattr(args, name))
+        current = run_suite(args.cases, sizes, repeat=args.repeat)
+        if args.output:
+            save_results(current, args.output)
+            print(f"Report saved to {args.output}")
+        if not args.baseline:
+            return 0
+        print("-" * 50)
+        baseline = load_results(args.baseline)
+
+    regressions = compare_results(baseline, current, args.threshold)
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
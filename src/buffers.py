@@ -0,0 +1,211 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class RingBuffer:
+    """
+    Preallocated circular buffer with zero-copy window views.
+
+    Values are written twice, at pos and pos + capacity, so the last n
+    values are always one contiguous slice and view() never copies.
+    Indexing and slicing use positions in the full (logical) history, like
+    the Python list it replaces; only the last `capacity` values are held.
+
+    Parameters:
+        capacity (int): Number of most recent values held in memory.
+        dtype (numpy.dtype): Value type.
+        spill_path (str): File that evicted values are appended to as raw binary. Nothing is kept if None.
+    """
+
+    def __init__(self, capacity, dtype=np.float64, spill_path=None):
+        if capacity <= 0:
+            raise ValueError("Capacity must be > 0")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.data = np.zeros(2 * capacity, dtype=self.dtype)
+        self.count = 0
+        self.spill_path = spill_path
+        self.spilled = 0  # Number of values already written to spill_path
+        self._spill_file = open(spill_path, "ab") if spill_path is not None else None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def start(self):
+        """Position of the oldest value still held in memory."""
+        return max(0, self.count - self.capacity)
+
+    def _spill(self, upto):
+        """Write held values [spilled, upto) to the spill file before they are overwritten."""
+        if upto > self.spilled:
+            self._spill_file.write(self[self.spilled:upto].tobytes())
+            self.spilled = upto
+
+    def append(self, value):
+        """Append one value, evicting the oldest one when full."""
+        if self._spill_file is not None and self.count - self.capacity >= self.spilled:
+            # Spill half a buffer at a time to keep file writes rare
+            self._spill(min(self.count, self.spilled + max(1, self.capacity // 2)))
+        pos = self.count % self.capacity
+        self.data[pos] = value
+        self.data[pos + self.capacity] = value
+        self.count += 1
+
+    def extend(self, values):
+        """Append many values with vectorised writes."""
+        values = np.asarray(values, dtype=self.dtype)
+        if len(values) > self.capacity:
+            if self._spill_file is not None:
+                self._spill(self.count)
+                self._spill_file.write(values[:-self.capacity].tobytes())
+                self.spilled += len(values) - self.capacity
+            self.count += len(values) - self.capacity
+            values = values[-self.capacity:]
+        if self._spill_file is not None:
+            self._spill(max(self.spilled, min(self.count, self.count + len(values) - self.capacity)))
+
+        # Copy in at most two pieces, mirrored into both halves
+        pos = self.count % self.capacity
+        first = min(len(values), self.capacity - pos)
+        for offset in (0, self.capacity):
+            self.data[pos + offset:pos + offset + first] = values[:first]
+            self.data[offset:offset + len(values) - first] = values[first:]
+        self.count += len(values)
+
+    def view(self, n=None):
+        """
+        Return the last n held values, oldest first, without copying.
+
+        Parameters:
+            n (int): Number of values. Defaults to everything held.
+
+        Returns:
+            numpy.ndarray: Read-only view of up to n values.
+        """
+        held = min(self.count, self.capacity)
+        n = held if n is None else max(0, min(n, held))
+        end = self.count % self.capacity + self.capacity
+        window = self.data[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.view(), dtype=dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.count)
+            if step != 1:
+                raise ValueError("RingBuffer slices must have step 1")
+            if start < self.start:
+                raise IndexError("Slice reaches values that are no longer held in memory")
+            stop = max(start, stop)
+            return self.view(self.count - start)[:stop - start]
+        if key < 0:
+            key += self.count
+        if not self.start <= key < self.count:
+            raise IndexError("RingBuffer index out of held range")
+        return self.data[key % self.capacity]
+
+    def state(self):
+        """Return the held values and the logical count as arrays (np.savez-compatible)."""
+        return {"values": np.array(self.view()), "count": np.array(self.count)}
+
+    def load_state(self, state):
+        """
+        Replace the contents with those of state(), in place.
+
+        The newest `capacity` values are kept. Values evicted before the
+        state was taken are not written to the spill file.
+
+        Parameters:
+            state (dict): As returned by state(), possibly from a buffer of another capacity.
+        """
+        values = np.asarray(state["values"], dtype=self.dtype)[-self.capacity:]
+        count = int(state["count"])
+        if len(values) < min(count, self.capacity):
+            raise ValueError("State holds fewer values than this buffer would need to hold")
+        positions = (count - len(values) + np.arange(len(values))) % self.capacity
+        self.data[positions] = values
+        self.data[positions + self.capacity] = values
+        self.count = count
+        self.spilled = max(self.spilled, count - len(values))
+
+    def history(self):
+        """Return the spilled history as a read-only memory map (empty without a spill file)."""
+        if self._spill_file is None or self.spilled == 0:
+            return np.empty(0, dtype=self.dtype)
+        self._spill_file.flush()
+        return np.memmap(self.spill_path, dtype=self.dtype, mode="r", shape=(self.spilled,))
+
+    def close(self):
+        """Flush and close the spill file."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+
+class SharedRingBuffer:
+    """
+    Fixed-size ring buffers in shared memory, one row per series.
+
+    Each row has a single writer; any process that attaches by name can
+    read it without pickling. The write counter of a row is bumped after
+    its value is stored, so readers never see a slot that has not been written.
+
+    Parameters:
+        n_rows (int): Number of independent rings (e.g. one per symbol).
+        capacity (int): Number of values kept per ring.
+        name (str): Name of an existing block to attach to. A new block is created if None.
+    """
+
+    def __init__(self, n_rows, capacity, name=None):
+        self.n_rows = n_rows
+        self.capacity = capacity
+        size = n_rows * 8 + n_rows * capacity * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.counts = np.ndarray((n_rows,), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray((n_rows, capacity), dtype=np.float64, buffer=self.shm.buf, offset=n_rows * 8)
+        if self.owner:
+            self.counts[:] = 0
+            self.data[:] = np.nan
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, row, value):
+        """Append a value to ring `row`."""
+        count = self.counts[row]
+        self.data[row, count % self.capacity] = value
+        self.counts[row] = count + 1
+
+    def latest(self, row, n=None):
+        """
+        Return a copy of the last n values of ring `row`, oldest first.
+
+        Parameters:
+            row (int): Ring index.
+            n (int): Number of values. Defaults to everything still held by the ring.
+
+        Returns:
+            numpy.ndarray: Up to n values.
+        """
+        count = int(self.counts[row])
+        n = min(count, self.capacity) if n is None else min(n, count, self.capacity)
+        idx = np.arange(count - n, count) % self.capacity
+        return self.data[row, idx]
+
+    def close(self):
+        """Detach from the block, and free it if this instance created it."""
+        # Drop the numpy views first, the block cannot close while they exist
+        del self.counts, self.data
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
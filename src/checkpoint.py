@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+import numpy as np
+from metrics import PredictionMetrics
+from pipeline import Pipeline
+
+CHECKPOINT_VERSION = 2
+CHECKPOINT_INTERVAL = 10.0  # Seconds between two background checkpoints
+
+
+def _section(state, prefix):
+    """Entries of a flat state dict under `prefix`, with the prefix removed."""
+    return {key[len(prefix):]: value for key, value in state.items() if key.startswith(prefix)}
+
+
+def save_checkpoint(path, state):
+    """
+    Write a flat dict of arrays to an uncompressed .npz file atomically.
+
+    The file is written next to `path` and renamed over it once it is
+    complete and synced, so a crash mid-write leaves the previous
+    checkpoint intact.
+
+    Parameters:
+        path (str): Checkpoint file.
+        state (dict): Arrays keyed by name, e.g. Pipeline.state().
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, version=np.array(CHECKPOINT_VERSION), **state)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    """Read a checkpoint written by save_checkpoint() into a dict of arrays."""
+    with np.load(path) as data:
+        state = {key: data[key] for key in data.files}
+    version = int(state.pop("version", -1))
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version} in '{path}'")
+    return state
+
+
+def resume(state, raw_prices, filtered_prices, **kwargs):
+    """
+    Rebuild a pipeline from a checkpoint, ready to start.
+
+    Ring buffers are restored in place and the prediction metrics, the
+    estimator lattice and the simulator position carried over, so restoring
+    is O(buffer capacity) however many ticks the session has seen, and the
+    resumed run continues exactly where the checkpoint was taken. A lattice
+    of another order than `max_order` is refitted on the restored prices.
+
+    Parameters:
+        state (dict or str): Pipeline.state(), or the path of a checkpoint file.
+        raw_prices, filtered_prices (RingBuffer): Buffers to restore into and publish to.
+        **kwargs: Further Pipeline arguments (source, feed_interval, instruments, max_order, ...).
+
+    Returns:
+        Pipeline: Not yet started, with the checkpoint's parameters.
+    """
+    if isinstance(state, str):
+        state = load_checkpoint(state)
+    metrics = _section(state, "metrics/")
+    raw_prices.load_state(_section(metrics, "raw_prices/"))
+    filtered_prices.load_state(_section(metrics, "filtered_prices/"))
+    quality = PredictionMetrics.restore(_section(metrics, "quality/"))
+
+    estimator = _section(state, "estimator/")
+    lpc_order, window_size, decay_factor = np.asarray(estimator["params"]).tolist()
+    kwargs.setdefault("max_order", int(estimator["lattice/order"]))
+    pipeline = Pipeline(int(lpc_order), int(window_size), decay_factor, raw_prices, filtered_prices,
+                        quality=quality, **kwargs)
+    if pipeline.estimator.estimator.order == int(estimator["lattice/order"]):
+        pipeline.estimator.load_state(estimator)
+
+    simulator = _section(state, "feed/simulator/")
+    if simulator and pipeline.feed.simulator is not None:
+        pipeline.feed.simulator.load_state(simulator)
+    return pipeline
+
+
+class Checkpointer:
+    """
+    Saves a running pipeline's state to a file every `interval` seconds from a background thread.
+
+    Snapshots travel through the stages behind the ticks in flight
+    (Pipeline.state), so checkpointing never pauses the stream, and the
+    file is replaced atomically. A failed periodic save is printed and
+    retried at the next interval; a failed final save is kept in `error`
+    and raised by join().
+
+    Parameters:
+        pipeline (Pipeline): Pipeline to checkpoint.
+        path (str): Checkpoint file (.npz).
+        interval (float): Seconds between two checkpoints.
+        timeout (float): Seconds to wait for every stage's snapshot.
+    """
+
+    def __init__(self, pipeline, path, interval=CHECKPOINT_INTERVAL, timeout=1.0):
+        self.pipeline = pipeline
+        self.path = path
+        self.interval = interval
+        self.timeout = timeout
+        self.saves = 0
+        self.save_time = 0.0  # Duration of the last save, seconds
+        self.error = None  # Exception of the final save, raised by join()
+        self._final = True
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="checkpoint", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def save(self):
+        """Snapshot the pipeline and write the checkpoint now, on the calling thread."""
+        with self._lock:
+            start = time.perf_counter()
+            save_checkpoint(self.path, self.pipeline.state(self.timeout))
+            self.save_time = time.perf_counter() - start
+            self.saves += 1
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.save()
+            except (OSError, TimeoutError) as e:
+                print(f"Checkpoint failed: {e}")
+        if self._final:
+            try:
+                self.save()
+            except Exception as e:  # Handed to join(); nothing else would see it on this thread
+                self.error = e
+
+    def stop(self, final=True):
+        """Stop the periodic saves; with `final`, the thread writes one last checkpoint before it exits."""
+        self._final = final
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        """Wait for the thread; raises the final save's exception if it failed."""
+        self._thread.join(timeout)
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+
+if __name__ == "__main__":
+    import tempfile
+    from buffers import RingBuffer
+    from stock_simulation import driftless_simulator
+
+    capacity = 1_000_000
+    simulator = driftless_simulator()
+    raw_prices, filtered_prices = RingBuffer(capacity), RingBuffer(capacity)
+    raw_prices.extend(simulator.fetch(capacity)[:, 0])  # A session that has already seen a million ticks
+    filtered_prices.extend(raw_prices.view())
+    pipeline = Pipeline(10, 50, 0.1, raw_prices, filtered_prices, feed_interval=0, source=simulator.next_price)
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "session.npz")
+        checkpointer = Checkpointer(pipeline, path, interval=0.2).start()
+        pipeline.start()
+        time.sleep(1)
+        pipeline.stop()
+        pipeline.join()
+        checkpointer.stop()
+        checkpointer.join()
+        print(f"{checkpointer.saves} checkpoints of {os.path.getsize(path) / 1e6:.1f} MB, "
+              f"last written in {checkpointer.save_time * 1e3:.0f} ms")
+
+        start = time.perf_counter()
+        resumed_simulator = driftless_simulator(seed=None)
+        resumed = resume(path, RingBuffer(capacity), RingBuffer(capacity), feed_interval=0,
+                         source=resumed_simulator.next_price)
+        elapsed = time.perf_counter() - start
+        print(f"Resumed {len(resumed.raw_prices)} ticks in {elapsed * 1e3:.0f} ms, "
+              f"success rate {resumed.success_rate:.2f}% (was {pipeline.success_rate:.2f}%)")
+        print(f"Next price matches: {resumed_simulator.next_price() == simulator.next_price()}")
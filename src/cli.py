@@ -0,0 +1,310 @@
+import os
+import sys
+import time
+import argparse
+
+# Only argparse is imported up front; every command imports what it needs,
+# so the CLI starts quickly and never touches Tk or matplotlib unless the
+# GUI is requested.
+
+
+def _tcp_address(source):
+    host, port = source[len("tcp://"):].rsplit(":", 1)
+    return host, int(port)
+
+
+def _price_source(args):
+    """
+    Return (source callable, number of ticks it can supply or None if unlimited,
+    GBMSimulator or None, running ingest.Ingestor to stop afterwards or None).
+    """
+    if args.source == "gbm":
+        from stock_simulation import GBMSimulator
+        simulator = GBMSimulator(seed=args.seed)
+        return simulator.next_price, None, simulator, None
+    if args.source.startswith("tcp://"):
+        from ingest import Ingestor, TCPFeed
+        ingestor = Ingestor([TCPFeed(*_tcp_address(args.source), symbols=[args.symbol])]).start()
+        return ingestor.source(args.symbol), None, None, ingestor
+    prices = _load(args)
+    return iter(prices).__next__, len(prices), None, None
+
+
+def _load(args):
+    """Prices of a file source, or of --symbol when the source is a TickStore directory."""
+    if os.path.isdir(args.source):
+        from store import TickStore
+        return TickStore(args.source).prices(args.symbol)
+    from ingest import load_prices
+    return load_prices(args.source)
+
+
+def _recorded(source, writer):
+    """Wrap a price source so every price it returns is also appended to a store.SymbolWriter."""
+    def next_price():
+        price = source()
+        if price is not None:
+            writer.append(price)
+        return price
+
+    return next_price
+
+
+def _history(args):
+    """Return the prices of the selected source as one array."""
+    if args.source == "gbm":
+        from stock_simulation import GBMSimulator
+        return GBMSimulator(seed=args.seed).fetch(args.ticks or args.default_ticks)[:, 0]
+    if args.source.startswith("tcp://"):
+        raise SystemExit("backtest needs a price file or the simulator as --source")
+    prices = _load(args)
+    return prices[:args.ticks] if args.ticks else prices
+
+
+def _run_pipeline(args, exporter=None, report_every=None):
+    """Run the threaded pipeline headless until args.ticks ticks (or the source) are exhausted."""
+    from buffers import RingBuffer
+    from pipeline import Pipeline
+
+    source, available, simulator, ingestor = _price_source(args)
+    ticks = args.ticks or available or args.default_ticks
+    if available is not None:
+        ticks = min(ticks, available)
+    # The feed keeps polling until the metrics stage has caught up; bounding
+    # the source stops it at exactly `ticks` prices
+    source = _bounded(source, ticks)
+    recorder = None
+    if getattr(args, "record", None):
+        from store import TickStore
+        recorder = TickStore(args.record)
+        source = _recorded(source, recorder.writer(args.symbol))
+
+    instruments = server = None
+    if args.instrument or args.metrics_port is not None:
+        from instrumentation import Instrumentation, serve_metrics
+        instruments = Instrumentation()
+        if args.metrics_port is not None:
+            server = serve_metrics(instruments, port=args.metrics_port)
+            print(f"Serving metrics on http://127.0.0.1:{server.server_address[1]}/metrics")
+
+    raw_prices, filtered_prices = RingBuffer(args.capacity), RingBuffer(args.capacity)
+    options = dict(feed_interval=args.interval, source=source, exporter=exporter, instruments=instruments,
+                   simulator=simulator)
+    checkpointer = None
+    if getattr(args, "checkpoint", None) and os.path.exists(args.checkpoint):
+        from checkpoint import resume
+        # Simulated prices continue where the checkpoint left off; other sources restart
+        pipeline = resume(args.checkpoint, raw_prices, filtered_prices, **options)
+        print(f"Resumed {len(raw_prices)} ticks from {args.checkpoint}")
+    else:
+        pipeline = Pipeline(args.order, args.window, args.decay, raw_prices, filtered_prices, **options)
+    if getattr(args, "checkpoint", None):
+        from checkpoint import Checkpointer
+        checkpointer = Checkpointer(pipeline, args.checkpoint, interval=args.checkpoint_interval)
+
+    start = last_report = time.perf_counter()
+    pipeline.start()
+    if checkpointer is not None:
+        checkpointer.start()
+    try:
+        while pipeline.metrics.processed < ticks:
+            if ingestor is not None and ingestor.finished and not ingestor.stats()["pending"].get(args.symbol):
+                break  # The stream ended or was lost; stop() drains the ticks in flight
+            time.sleep(0.01)
+            now = time.perf_counter()
+            if report_every and now - last_report >= report_every:
+                last_report = now
+                print(f"{pipeline.metrics.processed} ticks, success rate {pipeline.success_rate:.2f}%")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        pipeline.join()
+        if ingestor is not None:
+            ingestor.stop()
+        if checkpointer is not None:
+            checkpointer.stop()
+            try:
+                checkpointer.join()
+            except (OSError, TimeoutError, ValueError) as e:
+                print(f"Final checkpoint failed: {e}")
+        if server is not None:
+            server.shutdown()
+        if recorder is not None:
+            recorder.close()
+    elapsed = time.perf_counter() - start
+
+    if ingestor is not None and ingestor.error is not None:
+        print(f"Ingestion failed: {ingestor.error}")
+    processed = pipeline.metrics.processed
+    print(f"{processed} ticks in {elapsed:.2f}s ({processed / elapsed:.0f} ticks/s), "
+          f"success rate {pipeline.success_rate:.2f}%")
+    if instruments is not None:
+        from instrumentation import format_latency_report
+        print(format_latency_report(instruments.snapshot()))
+    return pipeline
+
+
+def _bounded(source, n):
+    """Wrap a finite source so calls past its n-th value return None (no new price) instead of raising."""
+    count = 0
+
+    def next_price():
+        nonlocal count
+        if count >= n:
+            return None
+        price = source()
+        if price is not None:  # Polled sources return None while no price has arrived
+            count += 1
+        return price
+
+    return next_price
+
+
+def cmd_run(args):
+    exporter = None
+    if args.export:
+        from export import open_writer
+        exporter = open_writer(args.export)
+    _run_pipeline(args, exporter, report_every=args.report_every)
+    if exporter is not None:
+        metrics = exporter.close()
+        print(f"{exporter.rows} ticks exported to {args.export}: {metrics}")
+    return 0
+
+
+def cmd_export(args):
+    from export import open_writer
+    exporter = open_writer(args.output)
+    _run_pipeline(args, exporter)
+    metrics = exporter.close()
+    print(f"{exporter.rows} ticks exported to {args.output}: {metrics}")
+    return 0
+
+
+def cmd_backtest(args):
+    import numpy as np
+    from backtest import backtest
+
+    prices = _history(args)
+    table = backtest(prices, args.orders, args.windows, args.decays, n_workers=args.workers)
+    table = np.sort(table, order="success_rate")[::-1]
+    for row in table[:args.top]:
+        print(f"order={row['lpc_order']:2d} window={row['window_size']:3d} decay={row['decay_factor']:.2f} "
+              f"success={row['success_rate']:.2f}% mse={row['mse']:.4f} mae={row['mae']:.4f}")
+    if args.output:
+        header = ",".join(table.dtype.names)
+        np.savetxt(args.output, table, delimiter=",", header=header, comments="", fmt="%s")
+        print(f"{len(table)} results saved to {args.output}")
+    return 0
+
+
+def cmd_bench(args):
+    from benchmarks import main as bench_main
+    return bench_main(args.bench_args or ["run", "--quick"])
+
+
+def cmd_serve(args):
+    import asyncio
+    from ingest import TickReplayServer
+
+    if args.source == "gbm":
+        from stock_simulation import GBMSimulator
+        prices = GBMSimulator(n_paths=args.symbols, seed=args.seed).fetch(args.ticks or args.default_ticks)
+    else:
+        prices = _load(args)[:args.ticks]
+
+    async def serve():
+        server = await TickReplayServer(prices, args.host, args.port, rate=args.rate).start()
+        print(f"Replaying {prices.size} ticks on tcp://{args.host}:{server.port}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_gui(args):
+    from gui import CreateGUI
+    CreateGUI()
+    return 0
+
+
+def _add_source(parser, ticks):
+    parser.add_argument("--source", default="gbm",
+                        help="'gbm' for the simulator, a .npy/.csv/.parquet price file, a tick store "
+                             "directory, or tcp://host:port of a tick replay server (default: gbm)")
+    parser.add_argument("--symbol", type=int, default=0, help="symbol to read from a tick store or tcp:// source")
+    parser.add_argument("--seed", type=int, default=None, help="simulator seed")
+    parser.add_argument("--ticks", type=int, default=None,
+                        help=f"number of ticks (default: whole file, or {ticks} simulated)")
+    parser.set_defaults(default_ticks=ticks)
+
+
+def _add_model(parser):
+    parser.add_argument("--order", type=int, default=10, help="LPC order")
+    parser.add_argument("--window", type=int, default=50, help="window size")
+    parser.add_argument("--decay", type=float, default=0.1, help="decay factor")
+    parser.add_argument("--interval", type=float, default=0.0,
+                        help="seconds between ticks, 0 runs as fast as possible (default: 0)")
+    parser.add_argument("--capacity", type=int, default=100_000, help="prices kept in memory")
+    parser.add_argument("--instrument", action="store_true", help="print per-stage latencies at the end")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve live metrics on this local port")
+    parser.add_argument("--checkpoint", help="resume from this .npz file if it exists, and save the session to it")
+    parser.add_argument("--checkpoint-interval", type=float, default=10.0, help="seconds between checkpoints")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stock-filter", description="Real-time LPC stock price prediction")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the predictor headless")
+    _add_source(run, ticks=10_000)
+    _add_model(run)
+    run.add_argument("--export", help="stream every tick to a .parquet/.arrow/.csv file")
+    run.add_argument("--record", help="append every price to this tick store directory under --symbol")
+    run.add_argument("--report-every", type=float, default=1.0, help="seconds between progress lines")
+    run.set_defaults(func=cmd_run)
+
+    backtest = commands.add_parser("backtest", help="walk-forward parameter sweep")
+    _add_source(backtest, ticks=50_000)
+    backtest.add_argument("--orders", type=int, nargs="+", default=[1, 5, 10, 15, 20])
+    backtest.add_argument("--windows", type=int, nargs="+", default=[50, 100, 200])
+    backtest.add_argument("--decays", type=float, nargs="+", default=[0.01, 0.1, 0.5, 1.0])
+    backtest.add_argument("--workers", type=int, default=None, help="processes (default: serial)")
+    backtest.add_argument("--top", type=int, default=10, help="best combinations to print")
+    backtest.add_argument("--output", help="save the full table as CSV")
+    backtest.set_defaults(func=cmd_backtest)
+
+    bench = commands.add_parser("bench", help="benchmark suite (arguments go to benchmarks.py)")
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench)
+
+    export = commands.add_parser("export", help="run the predictor and write the session to a file")
+    export.add_argument("output", help="output file ending in .parquet, .arrow or .csv")
+    _add_source(export, ticks=10_000)
+    _add_model(export)
+    export.set_defaults(func=cmd_export)
+
+    serve = commands.add_parser("serve", help="local TCP tick replay server for testing tcp:// sources")
+    _add_source(serve, ticks=100_000)
+    serve.add_argument("--symbols", type=int, default=1, help="simulated symbols")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=9000)
+    serve.add_argument("--rate", type=float, default=None, help="ticks per second per symbol (default: unpaced)")
+    serve.set_defaults(func=cmd_serve)
+
+    gui = commands.add_parser("gui", help="launch the Tk interface")
+    gui.set_defaults(func=cmd_gui)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,23 @@
 import pandas as pd
 import numpy as np
-from sklearn.metrics import mean_squared_error, mean_absolute_error
+from export import compute_metrics
+
+def save_summary_to_excel(metrics, filename="stock_summary.xlsx"):
+    # Only the analytics sheet; the tick data itself goes through export.open_writer
+    analytics_df = pd.DataFrame({"Metric": list(metrics), "Value": list(metrics.values())})
+    with pd.ExcelWriter(filename) as writer:
+        analytics_df.to_excel(writer, index=False, sheet_name="Analytics")
+
+    print(f"Analytics saved to {filename}")
 
 def save_to_excel(raw_prices, filtered_prices, filename="stock_data.xlsx"):
     # Ensure raw and filtered lists are the same length
     min_len = min(len(raw_prices), len(filtered_prices))
-    raw_prices = raw_prices[:min_len]
-    filtered_prices = filtered_prices[:min_len]
+    raw_prices = np.asarray(raw_prices[:min_len], dtype=float)
+    filtered_prices = np.asarray(filtered_prices[:min_len], dtype=float)
 
     # Calculate analytics
-    mse = mean_squared_error(raw_prices, filtered_prices)
-    mae = mean_absolute_error(raw_prices, filtered_prices)
-    correlation = np.corrcoef(raw_prices, filtered_prices)[0, 1]
+    metrics = compute_metrics(raw_prices, filtered_prices)
 
     # Create DataFrames
     data = {
@@ -20,8 +26,8 @@ def save_to_excel(raw_prices, filtered_prices, filename="stock_data.xlsx"):
         "Filtered Prices": filtered_prices,
     }
     analytics = {
-        "Metric": ["Mean Squared Error", "Mean Absolute Error", "Correlation"],
-        "Value": [mse, mae, correlation],
+        "Metric": list(metrics),
+        "Value": list(metrics.values()),
     }
 
     df = pd.DataFrame(data)
@@ -0,0 +1,316 @@
+import numpy as np
+
+FACTOR = 2  # Blocks of one level merged into one block of the next
+
+
+class _Column:
+    """
+    Growable array indexed by absolute position, with amortised O(1) growth.
+
+    Entries before `base` have been dropped; `end` is one past the last entry.
+    """
+
+    def __init__(self, dtype=np.float64, base=0):
+        self.data = np.empty(1024, dtype=dtype)
+        self.base = base
+        self.n = 0
+
+    @property
+    def end(self):
+        return self.base + self.n
+
+    def extend(self, values):
+        n = self.n + len(values)
+        if n > len(self.data):
+            data = np.empty(max(n, 2 * len(self.data)), dtype=self.data.dtype)
+            data[:self.n] = self.data[:self.n]
+            self.data = data
+        self.data[self.n:n] = values
+        self.n = n
+
+    def view(self, start, stop=None):
+        stop = self.end if stop is None else min(stop, self.end)
+        return self.data[max(start, self.base) - self.base:max(stop, self.base) - self.base]
+
+    def drop(self, upto):
+        """Drop the entries before position `upto`."""
+        shift = min(max(upto - self.base, 0), self.n)
+        self.data[:self.n - shift] = self.data[shift:self.n]
+        self.base += shift
+        self.n -= shift
+
+    def reset(self, base):
+        self.base, self.n = base, 0
+
+
+def _reduce(mins, maxs, min_first, factor):
+    """
+    Merge every `factor` consecutive blocks into one.
+
+    NaNs are ignored; a block of only NaNs stays NaN. min_first tells
+    whether a block's minimum comes before its maximum, so the decimated
+    line zig-zags in the same order as the data.
+    """
+    lo = np.where(np.isnan(mins), np.inf, mins).reshape(-1, factor)
+    hi = np.where(np.isnan(maxs), -np.inf, maxs).reshape(-1, factor)
+    rows = np.arange(len(lo))
+    i_min, i_max = lo.argmin(axis=1), hi.argmax(axis=1)
+    new_mins, new_maxs = lo[rows, i_min], hi[rows, i_max]
+    new_mins[np.isinf(new_mins)] = np.nan
+    new_maxs[np.isinf(new_maxs)] = np.nan
+    if min_first is None:  # Raw values: position decides
+        new_first = i_min <= i_max
+    else:
+        new_first = (i_min < i_max) | ((i_min == i_max) & min_first.reshape(-1, factor)[rows, i_min])
+    return new_mins, new_maxs, new_first
+
+
+class MinMaxPyramid:
+    """
+    Multi-resolution min/max summary of a growing price series.
+
+    Level 0 holds the prices, level k the minimum and maximum of every
+    block of factor**k prices. extend() completes blocks bottom-up as
+    prices arrive (amortised O(1) per price, vectorised per batch), and
+    query() reads any range from the coarsest level that still yields
+    about max_points points, so a frame costs the same for the last
+    hundred ticks as for a full day. The memory overhead over the raw
+    prices is about 17 / (factor - 1) bytes per price.
+
+    With a capacity, like a RingBuffer, only the most recent `capacity`
+    prices are kept. They are evicted a block of `block` prices at a time,
+    the size of the coarsest level, so every level drops whole blocks and
+    memory stays bounded however long the session runs. Positions are
+    absolute either way: tick i stays at x = i after older ticks are gone.
+
+    Parameters:
+        factor (int): Blocks merged per level. Must be > 1.
+        capacity (int): Most recent prices kept. Unbounded if None.
+    """
+
+    def __init__(self, factor=FACTOR, capacity=None):
+        if factor <= 1:
+            raise ValueError("Factor must be > 1")
+        self.factor = factor
+        self.capacity = capacity
+        self.block = None  # Eviction unit and coarsest block size, a power of factor
+        if capacity is not None:
+            self.block = factor
+            while self.block * factor <= capacity // 8:
+                self.block *= factor
+        self.values = _Column()
+        self.levels = []  # Level k + 1: (mins, maxs, min_first) columns
+
+    def __len__(self):
+        """Number of prices added so far, one past the last position."""
+        return self.values.end
+
+    @property
+    def start(self):
+        """Position of the oldest price still held."""
+        return self.values.base
+
+    @classmethod
+    def build(cls, values, factor=FACTOR):
+        """Pyramid of a whole series at once, e.g. TickStore.prices() of a symbol."""
+        pyramid = cls(factor)
+        pyramid.extend(values)
+        return pyramid
+
+    def skip_to(self, position):
+        """
+        Continue at `position`, leaving a NaN gap for the prices that were never added.
+
+        Used when the source has already evicted prices the pyramid has not seen.
+        """
+        gap = position - len(self)
+        if gap <= 0:
+            return
+        if self.capacity is not None and gap >= self.capacity:
+            # Nothing held would survive: restart at the last block boundary
+            base = position - position % self.block
+            self.values.reset(base)
+            for level, columns in enumerate(self.levels):
+                for column in columns:
+                    column.reset(base // self.factor ** (level + 1))
+            gap = position - base
+        self.extend(np.full(gap, np.nan))
+
+    def append(self, value):
+        self.extend(np.array([value], dtype=float))
+
+    def extend(self, values):
+        """Append prices and complete every block they finish."""
+        values = np.asarray(values, dtype=float).ravel()
+        if not len(values):
+            return
+        factor = self.factor
+        below = self.values
+        self.values.extend(values)
+        level = 0
+        while True:
+            # Blocks of this level that the new entries below have completed
+            done = below.end // factor
+            if level == len(self.levels):
+                if done == below.base // factor or (self.block is not None and factor ** (level + 1) > self.block):
+                    break
+                self.levels.append(tuple(_Column(dtype, below.base // factor) for dtype in (float, float, bool)))
+            mins, maxs, min_first = self.levels[level]
+            if done == mins.end:
+                break
+            start, stop = mins.end * factor, done * factor
+            if level == 0:
+                chunk = below.view(start, stop)
+                new = _reduce(chunk, chunk, None, factor)
+            else:
+                lower_mins, lower_maxs, lower_first = self.levels[level - 1]
+                new = _reduce(lower_mins.view(start, stop), lower_maxs.view(start, stop),
+                              lower_first.view(start, stop), factor)
+            for column, data in zip(self.levels[level], new):
+                column.extend(data)
+            below = mins
+            level += 1
+        if self.capacity is not None and len(self) - self.start > self.capacity:
+            self._evict(-(-(len(self) - self.capacity) // self.block) * self.block)
+
+    def _evict(self, position):
+        """Drop the prices before `position`, a multiple of block, and the blocks summarising them."""
+        self.values.drop(position)
+        for level, columns in enumerate(self.levels):
+            for column in columns:
+                column.drop(position // self.factor ** (level + 1))
+
+    def _gather(self, level, start, stop):
+        """Points covering ticks [start, stop) from `level`, finer levels filling the incomplete tail."""
+        if stop <= start:
+            return np.empty(0), np.empty(0)
+        if level == 0:
+            return np.arange(start, stop, dtype=float), self.values.view(start, stop)
+        size = self.factor ** level
+        mins, maxs, min_first = self.levels[level - 1]
+        first, last = start // size, min(-(-stop // size), mins.end)
+        if last <= first:
+            return self._gather(level - 1, start, stop)
+
+        # Two points per block at a quarter and three quarters of it, in the data's order
+        block_start = np.arange(first, last) * size
+        x = np.stack((block_start + size / 4, block_start + 3 * size / 4), axis=1).ravel()
+        lo, hi, order = mins.view(first, last), maxs.view(first, last), min_first.view(first, last)
+        y = np.stack((np.where(order, lo, hi), np.where(order, hi, lo)), axis=1).ravel()
+        tail_x, tail_y = self._gather(level - 1, max(start, last * size), stop)
+        return np.concatenate((x, tail_x)), np.concatenate((y, tail_y))
+
+    def level_for(self, span, max_points):
+        """Finest level that draws `span` ticks in at most about max_points points."""
+        if span <= max_points:
+            return 0
+        level = 1
+        while level < len(self.levels) and 2 * span / self.factor ** level > max_points:  # Two points per block
+            level += 1
+        return min(level, len(self.levels))
+
+    def query(self, start, stop, max_points=1000, method="minmax"):
+        """
+        Decimated points of ticks [start, stop).
+
+        Parameters:
+            start, stop (int): Absolute tick range, clipped to the ticks held.
+            max_points (int): Approximate number of points to return, e.g. the plot width in pixels.
+            method (str): "minmax" keeps every block's extremes, so spikes are never lost;
+                "lttb" reduces a finer level to max_points with largest-triangle-three-buckets.
+
+        Returns:
+            tuple: Tick positions (x) and prices (y) as float arrays.
+        """
+        start, stop = max(self.start, start), min(stop, len(self))
+        if method == "minmax":
+            return self._gather(self.level_for(stop - start, max_points), start, stop)
+        if method == "lttb":
+            x, y = self._gather(self.level_for(stop - start, 4 * max_points), start, stop)
+            return lttb(x, y, max_points)
+        raise ValueError(f"Unknown method '{method}', expected 'minmax' or 'lttb'")
+
+
+def minmax_decimate(y, n_bins):
+    """
+    Min/max decimation of a whole series into n_bins blocks, two points per block.
+
+    Returns:
+        tuple: Tick positions (x) and prices (y). NaN blocks stay NaN.
+    """
+    y = np.asarray(y, dtype=float)
+    if not len(y):
+        return np.empty(0), np.empty(0)
+    size = -(-len(y) // n_bins)
+    padded = np.concatenate((y, np.full(-len(y) % size, np.nan)))
+    mins, maxs, min_first = _reduce(padded, padded, None, size)
+    block_start = np.arange(len(mins)) * size
+    x = np.stack((block_start + size / 4, block_start + 3 * size / 4), axis=1).ravel()
+    values = np.stack((np.where(min_first, mins, maxs), np.where(min_first, maxs, mins)), axis=1).ravel()
+    return x, values
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-triangle-three-buckets downsampling.
+
+    Keeps the first and last points and, from each of n_out - 2 buckets,
+    the point forming the largest triangle with the point kept before it
+    and the mean of the next bucket. NaN points are dropped first.
+
+    Parameters:
+        x, y (numpy.ndarray): Points, x increasing.
+        n_out (int): Number of points to keep. Must be >= 3.
+
+    Returns:
+        tuple: Downsampled (x, y).
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    if n_out < 3:
+        raise ValueError("n_out must be >= 3")
+    if len(x) <= n_out:
+        return x, y
+
+    edges = np.linspace(1, len(x) - 1, n_out - 1).astype(int)  # Bucket boundaries of the inner points
+    # Mean of every bucket, and of the last point as the final "next bucket"
+    sums_x, sums_y = np.add.reduceat(x[1:-1], edges[:-1] - 1), np.add.reduceat(y[1:-1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, len(x) - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle area (previous point, candidate, next bucket mean)
+        area = np.abs((x[previous] - mean_x[i + 1]) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (mean_y[i + 1] - y[previous]))
+        previous = lo + int(area.argmax())
+        keep[i + 1] = previous
+    return x[keep], y[keep]
+
+
+if __name__ == "__main__":
+    import time
+    from stock_simulation import driftless_simulator
+
+    prices = driftless_simulator().fetch(2_000_000)[:, 0]
+    pyramid = MinMaxPyramid()
+    start = time.perf_counter()
+    for chunk in np.array_split(prices, 20_000):  # About one frame's worth of ticks per call
+        pyramid.extend(chunk)
+    print(f"{len(pyramid)} ticks added in {time.perf_counter() - start:.2f}s, {len(pyramid.levels)} levels")
+
+    for span in (500, 50_000, 2_000_000):
+        start = time.perf_counter()
+        x, y = pyramid.query(len(pyramid) - span, len(pyramid), max_points=1000)
+        elapsed = time.perf_counter() - start
+        window = prices[-span:]
+        exact = np.nanmin(y) == window.min() and np.nanmax(y) == window.max()
+        print(f"span {span:9d}: {len(x):5d} points in {elapsed * 1e6:6.0f} us, extremes kept: {exact}")
+
+    x, y = pyramid.query(0, len(pyramid), max_points=1000, method="lttb")
+    print(f"LTTB over the full history: {len(x)} points")
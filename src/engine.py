@@ -0,0 +1,152 @@
+import os
+import time
+import multiprocessing as mp
+from collections import deque
+import numpy as np
+from analysis import SlidingWindowBurg, ref_to_arcoeff
+from buffers import SharedRingBuffer
+from plot import apply_decay
+from stock_simulation import GBMSimulator
+
+CHUNK_TICKS = 1024  # Ticks of GBM prices fetched at once per shard
+
+
+def _run_shard(symbols, lpc_order, window_size, decay_factor, seed, buffer_names, n_rows, capacity, commands, results):
+    """
+    Worker process loop: owns the estimator state of its symbols and serves run requests.
+
+    Every symbol follows its own GBM path. Prices and predictions are written
+    to the shared ring buffers; only tick counts and timings go back through `results`.
+    """
+    prices = SharedRingBuffer(n_rows, capacity, name=buffer_names[0])
+    predictions = SharedRingBuffer(n_rows, capacity, name=buffer_names[1])
+    simulator = GBMSimulator(n_paths=len(symbols), seed=seed, chunk_size=CHUNK_TICKS)
+
+    window = max(window_size, lpc_order + 1)
+    estimators = [SlidingWindowBurg(lpc_order, window) for _ in symbols]
+    history = [deque(maxlen=lpc_order) for _ in symbols]
+
+    while True:
+        n_ticks = commands.get()
+        if n_ticks is None:
+            break
+
+        start = time.perf_counter()
+        for chunk_start in range(0, n_ticks, CHUNK_TICKS):
+            chunk = min(CHUNK_TICKS, n_ticks - chunk_start)
+            paths = simulator.fetch(chunk)
+
+            for t in range(chunk):
+                for i, symbol in enumerate(symbols):
+                    price = paths[t, i]
+                    coeffs = ref_to_arcoeff(estimators[i].update(price))
+                    history[i].append(price)
+
+                    # Same prediction rule as real_time_plot
+                    if len(history[i]) == lpc_order:
+                        prediction = -np.dot(apply_decay(coeffs, decay_factor), history[i])
+                    else:
+                        prediction = price
+
+                    prices.write(symbol, price)
+                    predictions.write(symbol, prediction)
+
+        results.put((n_ticks * len(symbols), time.perf_counter() - start))
+
+    prices.close()
+    predictions.close()
+
+
+class PredictionEngine:
+    """
+    Headless multi-symbol prediction engine.
+
+    Symbols are sharded over worker processes that keep their estimator
+    state between runs. Prices and predictions come back through shared
+    memory ring buffers, one row per symbol.
+
+    Parameters:
+        n_symbols (int): Number of simulated symbols.
+        n_workers (int): Number of worker processes. Defaults to the CPU count.
+        lpc_order (int): LPC order.
+        window_size (int): Number of recent prices each model is fitted over.
+        decay_factor (float): Decay applied to the LPC coefficients.
+        capacity (int): Number of prices/predictions kept per symbol.
+        seed (int): Seed of the first worker; worker i uses seed + i.
+    """
+
+    def __init__(self, n_symbols, n_workers=None, lpc_order=10, window_size=50, decay_factor=0.1,
+                 capacity=1024, seed=0):
+        n_workers = max(1, min(n_workers or os.cpu_count(), n_symbols))
+        self.n_symbols = n_symbols
+        self.prices = SharedRingBuffer(n_symbols, capacity)
+        self.predictions = SharedRingBuffer(n_symbols, capacity)
+        self.shards = np.array_split(np.arange(n_symbols), n_workers)
+
+        self._results = mp.Queue()
+        self._commands = [mp.Queue() for _ in self.shards]
+        self._workers = [
+            mp.Process(
+                target=_run_shard,
+                args=(shard.tolist(), lpc_order, window_size, decay_factor, seed + i,
+                      (self.prices.name, self.predictions.name), n_symbols, capacity,
+                      self._commands[i], self._results),
+                daemon=True,
+            )
+            for i, shard in enumerate(self.shards)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def run(self, n_ticks):
+        """
+        Advance every symbol by n_ticks and wait for all workers.
+
+        Returns:
+            dict: Total ticks, elapsed seconds, ticks per second overall and per core.
+        """
+        start = time.perf_counter()
+        for commands in self._commands:
+            commands.put(n_ticks)
+        stats = [self._results.get() for _ in self._workers]
+        elapsed = time.perf_counter() - start
+
+        ticks = sum(count for count, _ in stats)
+        busy = sum(seconds for _, seconds in stats)
+        return {
+            "ticks": ticks,
+            "elapsed": elapsed,
+            "workers": len(self._workers),
+            "ticks_per_second": ticks / elapsed,
+            "ticks_per_second_per_core": ticks / busy if busy > 0 else 0.0,
+        }
+
+    def latest(self, symbol, n=None):
+        """Return the last n (prices, predictions) of a symbol, oldest first."""
+        return self.prices.latest(symbol, n), self.predictions.latest(symbol, n)
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        for commands in self._commands:
+            commands.put(None)
+        for worker in self._workers:
+            worker.join()
+        self.prices.close()
+        self.predictions.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    with PredictionEngine(n_symbols=64) as engine:
+        stats = engine.run(500)
+        print(f"{stats['ticks']} ticks on {stats['workers']} workers in {stats['elapsed']:.2f}s")
+        print(f"Ticks/second: {stats['ticks_per_second']:.0f} "
+              f"({stats['ticks_per_second_per_core']:.0f} per core)")
+        prices, predictions = engine.latest(0, 5)
+        print(f"Symbol 0 prices: {prices}")
+        print(f"Symbol 0 predictions: {predictions}")
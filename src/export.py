@@ -0,0 +1,270 @@
+import os
+import queue
+import threading
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow export is optional
+    pa = None
+
+COLUMNS = [("time", np.int64), ("raw_price", np.float64), ("filtered_price", np.float64)]
+ROW_GROUP_SIZE = 65_536  # Rows buffered before a row group is handed to the writer thread
+
+
+def compute_metrics(raw_prices, filtered_prices):
+    """
+    Calculate prediction analytics with NumPy.
+
+    Parameters:
+        raw_prices (numpy.ndarray): Raw prices.
+        filtered_prices (numpy.ndarray): Filtered (predicted) prices. Rows with NaNs are ignored.
+
+    Returns:
+        dict: Mean squared error, mean absolute error and correlation.
+    """
+    stats = MetricSums()
+    stats.add(np.asarray(raw_prices, dtype=float), np.asarray(filtered_prices, dtype=float))
+    return stats.metrics()
+
+
+class MetricSums:
+    """
+    Mergeable sums for MSE, MAE and correlation.
+
+    Blocks are combined with the pairwise (Chan et al.) update, so metrics
+    over a whole session are exact without keeping the session in memory.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = self.mean_y = 0.0
+        self.m2_x = self.m2_y = self.c_xy = 0.0
+        self.squared_error = self.absolute_error = 0.0
+
+    def add(self, x, y):
+        """Fold one block of (raw, filtered) values in."""
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        n_b = len(x)
+        if n_b == 0:
+            return
+        mean_x, mean_y = x.mean(), y.mean()
+        dx, dy = x - mean_x, y - mean_y
+        error = x - y
+        self.squared_error += np.dot(error, error)
+        self.absolute_error += np.abs(error).sum()
+
+        n = self.n + n_b
+        delta_x, delta_y = mean_x - self.mean_x, mean_y - self.mean_y
+        self.m2_x += np.dot(dx, dx) + delta_x ** 2 * self.n * n_b / n
+        self.m2_y += np.dot(dy, dy) + delta_y ** 2 * self.n * n_b / n
+        self.c_xy += np.dot(dx, dy) + delta_x * delta_y * self.n * n_b / n
+        self.mean_x += delta_x * n_b / n
+        self.mean_y += delta_y * n_b / n
+        self.n = n
+
+    def metrics(self):
+        n = max(self.n, 1)
+        denominator = np.sqrt(self.m2_x * self.m2_y)
+        return {
+            "Mean Squared Error": self.squared_error / n,
+            "Mean Absolute Error": self.absolute_error / n,
+            "Correlation": self.c_xy / denominator if denominator > 0 else np.nan,
+        }
+
+
+class StreamWriter:
+    """
+    Append-only session writer that flushes row groups from a background thread.
+
+    Rows are buffered in preallocated arrays by the caller; every full row
+    group is handed to a writer thread through a bounded queue, so the
+    session never has to be held in memory and the caller only blocks if
+    the disk falls several row groups behind. Subclasses implement the
+    file format.
+
+    Parameters:
+        path (str): Output file.
+        row_group_size (int): Rows per flushed block.
+    """
+
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE):
+        self.path = path
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.stats = MetricSums()
+        self._columns = {name: np.empty(row_group_size, dtype=dtype) for name, dtype in COLUMNS}
+        self._fill = 0
+        self._queue = queue.Queue(maxsize=8)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_block(self, block):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+    def _run(self):
+        try:
+            self._open()
+            while True:
+                block = self._queue.get()
+                if block is None:
+                    break
+                self._write_block(block)
+                self.stats.add(block["raw_price"], block["filtered_price"])
+            self._close()
+        except Exception as e:  # Reported to the caller on close()
+            self._error = e
+            while self._queue.get() is not None:
+                pass
+
+    def _flush_buffer(self):
+        if self._fill:
+            self._queue.put({name: column[:self._fill].copy() for name, column in self._columns.items()})
+            self._fill = 0
+
+    def append(self, raw_price, filtered_price):
+        """Append one tick."""
+        fill = self._fill
+        self._columns["time"][fill] = self.rows
+        self._columns["raw_price"][fill] = raw_price
+        self._columns["filtered_price"][fill] = filtered_price
+        self._fill += 1
+        self.rows += 1
+        if self._fill == self.row_group_size:
+            self._flush_buffer()
+
+    def extend(self, raw_prices, filtered_prices):
+        """Append many ticks."""
+        raw_prices = np.asarray(raw_prices, dtype=float)
+        filtered_prices = np.asarray(filtered_prices, dtype=float)
+        start = 0
+        while start < len(raw_prices):
+            take = min(self.row_group_size - self._fill, len(raw_prices) - start)
+            fill = self._fill
+            self._columns["time"][fill:fill + take] = np.arange(self.rows, self.rows + take)
+            self._columns["raw_price"][fill:fill + take] = raw_prices[start:start + take]
+            self._columns["filtered_price"][fill:fill + take] = filtered_prices[start:start + take]
+            self._fill += take
+            self.rows += take
+            start += take
+            if self._fill == self.row_group_size:
+                self._flush_buffer()
+
+    def close(self):
+        """
+        Flush the remaining rows and wait for the writer thread.
+
+        Returns:
+            dict: Mean squared error, mean absolute error and correlation over all written rows.
+        """
+        self._flush_buffer()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.stats.metrics()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvWriter(StreamWriter):
+    """Plain-text CSV export, no extra dependencies."""
+
+    def _open(self):
+        self._file = open(self.path, "w")
+        self._file.write(",".join(name for name, _ in COLUMNS) + "\n")
+
+    def _write_block(self, block):
+        table = np.column_stack([block[name] for name, _ in COLUMNS])
+        np.savetxt(self._file, table, delimiter=",", fmt=["%d", "%.17g", "%.17g"])
+
+    def _close(self):
+        self._file.close()
+
+
+def _arrow_schema():
+    return pa.schema([(name, pa.from_numpy_dtype(np.dtype(dtype))) for name, dtype in COLUMNS])
+
+
+def _arrow_batch(block):
+    return pa.record_batch([pa.array(block[name]) for name, _ in COLUMNS], schema=_arrow_schema())
+
+
+class ParquetWriter(StreamWriter):
+    """Columnar Parquet export, one row group per flushed block. Requires pyarrow."""
+
+    def _open(self):
+        self._writer = pq.ParquetWriter(self.path, _arrow_schema())
+
+    def _write_block(self, block):
+        self._writer.write_batch(_arrow_batch(block))
+
+    def _close(self):
+        self._writer.close()
+
+
+class ArrowWriter(StreamWriter):
+    """Arrow IPC stream export. Requires pyarrow."""
+
+    def _open(self):
+        self._sink = pa.OSFile(self.path, "wb")
+        self._writer = pa_ipc.new_stream(self._sink, _arrow_schema())
+
+    def _write_block(self, block):
+        self._writer.write_batch(_arrow_batch(block))
+
+    def _close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+WRITERS = {
+    ".csv": CsvWriter,
+    ".parquet": ParquetWriter,
+    ".arrow": ArrowWriter,
+}
+
+
+def open_writer(path, row_group_size=ROW_GROUP_SIZE):
+    """
+    Create a streaming writer for `path`, choosing the format from its extension.
+
+    Parameters:
+        path (str): Output file ending in .csv, .parquet or .arrow.
+        row_group_size (int): Rows per flushed block.
+
+    Returns:
+        StreamWriter: Writer accepting append()/extend() until close().
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported export format '{extension}', expected one of {sorted(WRITERS)}")
+    writer = WRITERS[extension]
+    if writer is not CsvWriter and pa is None:
+        raise ImportError(f"pyarrow is required to export '{extension}' files")
+    return writer(path, row_group_size)
+
+
+# Example usage
+if __name__ == "__main__":
+    from stock_simulation import driftless_simulator
+
+    prices = driftless_simulator().fetch(1_000_000)[:, 0]
+    path = "stock_data.parquet" if pa is not None else "stock_data.csv"
+    with open_writer(path) as writer:
+        writer.extend(prices[1:], prices[:-1])
+    print(f"{writer.rows} rows exported to {path}: {writer.stats.metrics()}")
@@ -0,0 +1,176 @@
+import numpy as np
+from analysis import SlidingWindowBurg, arburg_vector, ref_to_arcoeff_ladder
+from buffers import RingBuffer
+
+# --------------------------------------------------------------
+# Multi-Order, Multi-Horizon Forecasts
+# --------------------------------------------------------------
+#
+# Burg is order-recursive: one lattice pass of order P yields the models of
+# every order 1..P (ref[:p]). The forecasts below run the AR recursion
+# x[n] = -sum_k a_k x[n - k] (the model gen_ts synthesises) for all of
+# those models at once, one horizon step at a time, so P models and H
+# horizons cost H small matrix-vector products instead of P refits.
+
+
+def forecast_ladder(ladder, past, horizon):
+    """
+    Iterated multi-step forecasts of several AR models from the same past.
+
+    Parameters:
+        ladder (numpy.ndarray): LPC coefficients, one zero-padded model per row. Shape: (models, P).
+        past (numpy.ndarray): At least P most recent values, oldest first.
+        horizon (int): Number of steps ahead.
+
+    Returns:
+        numpy.ndarray: Forecast of every model at every step, column h - 1 is h steps ahead.
+        Shape: (models, horizon).
+    """
+    n_models, order = ladder.shape
+    # Lagged values x[n - 1], x[n - 2], ... per model, newest first, extended by each forecast
+    lags = np.empty((n_models, order + horizon))
+    lags[:, horizon:] = np.asarray(past, dtype=float)[::-1][:order]
+    forecasts = np.empty((n_models, horizon))
+    for h in range(horizon):
+        step = horizon - h
+        forecasts[:, h] = -np.einsum('ij,ij->i', ladder, lags[:, step:step + order])
+        lags[:, step - 1] = forecasts[:, h]
+    return forecasts
+
+
+def forecast_orders(x, max_order, horizon):
+    """
+    Forecasts of every order 1..max_order and horizon 1..horizon from one Burg fit.
+
+    Parameters:
+        x (numpy.ndarray): Time series to fit and forecast, oldest first. Length must be > max_order.
+        max_order (int): Highest LPC order.
+        horizon (int): Number of steps ahead.
+
+    Returns:
+        numpy.ndarray: Row p - 1 holds the order-p forecasts. Shape: (max_order, horizon).
+    """
+    _, _, ref = arburg_vector(x, max_order)
+    return forecast_ladder(ref_to_arcoeff_ladder(ref), x[-max_order:], horizon)
+
+
+class EnsembleForecaster:
+    """
+    Streaming ensemble of AR models of every order 1..max_order, forecasting 1..horizon steps ahead.
+
+    Each update() pushes one price through a single SlidingWindowBurg
+    lattice of order max_order, derives all lower-order models from its
+    reflection coefficients and forecasts every horizon with
+    forecast_ladder(). Once the price a forecast was made for arrives, its
+    squared error is folded into an exponentially weighted MSE per
+    (order, horizon). The ensemble forecast of a horizon weights every
+    order by its inverse MSE, so models that have been accurate recently
+    dominate.
+
+    Parameters:
+        max_order (int): Highest LPC order. Must be > 0.
+        window_size (int): Window for the Burg fit. Must be > max_order.
+        horizon (int): Number of steps ahead forecast at every tick.
+        forgetting (float): Weight of the previous MSE in (0, 1); memory is roughly 1 / (1 - forgetting) ticks.
+    """
+
+    def __init__(self, max_order=10, window_size=50, horizon=5, forgetting=0.95):
+        if horizon <= 0:
+            raise ValueError("Horizon must be > 0")
+        if not 0 < forgetting < 1:
+            raise ValueError("Forgetting factor must be in (0, 1)")
+        self.max_order = max_order
+        self.horizon = horizon
+        self.forgetting = forgetting
+        self.estimator = SlidingWindowBurg(max_order, window_size)
+        self.recent = RingBuffer(max_order)
+        self.reset()
+
+    def reset(self):
+        """Forget all prices, forecasts and errors."""
+        self.estimator.reset()
+        self.recent = RingBuffer(self.max_order)
+        self.count = 0
+        self.forecasts = np.full((self.max_order, self.horizon), np.nan)  # Latest, (order, horizon)
+        # Forecasts of the last `horizon` ticks; slot t % horizon was made at tick t
+        self._issued = np.full((self.horizon, self.max_order, self.horizon), np.nan)
+        self.mse = np.zeros((self.max_order, self.horizon))
+        self.scored = np.zeros(self.horizon, dtype=np.int64)
+
+    def _score(self, price):
+        """Fold in the errors of every forecast that targeted this tick."""
+        t = self.count
+        steps = np.arange(1, self.horizon + 1)
+        issued = self._issued[(t - steps) % self.horizon, :, steps - 1].T  # (order, horizon)
+        valid = (t - steps >= 0) & ~np.isnan(issued[0])
+        if not valid.any():
+            return
+        errors = issued[:, valid] - price
+        first = self.scored[valid] == 0
+        mse = self.mse[:, valid]
+        mse = np.where(first, errors * errors, self.forgetting * mse + (1 - self.forgetting) * errors * errors)
+        self.mse[:, valid] = mse
+        self.scored[valid] += 1
+
+    def update(self, price):
+        """
+        Push one price and forecast the next `horizon` prices.
+
+        Parameters:
+            price (float): Newest price.
+
+        Returns:
+            numpy.ndarray: Ensemble forecast of every horizon, NaN until max_order prices
+            have been seen. Shape: (horizon,).
+        """
+        self._score(price)
+        ref = self.estimator.update(price)
+        self.recent.append(price)
+        slot = self.count % self.horizon
+        self.count += 1
+        if self.count < self.max_order:
+            self._issued[slot] = np.nan
+            return np.full(self.horizon, np.nan)
+
+        self.forecasts = forecast_ladder(ref_to_arcoeff_ladder(ref), self.recent.view(), self.horizon)
+        self._issued[slot] = self.forecasts
+        return self.ensemble()
+
+    @property
+    def weights(self):
+        """Inverse-MSE weight of every order per horizon, columns sum to 1. Shape: (max_order, horizon)."""
+        inverse = 1 / (self.mse + 1e-12)
+        unscored = self.scored == 0
+        inverse[:, unscored] = 1  # Equal weights until a horizon has been scored
+        return inverse / inverse.sum(axis=0)
+
+    def ensemble(self):
+        """Weighted forecast of every horizon from the latest forecasts. Shape: (horizon,)."""
+        return np.einsum('ph,ph->h', self.weights, self.forecasts)
+
+    def best_orders(self):
+        """Order with the lowest recent MSE for every horizon. Shape: (horizon,)."""
+        return np.argmin(self.mse, axis=0) + 1
+
+
+if __name__ == "__main__":
+    import time
+    from stock_simulation import driftless_simulator
+
+    prices = driftless_simulator().fetch(5_000)[:, 0]
+    x = prices[:200]
+    shared = forecast_orders(x, 20, 10)
+    refits = np.array([forecast_ladder(arburg_vector(x, p)[0][None, :], x[-p:], 10)[0] for p in range(1, 21)])
+    print(f"One lattice pass vs. 20 refits: max difference {np.abs(shared - refits).max():.1e}")
+
+    ensemble = EnsembleForecaster(max_order=20, window_size=100, horizon=10)
+    outputs = np.full((len(prices), 10), np.nan)
+    start = time.perf_counter()
+    for t, price in enumerate(prices):
+        outputs[t] = ensemble.update(price)
+    elapsed = time.perf_counter() - start
+    print(f"{len(prices) / elapsed:.0f} ticks/s, 200 forecasts per tick")
+    for h in (1, 5, 10):
+        error = outputs[1000:-h, h - 1] - prices[1000 + h:]
+        print(f"h={h:2d}: ensemble RMSE {np.sqrt(np.mean(error ** 2)):.4f}, "
+              f"best order {ensemble.best_orders()[h - 1]}")
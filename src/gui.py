@@ -1,20 +1,36 @@
 import tkinter as tk
-from tkinter import IntVar, DoubleVar
+from tkinter import IntVar, DoubleVar, BooleanVar, StringVar
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
+import os
 import threading
+import numpy as np
 from plot import real_time_plot  # Import the plotting function
-from convert_to_excel import save_to_excel  # Import the save function (Not currently functioning)
+from pipeline import Pipeline
+from buffers import RingBuffer
+from export import open_writer, pa
+from instrumentation import Instrumentation, format_latency_report
+from checkpoint import Checkpointer, load_checkpoint, resume
 
 # Global variables
-plot_running = False  # Flag to control the plotting thread
-raw_prices = []  # List to store raw prices
-filtered_prices = []  # List to store filtered prices
+plot_running = False  # Flag to control the pipeline and render loop
+pipeline = None  # Feed -> estimator -> metrics pipeline of the current run
+quality = None  # Prediction metrics, kept across stop/start
+checkpointer = None  # Saves the current run in the background
+stopping = None  # Thread tearing the previous run down (pipeline drain and final checkpoint)
+saved_session = None  # Checkpoint found at startup, resumed by the first start
+CHECKPOINT_PATH = "session_checkpoint.npz"  # Written periodically and on stop
+MAX_ORDER = 20  # Highest order on the slider; the lattice is fitted at it so order changes need no refit
+STATUS_INTERVAL_MS = 500  # Refresh period of the latency panel
+STOP_POLL_MS = 50  # How often Start / New Session check whether the previous run has shut down
+PRICE_CAPACITY = 100_000  # Most recent prices kept in memory
+raw_prices = RingBuffer(PRICE_CAPACITY)  # Ring buffer of raw prices
+filtered_prices = RingBuffer(PRICE_CAPACITY)  # Ring buffer of filtered prices
 
 
 def CreateGUI():
     """Create the main GUI for real-time stock price prediction."""
-    global plot_running
+    global plot_running, saved_session
 
     # Initialize the main window
     root = tk.Tk()
@@ -30,7 +46,7 @@ def CreateGUI():
     tk.Label(control_frame, text="LPC Order").grid(row=0, column=0, columnspan=2, pady=5)
     lpc_order = IntVar(value=10)
     tk.Scale(
-        control_frame, from_=1, to=20, orient="horizontal", variable=lpc_order,
+        control_frame, from_=1, to=MAX_ORDER, orient="horizontal", variable=lpc_order,
         command=lambda _: slider_changed()
     ).grid(row=1, column=0, columnspan=2, pady=5)
 
@@ -52,6 +68,19 @@ def CreateGUI():
 
     # SLIDERS END
 
+    # Resume the previous session (buffers, metrics, model and simulator position) on the first start
+    if os.path.exists(CHECKPOINT_PATH):
+        try:
+            saved_session = load_checkpoint(CHECKPOINT_PATH)
+        except (OSError, ValueError) as e:
+            print(f"Could not load '{CHECKPOINT_PATH}': {e}")
+        else:
+            order, window, decay = saved_session["estimator/params"].tolist()
+            lpc_order.set(int(order))
+            window_size.set(int(window))
+            decay_factor.set(decay)
+            print(f"Resuming session from '{CHECKPOINT_PATH}'")
+
     # Plot Frame (Right Panel)
     plot_frame = tk.Frame(root)
     plot_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
@@ -62,40 +91,119 @@ def CreateGUI():
 
     # Start Plotting
     def start_plot():
-        global plot_running, raw_prices, filtered_prices
+        global plot_running
         if not plot_running:
             plot_running = True
-            if not raw_prices:  # Clear prices only if the thread is not running
-                raw_prices.clear()
-                filtered_prices.clear()
-            threading.Thread(
-                target=real_time_plot,
-                args=(lpc_order, window_size, decay_factor, fig, ax, canvas, lambda: plot_running, raw_prices, filtered_prices),
-                daemon=True
-            ).start()
+            when_stopped(launch)  # The final checkpoint reads the shared buffers
+
+    def launch():
+        global pipeline, quality, checkpointer, saved_session
+        if plot_running:  # Still wanted once the previous run has shut down
+            instruments = Instrumentation() if instrumented.get() else None
+            # Slider values are read here, on the Tk thread, and handed to the pipeline
+            if saved_session is not None:
+                pipeline = resume(saved_session, raw_prices, filtered_prices, instruments=instruments,
+                                  max_order=MAX_ORDER)
+                pipeline.configure(lpc_order=lpc_order.get(), window_size=window_size.get(),
+                                   decay_factor=decay_factor.get())
+                saved_session = None
+            else:
+                pipeline = Pipeline(
+                    lpc_order.get(), window_size.get(), decay_factor.get(), raw_prices, filtered_prices,
+                    instruments=instruments, quality=quality, max_order=MAX_ORDER,
+                )
+            pipeline.start()
+            quality = pipeline.quality
+            checkpointer = Checkpointer(pipeline, CHECKPOINT_PATH).start()
+            run = pipeline
+            real_time_plot(run, fig, ax, canvas, lambda: run.running, raw_prices, filtered_prices)
+
+    def when_stopped(callback):
+        """Run callback on the Tk thread once the previous run has shut down, polling instead of blocking."""
+        if stopping is not None and stopping.is_alive():
+            root.after(STOP_POLL_MS, when_stopped, callback)
+        else:
+            callback()
+
+    def shut_down(run, saver, save):
+        """Drain a stopped pipeline and wait for its final checkpoint; runs off the Tk thread."""
+        run.join(timeout=1)
+        saver.stop(final=save)
+        try:
+            saver.join()
+        except (OSError, TimeoutError, ValueError) as e:
+            print(f"Final checkpoint failed: {e}")
 
     # Stop Plotting
-    def stop_plot():
-        global plot_running
+    def stop_plot(save=True):
+        global plot_running, stopping
         plot_running = False
-
-    # Save Data to Excel
+        if pipeline is not None and pipeline.running:
+            pipeline.stop()
+            stopping = threading.Thread(target=shut_down, args=(pipeline, checkpointer, save), daemon=True)
+            stopping.start()
+
+    # New Session: stop without saving, delete the checkpoint and start over on the next start
+    def new_session():
+        stop_plot(save=False)
+        when_stopped(reset_session)
+
+    def reset_session():
+        global raw_prices, filtered_prices, quality, saved_session
+        if os.path.exists(CHECKPOINT_PATH):
+            os.remove(CHECKPOINT_PATH)
+        raw_prices, filtered_prices = RingBuffer(PRICE_CAPACITY), RingBuffer(PRICE_CAPACITY)
+        quality = saved_session = None
+        print("Starting a new session on the next start")
+
+    # Save Data (Parquet when pyarrow is available, CSV otherwise)
     def save_data():
         if raw_prices and filtered_prices:
-            save_to_excel(raw_prices, filtered_prices, "stock_analysis.xlsx")
-            print("Data saved to 'stock_analysis.xlsx'")
+            filename = "stock_analysis.parquet" if pa is not None else "stock_analysis.csv"
+            # Snapshot on the Tk thread, write in the background so the UI never blocks
+            raw, filtered = np.array(raw_prices.view()), np.array(filtered_prices.view())
+            n = min(len(raw), len(filtered))
+            raw, filtered = raw[len(raw) - n:], filtered[len(filtered) - n:]
+
+            def export():
+                with open_writer(filename) as writer:
+                    writer.extend(raw, filtered)
+                print(f"Data saved to '{filename}': {writer.stats.metrics()}")
+
+            threading.Thread(target=export, daemon=True).start()
         else:
             print("No data to save. Please start and stop the plot first.")
 
     # Control Buttons
     tk.Button(control_frame, text="Start Plotting", command=start_plot).grid(row=6, column=0, columnspan=2, pady=5)
     tk.Button(control_frame, text="Stop Plotting", command=stop_plot).grid(row=7, column=0, columnspan=2, pady=5)
-    # tk.Button(control_frame, text="Save Data to Excel", command=save_data).grid(row=8, column=0, columnspan=2, pady=5)
+    tk.Button(control_frame, text="Save Data", command=save_data).grid(row=8, column=0, columnspan=2, pady=5)
+    tk.Button(control_frame, text="New Session", command=new_session).grid(row=9, column=0, columnspan=2, pady=5)
+
+    # Latency Panel: per-stage p50/p99/max and ticks per second of the current run
+    instrumented = BooleanVar(value=True)
+    tk.Checkbutton(control_frame, text="Instrumentation", variable=instrumented).grid(
+        row=10, column=0, columnspan=2, pady=5
+    )
+    latency_text = StringVar(value="")
+    tk.Label(control_frame, textvariable=latency_text, justify="left", font=("Courier", 9)).grid(
+        row=11, column=0, columnspan=2, pady=5, sticky="w"
+    )
+
+    def refresh_latency():
+        if pipeline is not None and pipeline.instruments is not None:
+            latency_text.set(format_latency_report(pipeline.instruments.snapshot()))
+        root.after(STATUS_INTERVAL_MS, refresh_latency)
+
+    refresh_latency()
 
     # Slider Change Handler
     def slider_changed():
-        """Stop the plot when sliders are adjusted."""
-        stop_plot()
+        """Retune the running pipeline; the new values apply from its next tick."""
+        if plot_running and pipeline is not None:
+            pipeline.configure(
+                lpc_order=lpc_order.get(), window_size=window_size.get(), decay_factor=decay_factor.get()
+            )
 
     # Start the GUI event loop
     root.mainloop()
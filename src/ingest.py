@@ -0,0 +1,542 @@
+import time
+import queue
+import struct
+import asyncio
+import threading
+from collections import deque
+import numpy as np
+
+# Ticks travel as packed little-endian records, so a whole batch is decoded
+# with one np.frombuffer() call instead of parsing tick by tick.
+TICK_DTYPE = np.dtype([("time", "<i8"), ("symbol", "<i4"), ("price", "<f8")])
+HEADER = struct.Struct("<I")  # Number of ticks in the frame that follows
+BATCH_SIZE = 256               # Ticks per frame / batch
+QUEUE_SIZE = 65_536            # Ticks buffered per symbol before the oldest are dropped
+FLUSH_INTERVAL = 1.0           # Seconds between two flushes of an ingestor's tick store
+
+
+def make_ticks(prices, symbols, times=None):
+    """
+    Build a tick batch.
+
+    Parameters:
+        prices (numpy.ndarray): Prices. Shape: (n,).
+        symbols (int or numpy.ndarray): Symbol id, one for all or one per tick.
+        times (numpy.ndarray): Timestamps in ns. Defaults to now for every tick.
+
+    Returns:
+        numpy.ndarray: Structured array of TICK_DTYPE.
+    """
+    ticks = np.empty(len(prices), dtype=TICK_DTYPE)
+    ticks["time"] = time.time_ns() if times is None else times
+    ticks["symbol"] = symbols
+    ticks["price"] = prices
+    return ticks
+
+
+def encode_frame(ticks):
+    """Serialise a tick batch as a length-prefixed frame."""
+    return HEADER.pack(len(ticks)) + np.ascontiguousarray(ticks, dtype=TICK_DTYPE).tobytes()
+
+
+def decode_frame(payload):
+    """Decode the payload of a frame into a read-only tick batch without copying."""
+    return np.frombuffer(payload, dtype=TICK_DTYPE)
+
+
+async def read_frame(reader):
+    """
+    Read one frame from a stream.
+
+    Returns None at the end of the stream, which the server marks with an
+    empty frame. A connection that closes before that raises
+    ConnectionResetError, so the caller can tell a lost connection from
+    the end of the replay.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+        (count,) = HEADER.unpack(header)
+        if count == 0:
+            return None
+        return decode_frame(await reader.readexactly(count * TICK_DTYPE.itemsize))
+    except asyncio.IncompleteReadError as e:
+        raise ConnectionResetError("Connection closed before the end of the stream") from e
+
+
+# --------------------------------------------------------------
+# Feed Adapters
+# --------------------------------------------------------------
+
+class Feed:
+    """
+    Asynchronous source of tick batches.
+
+    Subclasses implement batches(), an async generator of TICK_DTYPE arrays.
+    """
+
+    def batches(self):
+        raise NotImplementedError
+
+    def __aiter__(self):
+        return self.batches()
+
+
+class ReplayFeed(Feed):
+    """
+    Replays stored prices of one symbol.
+
+    Parameters:
+        prices (numpy.ndarray or str): Prices, or a .npy/.csv/.parquet file read with load_prices().
+        symbol (int): Symbol id of the replayed ticks.
+        rate (float): Ticks per second. None replays as fast as the consumer takes them.
+        batch_size (int): Ticks per batch.
+    """
+
+    def __init__(self, prices, symbol=0, rate=None, batch_size=BATCH_SIZE):
+        self.prices = load_prices(prices) if isinstance(prices, str) else np.asarray(prices, dtype=float)
+        self.symbol = symbol
+        self.rate = rate
+        self.batch_size = batch_size
+
+    async def batches(self):
+        for start in range(0, len(self.prices), self.batch_size):
+            chunk = self.prices[start:start + self.batch_size]
+            yield make_ticks(chunk, self.symbol)
+            await asyncio.sleep(len(chunk) / self.rate if self.rate else 0)
+
+
+class GBMFeed(Feed):
+    """
+    Simulated ticks of every path of a GBMSimulator, path i being symbol i.
+
+    Parameters:
+        simulator (stock_simulation.GBMSimulator): Price source.
+        rate (float): Ticks per second per symbol. None runs as fast as the consumer allows.
+        batch_size (int): Ticks per symbol and batch.
+        n_ticks (int): Ticks per symbol before the feed ends. Endless if None.
+    """
+
+    def __init__(self, simulator, rate=None, batch_size=BATCH_SIZE, n_ticks=None):
+        self.simulator = simulator
+        self.rate = rate
+        self.batch_size = batch_size
+        self.n_ticks = n_ticks
+
+    async def batches(self):
+        n_paths = self.simulator.n_paths
+        sent = 0
+        while self.n_ticks is None or sent < self.n_ticks:
+            n = self.batch_size if self.n_ticks is None else min(self.batch_size, self.n_ticks - sent)
+            prices = self.simulator.fetch(n)  # (n, n_paths)
+            yield make_ticks(prices.ravel(), np.tile(np.arange(n_paths), n))
+            sent += n
+            await asyncio.sleep(n / self.rate if self.rate else 0)
+
+
+class TCPFeed(Feed):
+    """
+    Ticks streamed by a TickReplayServer (or any server speaking its framing).
+
+    The subscribed symbols are spread over a pool of `connections`
+    concurrent connections. A dropped connection is reopened with backoff
+    and resubscribes from the timestamp of the last tick it received, so
+    no tick is delivered twice. A connection that still fails after
+    `retries` consecutive attempts raises ConnectionError from batches().
+
+    Parameters:
+        host (str), port (int): Server address.
+        symbols (list): Symbol ids to subscribe to. All symbols if None (one connection).
+        connections (int): Size of the connection pool.
+        retries (int): Consecutive reconnection attempts per connection before giving up.
+    """
+
+    def __init__(self, host, port, symbols=None, connections=1, retries=5):
+        self.host = host
+        self.port = port
+        self.symbols = symbols
+        self.connections = connections if symbols is not None else 1
+        self.retries = retries
+
+    async def _stream(self, symbols, out):
+        subscription = "*" if symbols is None else ",".join(str(s) for s in symbols)
+        last_time = None  # Timestamp of the last tick received; a reconnect resumes after it
+        delay, failures = 0.1, 0
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                error = e
+            else:
+                try:
+                    resume = "" if last_time is None else f" {last_time}"
+                    writer.write(f"SUB {subscription}{resume}\n".encode())
+                    await writer.drain()
+                    while True:
+                        batch = await read_frame(reader)
+                        if batch is None:
+                            return  # Server ended the stream
+                        last_time = int(batch["time"][-1])
+                        delay, failures = 0.1, 0
+                        await out.put(batch)
+                except OSError as e:  # Includes a connection lost mid-stream
+                    error = e
+                finally:
+                    writer.close()
+            failures += 1
+            if failures > self.retries:
+                raise ConnectionError(f"Lost {self.host}:{self.port} after {self.retries} retries") from error
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, 5.0)
+
+    async def batches(self):
+        out = asyncio.Queue(maxsize=64)
+        shards = [None] if self.symbols is None else [
+            list(shard) for shard in np.array_split(np.asarray(self.symbols), self.connections) if len(shard)
+        ]
+        tasks = [asyncio.create_task(self._stream(shard, out)) for shard in shards]
+        done = asyncio.gather(*tasks)
+        try:
+            while not (done.done() and out.empty()):
+                try:
+                    yield await asyncio.wait_for(out.get(), timeout=0.1)
+                except asyncio.TimeoutError:
+                    continue
+            done.result()  # Raises the error of a connection that gave up
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class TickReplayServer:
+    """
+    Local TCP server replaying prices as framed tick batches, for offline testing.
+
+    Every client sends one line "SUB <ids> [<from_ns>]" (ids comma separated,
+    "*" or empty for all) and then receives the replay of those symbols,
+    from the start or from the first tick after timestamp from_ns, followed
+    by an empty frame marking the end. Tick i is stamped start + i * interval
+    for the server's lifetime, so a client that reconnects resumes where it
+    stopped. Without a rate the ticks are 1 ns apart.
+
+    Parameters:
+        prices (numpy.ndarray): Prices, one column per symbol. Shape: (n, n_symbols).
+        host (str): Interface to bind to.
+        port (int): TCP port. 0 picks a free one (see the port attribute after start()).
+        rate (float): Ticks per second per symbol. None streams as fast as the client reads.
+        batch_size (int): Ticks per symbol and frame.
+    """
+
+    def __init__(self, prices, host="127.0.0.1", port=0, rate=None, batch_size=BATCH_SIZE):
+        prices = np.asarray(prices, dtype=float)
+        self.prices = prices[:, None] if prices.ndim == 1 else prices
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.batch_size = batch_size
+        self.interval_ns = int(1e9 / rate) if rate else 1
+        self.start_ns = time.time_ns()
+        self.server = None
+
+    async def _serve(self, reader, writer):
+        try:
+            fields = (await reader.readline()).decode().split()
+            ids = fields[1] if len(fields) > 1 and fields[0] == "SUB" else "*"
+            symbols = np.array(range(self.prices.shape[1]) if ids == "*" else [int(s) for s in ids.split(",")])
+            first = 0
+            if len(fields) > 2:  # Resume after the tick stamped from_ns
+                first = max(0, (int(fields[2]) - self.start_ns) // self.interval_ns + 1)
+            for start in range(first, len(self.prices), self.batch_size):
+                block = self.prices[start:start + self.batch_size, symbols]
+                n = len(block)
+                times = self.start_ns + (start + np.repeat(np.arange(n), len(symbols))) * self.interval_ns
+                writer.write(encode_frame(make_ticks(block.ravel(), np.tile(symbols, n), times)))
+                await writer.drain()
+                if self.rate:
+                    await asyncio.sleep(n / self.rate)
+            writer.write(encode_frame(make_ticks([], 0)))  # End of stream
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.start_ns = time.time_ns()
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+# --------------------------------------------------------------
+# Ingestion
+# --------------------------------------------------------------
+
+class TickQueue:
+    """
+    Bounded queue of one symbol's prices, filled a whole slice at a time.
+
+    put() takes an array of prices under one lock acquisition; get() hands
+    them out one by one. When more than maxsize prices are pending the
+    oldest are dropped, so producers never wait.
+
+    Parameters:
+        maxsize (int): Prices kept before the oldest are dropped.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._slices = deque()
+        self._head = 0  # Prices of the first slice already handed out
+        self._size = 0
+        self._ready = threading.Condition()
+
+    def put(self, prices):
+        """
+        Append a slice of prices.
+
+        Returns:
+            int: Number of old prices dropped to make room.
+        """
+        prices = np.asarray(prices, dtype=float).tolist()
+        if not prices:
+            return 0
+        with self._ready:
+            self._slices.append(prices)
+            self._size += len(prices)
+            excess = max(self._size - self.maxsize, 0)
+            dropped = excess
+            while excess:
+                left = len(self._slices[0]) - self._head
+                if left <= excess:
+                    self._slices.popleft()
+                    self._head = 0
+                    excess -= left
+                else:
+                    self._head += excess
+                    excess = 0
+            self._size -= dropped
+            self._ready.notify()
+        return dropped
+
+    def get(self, timeout=None):
+        """Return the oldest pending price, raising queue.Empty if none arrives within timeout seconds."""
+        with self._ready:
+            if not self._size and not self._ready.wait_for(lambda: self._size, timeout):
+                raise queue.Empty
+            first = self._slices[0]
+            price = first[self._head]
+            self._head += 1
+            if self._head == len(first):
+                self._slices.popleft()
+                self._head = 0
+            self._size -= 1
+        return price
+
+    def qsize(self):
+        """Number of pending prices."""
+        return self._size
+
+
+class Ingestor:
+    """
+    Runs feeds on an asyncio event loop in a background thread and hands
+    their ticks to consumer threads.
+
+    Decoded ticks are routed into bounded per-symbol TickQueues, one slice
+    per symbol and batch. Producers never wait for consumers: when a queue
+    is full its oldest ticks are dropped and counted. source(symbol) returns a callable that plugs into
+    pipeline.Pipeline as its price source.
+
+    Parameters:
+        feeds (list): Feed instances consumed concurrently.
+        queue_size (int): Ticks buffered per symbol.
+        store (store.TickStore): Records every ingested tick when given.
+        flush_interval (float): Seconds between two flushes of the store. Flushes
+            run in an executor, so file I/O never stalls the feeds on the event loop.
+    """
+
+    def __init__(self, feeds, queue_size=QUEUE_SIZE, store=None, flush_interval=FLUSH_INTERVAL):
+        self.feeds = list(feeds)
+        self.queue_size = queue_size
+        self.store = store
+        self.flush_interval = flush_interval
+        self.queues = {}
+        self.ticks = 0
+        self.dropped = 0
+        self.latency = 0.0  # Moving average of exchange-to-ingest delay, seconds
+        self.error = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._stop = None
+        self._thread = None
+        self._start_time = None
+
+    def _queue(self, symbol):
+        q = self.queues.get(symbol)
+        if q is None:
+            with self._lock:
+                q = self.queues.setdefault(symbol, TickQueue(self.queue_size))
+        return q
+
+    def publish(self, batch):
+        """Route one tick batch into the per-symbol queues."""
+        if not len(batch):
+            return
+        self.latency = 0.9 * self.latency + 0.1 * (time.time_ns() - batch["time"][-1]) / 1e9
+        if self.store is not None:
+            self.store.append_ticks(batch)  # Buffered; flushed by _flush()
+        # Group the batch by symbol (stable, so each symbol keeps its tick
+        # order) and hand every symbol its slice in one put()
+        order = np.argsort(batch["symbol"], kind="stable")
+        symbols = batch["symbol"][order]
+        prices = batch["price"][order]
+        starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(symbols)]):
+            self.dropped += self._queue(int(symbols[start])).put(prices[start:end])
+        self.ticks += len(batch)
+
+    async def _consume(self, feed):
+        async for batch in feed:
+            self.publish(batch)
+            if self._stop.is_set():
+                break
+
+    async def _flush(self):
+        """Flush the store every flush_interval seconds from the default executor."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._loop.run_in_executor(None, self.store.flush)
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        consumers = asyncio.gather(*(self._consume(feed) for feed in self.feeds))
+        stopper = asyncio.ensure_future(self._stop.wait())
+        flusher = asyncio.ensure_future(self._flush()) if self.store is not None else None
+        try:
+            await asyncio.wait([consumers, stopper], return_when=asyncio.FIRST_COMPLETED)
+            consumers.cancel()
+            stopper.cancel()
+            try:
+                await consumers
+            except asyncio.CancelledError:
+                pass
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+                try:
+                    await flusher
+                except asyncio.CancelledError:
+                    pass
+                self.store.flush()  # The loop is done with the store; flush what is left
+
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as e:  # Reported through the error attribute
+            self.error = e
+
+    def start(self):
+        """Start the event loop thread."""
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="ingest", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop all feeds and wait for the event loop to finish."""
+        while self._thread.is_alive() and self._loop is None:
+            time.sleep(0.001)
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join()
+
+    @property
+    def finished(self):
+        """True once every feed has ended (or the ingestor was stopped)."""
+        return self._thread is not None and not self._thread.is_alive()
+
+    def source(self, symbol=0, timeout=0.1):
+        """
+        Return a price source for pipeline.FeedStage.
+
+        The callable returns the next price of `symbol`, or None if none
+        arrived within `timeout` seconds.
+        """
+        q = self._queue(symbol)
+
+        def next_price():
+            try:
+                return q.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+        return next_price
+
+    def stats(self):
+        """Return ingested and dropped tick counts, ticks per second and the mean feed delay."""
+        elapsed = time.perf_counter() - self._start_time if self._start_time is not None else 0.0
+        return {
+            "ticks": self.ticks,
+            "dropped": self.dropped,
+            "ticks_per_second": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": self.latency * 1000,
+            "pending": {symbol: q.qsize() for symbol, q in list(self.queues.items())},
+        }
+
+
+def load_prices(path):
+    """
+    Read a price series from a file.
+
+    .npy files are memory-mapped. CSV and Parquet files written by
+    export.open_writer() are read from their raw_price column; other CSV
+    files from their first column.
+
+    Parameters:
+        path (str): File ending in .npy, .csv or .parquet.
+
+    Returns:
+        numpy.ndarray: Prices.
+    """
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=["raw_price"]).column("raw_price").to_numpy()
+    with open(path) as f:
+        header = f.readline().strip().split(",")
+    if "raw_price" in header:
+        return np.loadtxt(path, delimiter=",", skiprows=1, usecols=header.index("raw_price"), ndmin=1)
+    try:
+        float(header[0])
+        skip = 0
+    except ValueError:
+        skip = 1
+    return np.loadtxt(path, delimiter=",", skiprows=skip, usecols=0, ndmin=1)
+
+
+if __name__ == "__main__":
+    from stock_simulation import GBMSimulator
+
+    # Replay 8 symbols through a local TCP server over a pool of 4 connections
+    prices = GBMSimulator(n_paths=8, seed=0).fetch(50_000)
+    server = TickReplayServer(prices)
+
+    async def start_server():
+        await server.start()
+        await asyncio.Event().wait()  # Serve until the process exits
+
+    threading.Thread(target=asyncio.run, args=(start_server(),), daemon=True).start()
+    while server.server is None:
+        time.sleep(0.01)
+
+    ingestor = Ingestor([TCPFeed("127.0.0.1", server.port, symbols=range(8), connections=4)]).start()
+    while not ingestor.finished:
+        time.sleep(0.1)
+    stats = ingestor.stats()
+    print(f"{stats['ticks']} ticks at {stats['ticks_per_second']:.0f} ticks/s, {stats['dropped']} dropped")
@@ -0,0 +1,245 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+SUB_BUCKET_BITS = 5  # 2**5 linear sub-buckets per power of two, about 3% relative precision
+MAX_SHIFT = 40       # Values up to 2**45 ns (about 10 hours) are resolved; larger ones are clamped
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of latencies.
+
+    Values are recorded in nanoseconds into buckets that are linear below
+    2**SUB_BUCKET_BITS and split every further power of two into
+    2**(SUB_BUCKET_BITS - 1) equal parts, so percentiles keep a constant
+    relative precision at a fixed, small memory cost. record() is O(1)
+    and never allocates. Each histogram is meant to have a single writer.
+    """
+
+    def __init__(self):
+        self._linear = 1 << SUB_BUCKET_BITS
+        self._half = self._linear >> 1
+        self.counts = [0] * (self._linear + MAX_SHIFT * self._half)
+        self.reset()
+
+    def reset(self):
+        """Drop all recorded values."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0  # Seconds
+        self.max = 0.0    # Seconds
+
+    def _index(self, ns):
+        if ns < self._linear:
+            return ns
+        shift = min(ns.bit_length() - SUB_BUCKET_BITS, MAX_SHIFT)
+        top = min(ns >> shift, self._linear - 1)
+        return self._linear + (shift - 1) * self._half + top - self._half
+
+    def _upper(self, index):
+        """Largest value in nanoseconds that falls into bucket `index`."""
+        if index < self._linear:
+            return index
+        shift, offset = divmod(index - self._linear, self._half)
+        return ((offset + self._half + 1) << (shift + 1)) - 1
+
+    def record(self, seconds):
+        """Add one latency in seconds."""
+        self.counts[self._index(max(0, int(seconds * 1e9)))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """
+        Return the q-th percentile in seconds (0 if nothing was recorded).
+
+        The result is the upper edge of the bucket holding the percentile,
+        capped at the exact maximum.
+        """
+        counts = np.array(self.counts)
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(counts), max(1, np.ceil(q / 100 * total))))
+        return min(self._upper(index) / 1e9, self.max)
+
+    def summary(self):
+        """Return count, mean, p50, p99 and max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Instrumentation:
+    """
+    Named latency histograms and a tick-rate counter for the prediction loop.
+
+    Code paths are instrumented by passing an Instrumentation instance and
+    skipped entirely when None is passed instead, so disabled
+    instrumentation costs no clock reads or histogram updates.
+
+    Snapshots can be pulled with snapshot(), pushed to callbacks with
+    subscribe(), or scraped over HTTP with serve_metrics().
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.ticks = 0
+        self.ticks_per_second = 0.0
+        self._rate_start = time.perf_counter()
+        self._rate_ticks = 0
+        self._rate_measured = False  # True once a full one-second interval has been measured
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def histogram(self, name):
+        """Return the histogram of stage `name`, creating it on first use."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def record(self, name, seconds):
+        """Add one latency in seconds to stage `name`."""
+        self.histogram(name).record(seconds)
+
+    def tick(self):
+        """Count one fully processed tick; the rate is refreshed about once per second."""
+        self.ticks += 1
+        now = time.perf_counter()
+        elapsed = now - self._rate_start
+        if elapsed >= 1.0:
+            self.ticks_per_second = (self.ticks - self._rate_ticks) / elapsed
+            self._rate_ticks = self.ticks
+            self._rate_start = now
+            self._rate_measured = True
+
+    def reset(self):
+        """Clear every histogram and the tick counter."""
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+        self.ticks = self._rate_ticks = 0
+        self.ticks_per_second = 0.0
+        self._rate_start = time.perf_counter()
+        self._rate_measured = False
+
+    def snapshot(self):
+        """
+        Return the current statistics.
+
+        Until a full one-second interval has passed, ticks per second is
+        the rate over the interval so far, so short runs report a rate too.
+
+        Returns:
+            dict: Ticks, ticks per second and a summary (count, mean/p50/p99/max in ms) per stage.
+        """
+        ticks_per_second = self.ticks_per_second
+        if not self._rate_measured:
+            elapsed = time.perf_counter() - self._rate_start
+            ticks_per_second = self.ticks / elapsed if elapsed > 0 else 0.0
+        return {
+            "ticks": self.ticks,
+            "ticks_per_second": ticks_per_second,
+            "stages": {name: histogram.summary() for name, histogram in list(self.histograms.items())},
+        }
+
+    def subscribe(self, callback, interval=1.0):
+        """
+        Call callback(snapshot) every `interval` seconds from a background thread until close().
+
+        Returns:
+            threading.Thread: The reporting thread.
+        """
+        def report():
+            while not self._stop.wait(interval):
+                callback(self.snapshot())
+
+        thread = threading.Thread(target=report, name="instrumentation", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Stop all subscriptions."""
+        self._stop.set()
+
+
+def format_latency_report(snapshot):
+    """One line per stage with p50/p99/max, followed by the tick rate."""
+    lines = [
+        f"{name:9s} p50 {stage['p50_ms']:7.3f}  p99 {stage['p99_ms']:7.3f}  max {stage['max_ms']:7.3f} ms"
+        for name, stage in snapshot["stages"].items()
+    ]
+    lines.append(f"Ticks/s: {snapshot['ticks_per_second']:.1f}")
+    return "\n".join(lines)
+
+
+def prometheus_text(snapshot, prefix="lpc"):
+    """Render a snapshot in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {prefix}_stage_latency_seconds Per-stage latency of the prediction loop.",
+        f"# TYPE {prefix}_stage_latency_seconds summary",
+    ]
+    for name, stage in snapshot["stages"].items():
+        label = f'stage="{name}"'
+        lines.append(f'{prefix}_stage_latency_seconds{{{label},quantile="0.5"}} {stage["p50_ms"] / 1000:.9g}')
+        lines.append(f'{prefix}_stage_latency_seconds{{{label},quantile="0.99"}} {stage["p99_ms"] / 1000:.9g}')
+        lines.append(f'{prefix}_stage_latency_seconds_sum{{{label}}} {stage["mean_ms"] * stage["count"] / 1000:.9g}')
+        lines.append(f'{prefix}_stage_latency_seconds_count{{{label}}} {stage["count"]}')
+    lines.append(f"# HELP {prefix}_stage_latency_max_seconds Largest latency seen per stage.")
+    lines.append(f"# TYPE {prefix}_stage_latency_max_seconds gauge")
+    for name, stage in snapshot["stages"].items():
+        lines.append(f'{prefix}_stage_latency_max_seconds{{stage="{name}"}} {stage["max_ms"] / 1000:.9g}')
+    lines.append(f"# TYPE {prefix}_ticks_total counter")
+    lines.append(f"{prefix}_ticks_total {snapshot['ticks']}")
+    lines.append(f"# TYPE {prefix}_ticks_per_second gauge")
+    lines.append(f"{prefix}_ticks_per_second {snapshot['ticks_per_second']:.9g}")
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(instruments, port=9108, host="127.0.0.1"):
+    """
+    Serve snapshots over HTTP from a background thread.
+
+    GET /metrics returns Prometheus text, any other path returns JSON.
+    Binds to localhost by default.
+
+    Parameters:
+        instruments (Instrumentation): Source of the snapshots.
+        port (int): TCP port. 0 picks a free one (see server.server_address).
+        host (str): Interface to bind to.
+
+    Returns:
+        http.server.ThreadingHTTPServer: Running server; call shutdown() to stop it.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            snapshot = instruments.snapshot()
+            if self.path.startswith("/metrics"):
+                body, content_type = prometheus_text(snapshot), "text/plain; version=0.0.4"
+            else:
+                body, content_type = json.dumps(snapshot), "application/json"
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scrapes out of the console
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,241 @@
+import numpy as np
+
+# --------------------------------------------------------------
+# Compiled Burg Kernels
+# --------------------------------------------------------------
+#
+# The kernels below are plain Python loops over preallocated buffers that
+# numba compiles to machine code. They update the prediction errors in
+# place, so a fit allocates its outputs and two work arrays once instead of
+# new slices at every order. Without numba the NumPy implementations in
+# analysis.py are used; the kernels are still callable uncompiled, which is
+# slow but handy as a reference.
+
+BACKENDS = ("auto", "numba", "numpy")
+
+_backend = "auto"
+_numba = None     # numba module, False if it is not installed, None before the first check
+_compiled = None  # Kernel name -> compiled function, built on first use
+
+
+def _levinson(ref, a, tmp):
+    """Levinson step-up of ref into a (with the leading 1), using tmp as scratch."""
+    a[0] = 1.0
+    for i in range(1, a.shape[0]):
+        a[i] = 0.0
+    for m in range(ref.shape[0]):
+        k = ref[m]
+        for i in range(m + 2):
+            tmp[i] = a[i]
+        for i in range(1, m + 2):
+            a[i] = tmp[i] + k * tmp[m + 1 - i]
+
+
+def burg_kernel(x, order):
+    """
+    In-place Burg recursion, same results as analysis.arburg_vector for real input.
+
+    Forward errors of order m live in f[m + 1:], backward errors in
+    b[:N - 1 - m], as in analysis.arburg_batch.
+    """
+    N = x.shape[0]
+    epsilon = 1e-10
+    f = np.empty(N)
+    b = np.empty(N)
+    E = 0.0
+    for i in range(N):
+        f[i] = x[i]
+        b[i] = x[i]
+        E += x[i] * x[i]
+    E /= N
+    ref = np.zeros(order)
+
+    for m in range(order):
+        L = N - 1 - m
+        num = 0.0
+        den = 0.0
+        for i in range(L):
+            fi = f[m + 1 + i]
+            bi = b[i]
+            num += bi * fi
+            den += fi * fi + bi * bi
+        k = (-2 * num) / (den + epsilon) if den != 0 else 0.0
+        ref[m] = k
+
+        # ebp[:-1] += k * efp[:-1] and efp[1:] += k * ebp[1:], both from the old values
+        previous = f[m + 1] if L > 0 else 0.0
+        for j in range(L - 1):
+            current = f[m + 2 + j]
+            f[m + 2 + j] = current + k * b[j + 1]
+            b[j] = b[j] + k * previous
+            previous = current
+
+        E = (1 - k * k) * E
+
+    a = np.empty(order + 1)
+    _levinson(ref, a, np.empty(order + 1))
+    return a[1:], E, ref
+
+
+def warped_burg_kernel(x, order, warp_factor):
+    """In-place warped Burg recursion, same results as analysis.arburg_warped_vector."""
+    N = x.shape[0]
+    epsilon = 1e-10
+    f = np.empty(N)
+    b = np.empty(N)
+    E = 0.0
+    for i in range(N):
+        f[i] = x[i]
+        b[i] = x[i]
+        E += x[i] * x[i]
+    E /= N
+    ref = np.zeros(order)
+
+    for index in range(1, order + 1):
+        L = N - index
+        num = 0.0
+        den = 0.0
+        # All-pass in place: bb[i] = b[i] - w * (b[i + 1] - bb[i - 1]); F[i] = f[i + 1]
+        previous = 0.0
+        for i in range(L):
+            bb = b[i] - warp_factor * b[i + 1] + warp_factor * previous
+            b[i] = bb
+            previous = bb
+            F = f[i + 1]
+            num += F * bb
+            den += F * F + bb * bb
+        k = (-2 * num) / (den + epsilon) if den != 0 else 0.0
+        ref[index - 1] = k
+
+        for i in range(L):
+            F = f[i + 1]
+            bb = b[i]
+            f[i] = F + k * bb
+            b[i] = bb + k * F
+
+        E = (1 - k * k) * E
+
+    a = np.empty(order + 1)
+    _levinson(ref, a, np.empty(order + 1))
+    return a[1:], E, ref
+
+
+def ar_filter_kernel(A, past, data):
+    """
+    All-pole filter 1 / A(z) of every column of data with that column's own
+    coefficients, continuing after the outputs in past (oldest first), as
+    synthesis.ARSynthesizer.generate does for one model per series.
+    """
+    order, n_series = A.shape
+    n = data.shape[0]
+    y = np.empty((n, n_series))
+    acc = np.empty(n_series)
+    for t in range(n):
+        # y[t] = x[t] - sum of a[k] * y[t - 1 - k], along contiguous rows into a separate
+        # accumulator so the compiler can vectorise the inner loops
+        for j in range(n_series):
+            acc[j] = data[t, j]
+        for k in range(order):
+            i = t - 1 - k
+            previous = y[i] if i >= 0 else past[order + i]
+            for j in range(n_series):
+                acc[j] -= A[k, j] * previous[j]
+        for j in range(n_series):
+            y[t, j] = acc[j]
+    return y
+
+
+_KERNELS = {
+    "burg": burg_kernel,
+    "warped_burg": warped_burg_kernel,
+    "ar_filter": ar_filter_kernel,
+}
+
+
+def numba_available():
+    """Return True if numba can be imported. The import is attempted once, on first call."""
+    global _numba
+    if _numba is None:
+        try:
+            import numba
+            _numba = numba
+        except ImportError:  # Compiled kernels are optional
+            _numba = False
+    return _numba is not False
+
+
+def set_backend(name):
+    """
+    Choose the implementation behind arburg_vector, arburg_warped_vector and
+    per-series ARSynthesizer.generate.
+
+    Parameters:
+        name (str): "numba" for the compiled kernels, "numpy" for the NumPy
+            code, or "auto" to use numba when it is installed (default).
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {BACKENDS}")
+    if name == "numba" and not numba_available():
+        raise ImportError("numba is required for the 'numba' backend")
+    _backend = name
+
+
+def get_backend():
+    """Return the backend that is actually used, "numba" or "numpy"."""
+    return "numba" if _backend != "numpy" and numba_available() else "numpy"
+
+
+def kernel(name):
+    """
+    Return compiled kernel `name`, or None when the NumPy implementation should be used.
+
+    Kernels are compiled on first use and cached on disk by numba.
+    """
+    global _compiled
+    if get_backend() == "numpy":
+        return None
+    if _compiled is None:
+        njit = _numba.njit(cache=True, nogil=True)
+        for func in (_levinson, *_KERNELS.values()):
+            # numba's disk cache is keyed by file and qualname but reloads the module by
+            # name, so this file imported as 'kernels' (scripts in src/) and as
+            # 'src.kernels' (the package) needs separate cache entries
+            func.__qualname__ = f"{__name__}.{func.__name__}"
+        levinson = njit(_levinson)
+        globals()["_levinson"] = levinson  # Kernels resolve it as a compiled global
+        _compiled = {kernel_name: njit(func) for kernel_name, func in _KERNELS.items()}
+    return _compiled[name]
+
+
+if __name__ == "__main__":
+    import time
+    import kernels  # The module analysis.py dispatches through, not this __main__ copy
+    from analysis import arburg_vector, arburg_warped_vector
+
+    rng = np.random.default_rng(0)
+    print(f"Backend: {kernels.get_backend()}")
+    for n, order in [(50, 5), (100, 10), (200, 20), (1000, 40)]:
+        x = 100 + np.cumsum(rng.normal(size=n))
+        kernels.set_backend("numpy")
+        expected = arburg_vector(x, order), arburg_warped_vector(x, order, 0.4)
+        kernels.set_backend("auto")
+        results = arburg_vector(x, order), arburg_warped_vector(x, order, 0.4)
+        reference = kernels.burg_kernel(x, order), kernels.warped_burg_kernel(x, order, 0.4)
+
+        # Same recursion, different summation order: agreement to rounding error
+        error = 0.0
+        for candidate in (results, reference):
+            for got, want in zip(candidate, expected):
+                error = max(error, max(np.abs(np.asarray(g) - np.asarray(w)).max() for g, w in zip(got, want)))
+
+        timings = {}
+        for backend in ("numpy", "auto"):
+            kernels.set_backend(backend)
+            start = time.perf_counter()
+            for _ in range(1000):
+                arburg_vector(x, order)
+            timings[backend] = (time.perf_counter() - start) / 1000
+        kernels.set_backend("auto")
+        print(f"N={n:4d} order={order:2d}: numpy {timings['numpy'] * 1e6:8.1f} us, "
+              f"{kernels.get_backend()} {timings['auto'] * 1e6:8.1f} us, max difference {error:.1e}")
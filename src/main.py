@@ -1,8 +1,13 @@
+import os
+import sys
+import tempfile
 import numpy as np
-from analysis import arburg_vector, arburg_matrix
-from synthesis import gen_ts
+import kernels
+from scipy.signal import lfilter
+from analysis import arburg_vector, arburg_matrix, arburg_warped_vector, SlidingWindowBurg
+from store import TickStore, INDEX_FILE
+from synthesis import gen_ts, ARSynthesizer
 from utils import freqz, arcoeff_to_cep, cep_to_arcoeff
-from gui import CreateGUI  # Import the GUI function to launch the application
 
 np.seterr(invalid='ignore')  # Suppress numpy warnings
 
@@ -39,11 +44,106 @@ def test_utils_module():
     print(f"Frequency Response: Frequencies (first 5): {freqs[:5]}, Power (first 5): {power[:5]}")
 
 
+def test_streaming_burg():
+    """Check that the streaming lattice stays close to a Burg refit of its window on a stationary AR process."""
+    print("Testing Streaming Burg...")
+    rng = np.random.default_rng(0)
+    x = lfilter([1], [1, -1.2, 0.5], rng.normal(size=3000))  # AR(2), noise variance 1
+    order, window = 4, 200
+    estimator = SlidingWindowBurg(order, window)
+    worst_ref, worst_error = 0.0, 0.0
+    for n, value in enumerate(x):
+        ref = estimator.update(value)
+        if n >= 2 * window and n % 50 == 0:
+            _, expected_error, expected_ref = arburg_vector(x[n - window + 1:n + 1], order)
+            _, error, _ = estimator.coefficients()
+            worst_ref = max(worst_ref, np.max(np.abs(ref - expected_ref)))
+            worst_error = max(worst_error, abs(error / expected_error - 1))
+    # An approximation, not a refit: allow a small, bounded deviation
+    assert worst_ref < 0.1, f"Reflection coefficients off by up to {worst_ref:.3f}"
+    assert worst_error < 0.15, f"Error power off by up to {worst_error:.1%}"
+    print(f"max |dk| = {worst_ref:.3f}, max relative error power deviation = {worst_error:.1%}")
+
+
+def test_tick_store_index():
+    """Check that reopening a store with a truncated index file rebuilds it, so locate() stays exact."""
+    print("Testing Tick Store Index...")
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(root, index_stride=4)
+        times = np.arange(40) * 100
+        store.writer("A").extend(np.arange(40.0), times=times)
+        store.close()
+        with open(os.path.join(root, "A", INDEX_FILE), "r+b") as f:
+            f.truncate(8)  # Keep only the first entry, as after a crash
+
+        store = TickStore(root)
+        more = 4000 + np.arange(5) * 100
+        store.writer("A").extend(np.arange(5.0), times=more)
+        store.flush()
+        times = np.concatenate((times, more))
+        for t in range(-50, 4500, 50):
+            assert store.locate("A", t) == np.searchsorted(times, t), f"locate({t})"
+        store.close()
+    print("Index rebuilt, locate() exact")
+
+
+def test_kernel_backends():
+    """Check that the numba kernels give the same fits and syntheses as the NumPy code."""
+    print("Testing Kernel Backends...")
+    if not kernels.numba_available():
+        print("numba is not installed, skipped")
+        return
+    rng = np.random.default_rng(0)
+    walk = 100 + np.cumsum(rng.normal(size=200))
+    cases = [
+        (walk, 5), (walk, 20),
+        (walk[:10], 9), (walk[:10], 10), (walk[:10], 15),  # Order >= N - 1
+        (np.full(30, 5.0), 4), (np.zeros(20), 3),           # Constant input
+    ]
+    backend = kernels.get_backend()
+    try:
+        for x, order in cases:
+            for fit, args in ((arburg_vector, ()), (arburg_warped_vector, (0.4,))):
+                kernels.set_backend("numpy")
+                expected = fit(x, order, *args)
+                kernels.set_backend("numba")
+                result = fit(x, order, *args)
+                for got, want in zip(result, expected):
+                    # Same recursion, different summation order
+                    np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-12,
+                                               err_msg=f"{fit.__name__}, N={len(x)}, order={order}")
+
+        # One model per series, across two blocks so the carried state is covered too
+        A = rng.uniform(-0.2, 0.2, size=(5, 8))
+        noise = rng.normal(size=(300, 8))
+        for n_samples in (10, 290):  # Fewer and more samples than series per block
+            outputs = []
+            for name in ("numpy", "numba"):
+                kernels.set_backend(name)
+                synthesizer = ARSynthesizer(A)
+                outputs.append(np.vstack((synthesizer.generate(n_samples, data=noise[:n_samples]),
+                                          synthesizer.generate(300 - n_samples, data=noise[n_samples:]))))
+            np.testing.assert_allclose(outputs[1], outputs[0], rtol=1e-9, atol=1e-12,
+                                       err_msg=f"ARSynthesizer, blocks of {n_samples}")
+    finally:
+        kernels.set_backend(backend)
+    print(f"{len(cases)} cases agree")
+
+
 if __name__ == "__main__":
+    # Any arguments go to the non-interactive CLI; without them the menu reads
+    # its choice from stdin, which may be piped (echo 1 | python main.py)
+    if len(sys.argv) > 1:
+        from cli import main
+        sys.exit(main())
+
     print("Choose an option:")
     print("1. Run Module Tests")
     print("2. Launch GUI")
-    choice = input("Enter your choice (1/2): ").strip()
+    try:
+        choice = input("Enter your choice (1/2): ").strip()
+    except EOFError:  # Empty stdin, e.g. < /dev/null
+        choice = ""
 
     if choice == "1":
         print("Starting Module Tests...")
@@ -53,9 +153,16 @@ if __name__ == "__main__":
         test_synthesis_module()
         print("-" * 50)
         test_utils_module()
+        print("-" * 50)
+        test_streaming_burg()
+        print("-" * 50)
+        test_tick_store_index()
+        print("-" * 50)
+        test_kernel_backends()
         print("All tests completed!")
     elif choice == "2":
         print("Launching GUI...")
+        from gui import CreateGUI  # Only the GUI needs Tk and matplotlib
         CreateGUI()
     else:
         print("Invalid choice. Exiting.")
@@ -0,0 +1,311 @@
+import numpy as np
+
+
+def rolling_std(x, window):
+    """Standard deviation of every length-`window` window of x, via cumulative sums. Shape: (len(x) - window + 1,)."""
+    x = x - x.mean()  # Centering keeps the cumulative sums well conditioned
+    s1 = np.concatenate(([0], np.cumsum(x)))
+    s2 = np.concatenate(([0], np.cumsum(x * x)))
+    mean = (s1[window:] - s1[:-window]) / window
+    return np.sqrt(np.maximum((s2[window:] - s2[:-window]) / window - mean ** 2, 0))
+
+
+class RollingStats:
+    """
+    Mean and variance over the last `window` values, O(1) per push().
+
+    Uses Welford's update while the window fills and the sliding
+    replace-one-value form once it is full. The sums are recomputed from
+    the held values once per window to stop rounding error from drifting.
+
+    Parameters:
+        window (int): Number of most recent values covered. Must be > 0.
+    """
+
+    def __init__(self, window):
+        if window <= 0:
+            raise ValueError("Window must be > 0")
+        self.window = window
+        self.values = np.zeros(window)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def held(self):
+        """Return the held values, oldest first."""
+        if self.count < self.window:
+            return self.values[:self.count].copy()
+        return np.roll(self.values, -(self.count % self.window))
+
+    def resize(self, window):
+        """Cover the last `window` values from now on, keeping as many held values as fit. O(window)."""
+        if window <= 0:
+            raise ValueError("Window must be > 0")
+        held = self.held()[-window:]
+        self.window = window
+        self.values = np.zeros(window)
+        self.reset()
+        for x in held:
+            self.push(x)
+
+    def push(self, x):
+        x = float(x)
+        pos = self.count % self.window
+        if self.count < self.window:
+            n = self.count + 1
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.values[pos]
+            mean = self.mean + (x - old) / self.window
+            self.m2 += (x - old) * (x - mean + old - self.mean)
+            self.mean = mean
+        self.values[pos] = x
+        self.count += 1
+        if self.count % self.window == 0:
+            self.mean = self.values.mean()
+            self.m2 = float(np.dot(self.values - self.mean, self.values - self.mean))
+
+    @property
+    def n(self):
+        return min(self.count, self.window)
+
+    @property
+    def variance(self):
+        """Population variance of the held values (numpy.var)."""
+        return max(self.m2, 0.0) / self.n if self.n else 0.0
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class PredictionMetrics:
+    """
+    Incremental prediction-quality metrics of one symbol.
+
+    Every update() is O(1): the margin of error is half the rolling
+    standard deviation of the last `window_size` prices (as in the live
+    loop), rolling MSE/MAE/hit rate/directional accuracy cover the last
+    `error_window` scored predictions, and session totals plus the
+    price/prediction correlation are accumulated with Welford updates.
+    state() and restore() round-trip everything through plain arrays.
+
+    Parameters:
+        window_size (int): Prices the margin of error is computed over.
+        error_window (int): Scored predictions covered by the rolling metrics. Defaults to window_size.
+    """
+
+    FIELDS = ("hit", "squared", "absolute", "direction", "directed")
+
+    def __init__(self, window_size, error_window=None):
+        self.window_size = window_size
+        self.error_window = error_window or window_size
+        self.prices = RollingStats(window_size)
+        self.recent = np.zeros((len(self.FIELDS), self.error_window))  # Per-prediction terms, ring
+        self.reset()
+
+    def reset(self):
+        """Clear all counters and rolling state."""
+        self.prices.reset()
+        self.recent[:] = 0
+        self.rolling = np.zeros(len(self.FIELDS))  # Running sums of the rows of `recent`
+        self.scored = 0
+        self.last_price = np.nan
+        self.margin = 0.0
+        # Session totals
+        self.hits = 0
+        self.directional_hits = 0
+        self.directed = 0
+        self.squared_error = 0.0
+        self.absolute_error = 0.0
+        self.mean_price = self.mean_prediction = 0.0
+        self.m2_price = self.m2_prediction = self.c_price_prediction = 0.0
+
+    def update(self, price, prediction=np.nan, scored=True):
+        """
+        Fold one tick in.
+
+        Parameters:
+            price (float): Newest price; it is part of the window the margin is computed over.
+            prediction (float): Prediction for this price. NaN predictions are not scored.
+            scored (bool): Whether the prediction counts (False during warm-up).
+
+        Returns:
+            bool: True if the prediction was scored and fell within the margin of error.
+        """
+        price = float(price)
+        self.prices.push(price)
+        self.margin = self.prices.std * 0.5  # Half the recent volatility
+        previous, self.last_price = self.last_price, price
+        if not scored or np.isnan(prediction):
+            return False
+
+        prediction = float(prediction)
+        error = prediction - price
+        hit = abs(error) <= self.margin
+        directed = not np.isnan(previous)
+        direction = directed and np.sign(prediction - previous) == np.sign(price - previous)
+        terms = (hit, error * error, abs(error), direction, directed)
+
+        pos = self.scored % self.error_window
+        self.rolling += np.subtract(terms, self.recent[:, pos])
+        self.recent[:, pos] = terms
+        self.scored += 1
+        if pos == self.error_window - 1:
+            self.rolling = self.recent.sum(axis=1)  # Resynchronise once per window
+
+        self.hits += hit
+        self.directional_hits += direction
+        self.directed += directed
+        self.squared_error += error * error
+        self.absolute_error += abs(error)
+
+        # Welford co-moments for the correlation of prices and predictions
+        n = self.scored
+        d_price = price - self.mean_price
+        d_prediction = prediction - self.mean_prediction
+        self.mean_price += d_price / n
+        self.mean_prediction += d_prediction / n
+        self.m2_price += d_price * (price - self.mean_price)
+        self.m2_prediction += d_prediction * (prediction - self.mean_prediction)
+        self.c_price_prediction += d_price * (prediction - self.mean_prediction)
+        return hit
+
+    def resize(self, window_size):
+        """Compute the margin of error over the last window_size prices from now on; scores are kept."""
+        self.prices.resize(window_size)
+        self.window_size = window_size
+        self.margin = self.prices.std * 0.5
+
+    @property
+    def success_rate(self):
+        return (self.hits / self.scored * 100) if self.scored > 0 else 0
+
+    def summary(self):
+        """
+        Return session and rolling metrics.
+
+        Returns:
+            dict: Success rate and directional accuracy in %, MSE, MAE and correlation
+            over the session, and the same (without correlation) over the last error_window predictions.
+        """
+        n = max(self.scored, 1)
+        held = max(min(self.scored, self.error_window), 1)
+        hit, squared, absolute, direction, directed = self.rolling
+        denominator = np.sqrt(self.m2_price * self.m2_prediction)
+        return {
+            "predictions": self.scored,
+            "success_rate": self.success_rate,
+            "directional_accuracy": self.directional_hits / self.directed * 100 if self.directed else 0.0,
+            "mse": self.squared_error / n,
+            "mae": self.absolute_error / n,
+            "correlation": self.c_price_prediction / denominator if denominator > 0 else np.nan,
+            "rolling_success_rate": hit / held * 100,
+            "rolling_directional_accuracy": direction / directed * 100 if directed >= 1 else 0.0,
+            "rolling_mse": squared / held,
+            "rolling_mae": absolute / held,
+            "margin": self.margin,
+        }
+
+    def state(self):
+        """Return the complete state as a dict of NumPy arrays (np.savez-compatible)."""
+        return {
+            "window_size": np.array(self.window_size),
+            "error_window": np.array(self.error_window),
+            "price_values": self.prices.values.copy(),
+            "price_stats": np.array([self.prices.count, self.prices.mean, self.prices.m2]),
+            "recent": self.recent.copy(),
+            "rolling": self.rolling.copy(),
+            "totals": np.array([
+                self.scored, self.last_price, self.margin, self.hits, self.directional_hits, self.directed,
+                self.squared_error, self.absolute_error, self.mean_price, self.mean_prediction,
+                self.m2_price, self.m2_prediction, self.c_price_prediction,
+            ]),
+        }
+
+    @classmethod
+    def restore(cls, state):
+        """Rebuild an instance from state()."""
+        metrics = cls(int(state["window_size"]), int(state["error_window"]))
+        metrics.prices.values[:] = state["price_values"]
+        count, metrics.prices.mean, metrics.prices.m2 = state["price_stats"].tolist()
+        metrics.prices.count = int(count)
+        metrics.recent[:] = state["recent"]
+        metrics.rolling = np.array(state["rolling"], dtype=float)
+        (scored, metrics.last_price, metrics.margin, hits, directional_hits, directed,
+         metrics.squared_error, metrics.absolute_error, metrics.mean_price, metrics.mean_prediction,
+         metrics.m2_price, metrics.m2_prediction, metrics.c_price_prediction) = state["totals"].tolist()
+        metrics.scored, metrics.hits = int(scored), int(hits)
+        metrics.directional_hits, metrics.directed = int(directional_hits), int(directed)
+        return metrics
+
+
+class MetricsBook:
+    """
+    PredictionMetrics per symbol, created on first update.
+
+    Parameters:
+        window_size (int): Margin-of-error window of every symbol.
+        error_window (int): Rolling metrics window of every symbol. Defaults to window_size.
+    """
+
+    def __init__(self, window_size, error_window=None):
+        self.window_size = window_size
+        self.error_window = error_window
+        self.symbols = {}
+
+    def __getitem__(self, symbol):
+        metrics = self.symbols.get(symbol)
+        if metrics is None:
+            metrics = self.symbols[symbol] = PredictionMetrics(self.window_size, self.error_window)
+        return metrics
+
+    def update(self, symbol, price, prediction=np.nan, scored=True):
+        return self[symbol].update(price, prediction, scored)
+
+    def summary(self):
+        """Return summary() of every symbol, keyed by symbol."""
+        return {symbol: metrics.summary() for symbol, metrics in self.symbols.items()}
+
+    def state(self):
+        """Return the state of every symbol as one flat dict of arrays, keys prefixed with the symbol."""
+        state = {"window_size": np.array(self.window_size), "error_window": np.array(self.error_window or 0)}
+        for symbol, metrics in self.symbols.items():
+            state.update({f"{symbol}/{key}": value for key, value in metrics.state().items()})
+        return state
+
+    @classmethod
+    def restore(cls, state):
+        """Rebuild a book from state(). Symbols come back as strings."""
+        book = cls(int(state["window_size"]), int(state["error_window"]) or None)
+        # Split at the last "/" only: symbols such as "BRK/B" may contain one
+        sections = {}
+        for key, value in state.items():
+            if "/" in key:
+                symbol, name = key.rsplit("/", 1)
+                sections.setdefault(symbol, {})[name] = value
+        for symbol, section in sections.items():
+            book.symbols[symbol] = PredictionMetrics.restore(section)
+        return book
+
+
+if __name__ == "__main__":
+    import time
+    from stock_simulation import driftless_simulator
+
+    prices = driftless_simulator().fetch(100_000)[:, 0]
+    predictions = np.concatenate(([np.nan, np.nan], 2 * prices[1:-1] - prices[:-2]))  # Linear extrapolation
+    metrics = PredictionMetrics(50, error_window=1000)
+    start = time.perf_counter()
+    for price, prediction in zip(prices, predictions):
+        metrics.update(price, prediction)
+    elapsed = time.perf_counter() - start
+    print(f"{len(prices) / elapsed:.0f} updates/s")
+    print(f"Rolling margin {metrics.margin:.4f}, np.std {np.std(prices[-50:]) * 0.5:.4f}")
+    for key, value in metrics.summary().items():
+        print(f"{key}: {value:.4f}")
@@ -0,0 +1,501 @@
+import time
+import queue
+import threading
+import numpy as np
+from collections import namedtuple
+from analysis import SlidingWindowBurg, ref_to_arcoeff
+from buffers import RingBuffer
+from metrics import PredictionMetrics
+from plot import apply_decay
+from stock_simulation import GBMSimulator, default_simulator, fetch_stock_price
+
+QUEUE_SIZE = 256  # Items buffered between two stages before the producer blocks
+RETAINED_PRICES = 1024  # Recent prices the estimator keeps to refit after a window change
+
+# Immutable snapshot of the tunable parameters, swapped in whole at a tick boundary
+EstimatorParams = namedtuple("EstimatorParams", ["lpc_order", "window_size", "decay_factor"])
+
+
+class Snapshot:
+    """
+    Marker that collects the state of every stage as it travels down the pipeline.
+
+    It enters at the first stage and is queued behind the ticks already in
+    flight, so each stage adds its state exactly after the last tick the
+    stage before it had processed: the snapshot is consistent without
+    pausing any stage.
+    """
+
+    def __init__(self):
+        self.state = {}
+        self.reply = queue.Queue(1)
+
+
+class Stage(threading.Thread):
+    """
+    One step of the prediction pipeline, running in its own thread.
+
+    Items are taken from `inputs`, passed to process() and, when the stage
+    has an `outputs` queue, forwarded to it. Both queues are bounded, so a
+    slow stage blocks the stages before it (backpressure) instead of
+    letting memory grow.
+
+    Parameters:
+        name (str): Stage name used in the reported statistics.
+        stop_event (threading.Event): Set to stop the stage.
+        inputs (queue.Queue): Queue to read items from. None for source stages.
+        outputs (queue.Queue): Queue to forward processed items to. None for sink stages.
+        instruments (instrumentation.Instrumentation): Receives per-stage latencies. Not timed if None.
+    """
+
+    def __init__(self, name, stop_event, inputs=None, outputs=None, instruments=None):
+        super().__init__(name=name, daemon=True)
+        self.stop_event = stop_event
+        self.inputs = inputs
+        self.outputs = outputs
+        self.instruments = instruments
+        self.processed = 0
+        self.latency = 0.0  # Exponential moving average of process() time, seconds
+        self.snapshots = queue.Queue()  # Snapshot markers to start from this (source) stage
+        self.unsent = None  # Item that could not be forwarded before the stage stopped
+
+    def process(self, item):
+        """Handle one item and return what should be forwarded (None to drop it)."""
+        raise NotImplementedError
+
+    def next_item(self):
+        """Return the next input item, or None if nothing arrived in time."""
+        try:
+            return self.inputs.get(timeout=0.1)
+        except queue.Empty:
+            return None
+
+    def forward(self, item):
+        """Put an item on the output queue, blocking while it is full. Kept in `unsent` if the stage stops first."""
+        while not self.stop_event.is_set():
+            try:
+                self.outputs.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        self.unsent = item
+
+    def state(self):
+        """Return the resumable state of the stage as a dict of arrays. Runs between two items."""
+        return {}
+
+    def pass_snapshot(self, snapshot):
+        """Add this stage's state to a Snapshot and hand it on, or return it to the caller at the last stage."""
+        snapshot.state.update({f"{self.name}/{key}": value for key, value in self.state().items()})
+        if self.outputs is not None:
+            self.forward(snapshot)
+        else:
+            snapshot.reply.put(snapshot.state)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            while not self.snapshots.empty():
+                self.pass_snapshot(self.snapshots.get_nowait())
+            item = self.next_item()
+            if item is None:
+                continue
+            if isinstance(item, Snapshot):
+                self.pass_snapshot(item)
+                continue
+            start = time.perf_counter()
+            result = self.process(item)
+            elapsed = time.perf_counter() - start
+            self.latency = 0.9 * self.latency + 0.1 * elapsed
+            if self.instruments is not None:
+                self.instruments.record(self.name, elapsed)
+            self.processed += 1
+            if result is not None and self.outputs is not None:
+                self.forward(result)
+
+    def stats(self):
+        """Return the queue depth, processing latency and item count of the stage."""
+        return {
+            "queue_depth": self.inputs.qsize() if self.inputs is not None else 0,
+            "latency_ms": self.latency * 1000,
+            "processed": self.processed,
+        }
+
+
+class FeedStage(Stage):
+    """
+    Fetches a new price every `interval` seconds and timestamps it. Sources may return None to skip a tick.
+
+    The position of the GBMSimulator behind the source is part of the
+    stage's state. It is found automatically for fetch_stock_price and
+    for a simulator's next_price; pass `simulator` for wrapped sources.
+    """
+
+    def __init__(self, stop_event, outputs, interval=1 / 30, source=fetch_stock_price, instruments=None,
+                 simulator=None):
+        super().__init__("feed", stop_event, outputs=outputs, instruments=instruments)
+        self.interval = interval
+        self.source = source
+        if simulator is None:
+            owner = getattr(source, "__self__", None)
+            simulator = default_simulator() if source is fetch_stock_price else owner
+        self.simulator = simulator if isinstance(simulator, GBMSimulator) else None
+        self._next_time = time.perf_counter()
+
+    def next_item(self):
+        # Pace the feed; a zero interval runs as fast as downstream allows
+        if self.interval > 0:
+            delay = self._next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time + self.interval, time.perf_counter() - self.interval)
+        return time.perf_counter()
+
+    def process(self, timestamp):
+        price = self.source()
+        return None if price is None else (timestamp, price)  # None means no new price yet
+
+    def state(self):
+        if self.simulator is None:
+            return {}
+        return {f"simulator/{key}": value for key, value in self.simulator.state().items()}
+
+
+class EstimatorStage(Stage):
+    """
+    Fits the streaming Burg model and predicts the next price.
+
+    Parameters can be changed while the stage runs with configure(), from
+    any thread. The new EstimatorParams snapshot is picked up whole at the
+    next tick boundary, so a tick never mixes old and new values. The
+    lattice is fitted at max_order and Burg is order-recursive, so any
+    order up to it is served from the leading reflection coefficients
+    without refitting. Only a new window size or a higher order rebuilds
+    the lattice, from the last RETAINED_PRICES prices the stage keeps.
+
+    Parameters:
+        lpc_order (int): LPC order used for predictions.
+        window_size (int): Window for the Burg fit.
+        decay_factor (float): Decay applied to the LPC coefficients.
+        history (RingBuffer): Earlier prices to warm the estimator up on.
+        max_order (int): Order the lattice is fitted at. Defaults to lpc_order.
+    """
+
+    def __init__(self, stop_event, inputs, outputs, lpc_order, window_size, decay_factor, history=None,
+                 instruments=None, max_order=None):
+        super().__init__("estimator", stop_event, inputs, outputs, instruments)
+        self.params = EstimatorParams(lpc_order, window_size, decay_factor)
+        self._pending = None  # Snapshot waiting for the next tick boundary
+        self._lock = threading.Lock()
+        self.recent = RingBuffer(max(RETAINED_PRICES, window_size, lpc_order))
+        if history is not None:
+            self.recent.extend(history.view(self.recent.capacity))  # Never reaches evicted prices
+        self.count = 0 if history is None else len(history)
+        self._fit(max(lpc_order, max_order or 0), window_size)
+
+    @property
+    def lpc_order(self):
+        return self.params.lpc_order
+
+    @property
+    def decay_factor(self):
+        return self.params.decay_factor
+
+    def _fit(self, order, window_size):
+        """Build the lattice and warm it up on the most recent prices."""
+        self.estimator = SlidingWindowBurg(order, max(window_size, order + 1))
+        for price in self.recent.view(self.estimator.window):
+            self.estimator.update(price)
+
+    def configure(self, **changes):
+        """
+        Request new parameters, applied atomically before the next tick. Thread-safe.
+
+        Parameters:
+            **changes: Any of lpc_order, window_size and decay_factor.
+
+        Returns:
+            EstimatorParams: The snapshot that will be applied.
+        """
+        with self._lock:
+            params = (self._pending or self.params)._replace(**changes)
+            if params.lpc_order <= 0 or params.window_size <= 0:
+                raise ValueError("Order and window size must be > 0")
+            self._pending = params
+        return params
+
+    def _apply(self, params):
+        """Switch to a new parameter snapshot; runs on the stage thread between ticks."""
+        order = max(params.lpc_order, self.estimator.order)
+        if params.window_size != self.params.window_size or order > self.estimator.order:
+            if self.recent.capacity < max(params.window_size, order):
+                recent = RingBuffer(max(params.window_size, order))
+                recent.extend(self.recent.view())
+                self.recent = recent
+            self._fit(order, params.window_size)
+        self.params = params
+
+    def process(self, item):
+        if self._pending is not None:
+            with self._lock:
+                params, self._pending = self._pending, None
+            start = time.perf_counter()
+            self._apply(params)
+            if self.instruments is not None:
+                self.instruments.record("reconfigure", time.perf_counter() - start)
+        params = self.params
+        lpc_order = params.lpc_order
+
+        timestamp, price = item
+        self.count += 1
+        self.recent.append(price)
+        instruments = self.instruments
+        start = time.perf_counter() if instruments is not None else 0.0
+        ref = self.estimator.update(price)
+        coeffs = ref_to_arcoeff(ref[:lpc_order])  # Lower orders reuse the same fit
+        if instruments is not None:
+            instruments.record("burg", time.perf_counter() - start)
+
+        # Apply LPC filter if enough data points exist
+        if self.count >= lpc_order:
+            try:
+                decayed_coeffs = apply_decay(coeffs, params.decay_factor)
+                filtered_price = -np.dot(decayed_coeffs, self.recent.view(lpc_order))
+            except Exception as e:
+                print(f"Error in LPC filtering: {e}")
+                filtered_price = np.nan  # Handle LPC failures gracefully
+            scored = self.count > lpc_order
+        else:
+            filtered_price = price
+            scored = False
+        return timestamp, price, filtered_price, scored, params
+
+    def state(self):
+        state = {
+            "params": np.array(self.params, dtype=float),
+            "count": np.array(self.count),
+            "recent/values": np.array(self.recent.view()),
+            "recent/count": np.array(self.recent.count),
+        }
+        state.update({f"lattice/{key}": value for key, value in self.estimator.state().items()})
+        return state
+
+    def load_state(self, state):
+        """
+        Continue exactly where a state() left off: parameters, retained prices and lattice.
+
+        Must be called before the stage is started.
+        """
+        lpc_order, window_size, decay_factor = np.asarray(state["params"]).tolist()
+        self.params = EstimatorParams(int(lpc_order), int(window_size), decay_factor)
+        self.count = int(state["count"])
+        recent = {key[len("recent/"):]: value for key, value in state.items() if key.startswith("recent/")}
+        self.recent = RingBuffer(max(RETAINED_PRICES, len(recent["values"]), self.params.window_size))
+        self.recent.load_state(recent)
+        lattice = {key[len("lattice/"):]: value for key, value in state.items() if key.startswith("lattice/")}
+        self.estimator = SlidingWindowBurg(int(lattice["order"]), int(lattice["window"]))
+        self.estimator.load_state(lattice)
+
+
+class MetricsStage(Stage):
+    """
+    Scores predictions and publishes prices, predictions and the success rate.
+
+    Scoring state lives in a metrics.PredictionMetrics, which can be passed
+    in to carry counters over from a previous run. A new one is warmed up
+    on the last window_size prices of raw_prices. The margin of error
+    follows the window size of the parameters each prediction was made with.
+    """
+
+    def __init__(self, stop_event, inputs, window_size, raw_prices, filtered_prices, exporter=None,
+                 instruments=None, quality=None):
+        super().__init__("metrics", stop_event, inputs, instruments=instruments)
+        self.raw_prices = raw_prices
+        self.filtered_prices = filtered_prices
+        self.exporter = exporter
+        if quality is None:
+            quality = PredictionMetrics(window_size)
+            for price in raw_prices[-window_size:]:
+                quality.update(price, scored=False)
+        elif quality.window_size != window_size:
+            quality.resize(window_size)
+        self.quality = quality
+        self.end_to_end = 0.0  # Moving average of feed-to-metrics latency, seconds
+
+    def process(self, item):
+        timestamp, price, filtered_price, scored, params = item
+        instruments = self.instruments
+        start = time.perf_counter() if instruments is not None else 0.0
+        if params.window_size != self.quality.window_size:
+            self.quality.resize(params.window_size)
+
+        # Margin of error (half the rolling volatility) and prediction success, O(1) per tick
+        self.quality.update(price, filtered_price, scored)
+        if instruments is not None:
+            instruments.record("scoring", time.perf_counter() - start)
+
+        # Prices are published last so readers never see a raw price without its prediction
+        self.filtered_prices.append(filtered_price)
+        self.raw_prices.append(price)
+        if self.exporter is not None:
+            self.exporter.append(price, filtered_price)
+        self.end_to_end = 0.9 * self.end_to_end + 0.1 * (time.perf_counter() - timestamp)
+        if instruments is not None:
+            instruments.tick()
+
+    @property
+    def success_rate(self):
+        return self.quality.success_rate
+
+    def state(self):
+        state = {f"raw_prices/{key}": value for key, value in self.raw_prices.state().items()}
+        state.update({f"filtered_prices/{key}": value for key, value in self.filtered_prices.state().items()})
+        state.update({f"quality/{key}": value for key, value in self.quality.state().items()})
+        return state
+
+    def stats(self):
+        stats = super().stats()
+        stats["end_to_end_ms"] = self.end_to_end * 1000
+        return stats
+
+
+class Pipeline:
+    """
+    Feed -> estimator -> metrics pipeline with bounded queues between stages.
+
+    Ticks are processed at the feed rate, independently of how often the
+    display samples the results through raw_prices, filtered_prices and
+    success_rate. configure() retunes a running pipeline without stopping it.
+
+    Parameters:
+        lpc_order (int): LPC order.
+        window_size (int): Window for the Burg fit and the margin of error.
+        decay_factor (float): Decay applied to the LPC coefficients.
+        raw_prices (RingBuffer): Receives raw prices; existing entries warm the estimator up.
+        filtered_prices (RingBuffer): Receives predictions, kept aligned with raw_prices.
+        feed_interval (float): Seconds between ticks. 0 runs as fast as possible.
+        source (callable): Returns the next price.
+        exporter (export.StreamWriter): Receives every tick while the session runs.
+            The caller closes it once the pipeline has been joined.
+        instruments (instrumentation.Instrumentation): Collects per-stage latency histograms
+            (feed, estimator, burg, metrics, scoring, reconfigure) and the tick rate. Instrumentation is off if None.
+        quality (metrics.PredictionMetrics): Scoring state to continue from, e.g. that of a previous run.
+        max_order (int): Order the lattice is fitted at, so that configure() can switch to any
+            order up to it without refitting. Defaults to lpc_order.
+        simulator (stock_simulation.GBMSimulator): Simulator behind a wrapped source, whose
+            position is checkpointed. Found automatically for unwrapped simulator sources.
+    """
+
+    def __init__(self, lpc_order, window_size, decay_factor, raw_prices, filtered_prices,
+                 feed_interval=1 / 30, source=fetch_stock_price, exporter=None, instruments=None,
+                 quality=None, max_order=None, simulator=None):
+        self.raw_prices = raw_prices
+        self.filtered_prices = filtered_prices
+        self.instruments = instruments
+        self.stop_event = threading.Event()
+
+        prices = queue.Queue(QUEUE_SIZE)
+        predictions = queue.Queue(QUEUE_SIZE)
+        self.feed = FeedStage(self.stop_event, prices, feed_interval, source, instruments, simulator)
+        self.estimator = EstimatorStage(self.stop_event, prices, predictions, lpc_order, window_size,
+                                        decay_factor, history=raw_prices, instruments=instruments,
+                                        max_order=max_order)
+        self.metrics = MetricsStage(self.stop_event, predictions, window_size, raw_prices, filtered_prices,
+                                    exporter, instruments, quality)
+        self.stages = [self.feed, self.estimator, self.metrics]
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def join(self, timeout=None):
+        """Wait for the stages to exit, then publish the ticks still queued between them."""
+        for stage in self.stages:
+            stage.join(timeout)
+        if not any(stage.is_alive() for stage in self.stages):
+            self._drain()
+
+    def _drain(self):
+        """Run every tick left between stopped stages through the rest of the pipeline, oldest first."""
+        for first in range(len(self.stages) - 1, 0, -1):
+            pending = []
+            while True:
+                try:
+                    pending.append(self.stages[first].inputs.get_nowait())
+                except queue.Empty:
+                    break
+            previous = self.stages[first - 1]
+            pending.append(previous.unsent)  # Newer than everything queued behind it
+            previous.unsent = None
+            for item in pending:
+                for stage in self.stages[first:]:
+                    if item is None or isinstance(item, Snapshot):
+                        break  # Dropped tick, or a snapshot nobody waits for any more
+                    item = stage.process(item)
+                    stage.processed += 1
+
+    def configure(self, **changes):
+        """Retune lpc_order, window_size and/or decay_factor from the next tick on. Thread-safe."""
+        return self.estimator.configure(**changes)
+
+    @property
+    def params(self):
+        """The EstimatorParams the estimator currently predicts with."""
+        return self.estimator.params
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    @property
+    def success_rate(self):
+        return self.metrics.success_rate
+
+    @property
+    def quality(self):
+        """The metrics.PredictionMetrics scoring this run."""
+        return self.metrics.quality
+
+    def state(self, timeout=1.0):
+        """
+        Return a consistent snapshot of every stage, keys prefixed with the stage name.
+
+        A running pipeline is not paused: a Snapshot marker is sent through
+        the stages behind the ticks in flight. A stopped pipeline is joined
+        (publishing its queued ticks) and read directly, as is one that has
+        not been started.
+
+        Parameters:
+            timeout (float): Seconds to wait for the marker, or for the stages to exit.
+
+        Returns:
+            dict: Arrays keyed by "<stage>/<name>", np.savez-compatible.
+        """
+        if not self.running and any(stage.is_alive() for stage in self.stages):
+            self.join(timeout)
+            if any(stage.is_alive() for stage in self.stages):
+                raise TimeoutError(f"Pipeline did not stop within {timeout}s")
+        if not any(stage.is_alive() for stage in self.stages):
+            state = {}
+            for stage in self.stages:
+                state.update({f"{stage.name}/{key}": value for key, value in stage.state().items()})
+            return state
+        snapshot = Snapshot()
+        self.feed.snapshots.put(snapshot)
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                return snapshot.reply.get(timeout=0.05)
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if not self.running:
+                    return self.state(max(remaining, 0.1))  # Stopped while the marker was in flight
+                if remaining <= 0:
+                    raise TimeoutError(f"Pipeline snapshot not completed within {timeout}s") from None
+
+    def stats(self):
+        """Return the statistics of every stage, keyed by stage name."""
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -1,87 +1,224 @@
 import numpy as np
-from analysis import arburg_vector
-from stock_simulation import fetch_stock_price
 import time
+from functools import lru_cache
+from decimation import MinMaxPyramid
+
+MIN_SPAN = 50  # Fewest ticks the view can be zoomed in to
+
+
+# Plot Renderer
+class BlitRenderer:
+    """
+    Incremental renderer for the real-time price plot.
+
+    Prices are kept in one decimation.MinMaxPyramid per line, so a frame
+    draws at most about `points` points per line at any zoom level: the
+    last `span` ticks while following the live edge, or any older range
+    while browsing. Persistent Line2D artists are blitted over a cached
+    background; a full canvas.draw() only happens when the view changes
+    or the data leaves the current Y-limits (or shrinks to less than half
+    of them), so frame time does not grow with the session length.
+
+    Scrolling over the plot zooms in and out, the left and right arrow
+    keys move by half a view, and End returns to the live edge.
+
+    Parameters:
+        fig, ax, canvas: Matplotlib figure, axes and canvas to draw on.
+        visible (int): Number of most recent ticks shown at first.
+        margin (float): Padding added around the price range when the Y-axis is rescaled.
+        points (int): Most points drawn per line, about the plot width in pixels.
+        capacity (int): Most recent ticks kept for browsing, e.g. the price RingBuffer's
+            capacity. Unbounded if None.
+    """
+
+    def __init__(self, fig, ax, canvas, visible=500, margin=5, points=1000, capacity=None):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.visible = visible
+        self.margin = margin
+        self.points = points
+        self.raw = MinMaxPyramid(capacity=capacity)
+        self.filtered = MinMaxPyramid(capacity=capacity)
+        self.span = visible  # Ticks in view
+        self.end = None  # Tick the view ends at while browsing, None to follow the live edge
+        self._view_changed = True
+
+        ax.clear()
+        (self.raw_line,) = ax.plot([], [], label="Raw Prices", color="blue", animated=True)
+        (self.filtered_line,) = ax.plot([], [], label="Filtered Prices", color="red", animated=True)
+        self.status = ax.text(0.01, 0.97, "", transform=ax.transAxes, va="top", animated=True)
+        ax.legend(loc="upper right")
+        ax.set_title("Stock Price with LPC Filtering")
+        ax.set_ylabel("Price")
+
+        self.fps = 0.0
+        self._frames = 0
+        self._fps_start = time.perf_counter()
+        self.background = None
+        self._cids = [
+            canvas.mpl_connect("draw_event", self._on_draw),
+            canvas.mpl_connect("scroll_event", self._on_scroll),
+            canvas.mpl_connect("key_press_event", self._on_key),
+        ]
+        canvas.draw()
+
+    def _on_draw(self, event):
+        """Cache the static background after every full redraw."""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in (self.raw_line, self.filtered_line, self.status):
+            self.ax.draw_artist(artist)
+
+    def _on_scroll(self, event):
+        """Zoom in (scroll up) or out (scroll down) by a factor of two."""
+        if event.inaxes is not self.ax:
+            return
+        span = self.span // 2 if event.button == "up" else self.span * 2
+        self.span = min(max(span, MIN_SPAN), max(len(self.raw) - self.raw.start, self.visible))
+        self._view_changed = True
+
+    def _on_key(self, event):
+        """Browse back (left) and forward (right) by half a view; End follows the live edge again."""
+        end = len(self.raw) if self.end is None else self.end
+        if event.key == "left":
+            self.end = max(end - self.span // 2, min(self.raw.start + self.span, len(self.raw)))
+        elif event.key == "right":
+            end += self.span // 2
+            self.end = end if end < len(self.raw) else None
+        elif event.key == "end":
+            self.end = None
+        else:
+            return
+        self._view_changed = True
+
+    def push(self, raw_price, filtered_price):
+        """Append one tick of raw and filtered prices."""
+        self.raw.append(raw_price)
+        self.filtered.append(filtered_price)
+
+    def extend(self, raw_prices, filtered_prices, start=None):
+        """
+        Append many ticks of raw and filtered prices at once.
+
+        Parameters:
+            start (int): Tick position of the first price. Ticks skipped since the
+                last call (evicted before they were drawn) are left as a gap.
+        """
+        if start is not None:
+            self.raw.skip_to(start)
+            self.filtered.skip_to(start)
+        self.raw.extend(raw_prices)
+        self.filtered.extend(filtered_prices)
+
+    def _ylim_needs_update(self, low, high):
+        bottom, top = self.ax.get_ylim()
+        return low < bottom or high > top or (high - low + 2 * self.margin) < (top - bottom) / 2
+
+    def draw(self, status=""):
+        """Render the current view, blitting unless the axes have to change."""
+        end = len(self.raw) if self.end is None else max(self.end, min(self.raw.start + self.span, len(self.raw)))
+        start = max(self.raw.start, end - self.span)
+        x, y = self.raw.query(start, end, self.points)
+        fx, fy = self.filtered.query(start, end, self.points)
+        self.raw_line.set_data(x - start, y)
+        self.filtered_line.set_data(fx - start, fy)
+        self.status.set_text(f"{status}\nRender FPS: {self.fps:.1f}" if status else f"Render FPS: {self.fps:.1f}")
+
+        redraw = self._view_changed
+        if redraw:
+            self._view_changed = False
+            self.ax.set_xlim(0, self.span - 1)
+            self.ax.set_xlabel(f"Time (last {self.span} ticks)" if self.end is None
+                               else f"Time (ticks {start} to {end})")
+        values = np.concatenate((y, fy))
+        values = values[~np.isnan(values)]
+        if len(values) and self._ylim_needs_update(values.min(), values.max()):
+            self.ax.set_ylim(values.min() - self.margin, values.max() + self.margin)
+            redraw = True
+        if redraw:
+            self.canvas.draw()  # Refreshes the cached background through _on_draw
+        elif self.background is not None:
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+            self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+
+        # Measured render rate, refreshed about once per second
+        self._frames += 1
+        elapsed = time.perf_counter() - self._fps_start
+        if elapsed >= 1.0:
+            self.fps = self._frames / elapsed
+            self._frames = 0
+            self._fps_start = time.perf_counter()
+
+    def close(self):
+        """Detach from the canvas."""
+        for cid in self._cids:
+            self.canvas.mpl_disconnect(cid)
 
-# Initialize a static variable to track time for stock price simulation
-fetch_stock_price.t = 0
 
 # Utility Functions
-def set_smooth_ylim(ax, all_prices, margin=5):
-    min_price, max_price = min(all_prices), max(all_prices)
-    current_ylim = ax.get_ylim()
-    target_ylim = (min_price - margin, max_price + margin)
-
-    # Smoothly transition Y-axis limits
-    new_ylim = (
-        current_ylim[0] * 0.9 + target_ylim[0] * 0.1,
-        current_ylim[1] * 0.9 + target_ylim[1] * 0.1,
-    )
-    ax.set_ylim(new_ylim)
+@lru_cache(maxsize=256)
+def decay_weights(order, decay_factor):
+    """Weights exp(-decay_factor * i) for i < order, cached per (order, decay_factor) and read-only."""
+    weights = np.exp(-decay_factor * np.arange(order))
+    weights.flags.writeable = False
+    return weights
+
 
 def apply_decay(coeffs, decay_factor):
-    decay_weights = np.exp(-decay_factor * np.arange(len(coeffs)))
-    return coeffs * decay_weights
+    return coeffs * decay_weights(len(coeffs), decay_factor)
 
 
-# Real-Time Plotting Function
-def real_time_plot(lpc_order, window_size, decay_factor, fig, ax, canvas, plot_running, raw_prices, filtered_prices):
-    success_count = 0
-    total_predictions = 0
-    margin_of_error = None  # Dynamically calculated during the run
-
-    while plot_running():
-        # Fetch the next stock price
-        new_price = fetch_stock_price()
-        raw_prices.append(new_price)
-
-        # Dynamically calculate margin of error based on recent raw prices
-        if len(raw_prices) > 1:
-            margin_of_error = np.std(raw_prices[-window_size.get():]) * 0.5  # Half the recent volatility
-
-        # Apply LPC filter if enough data points exist
-        if len(raw_prices) >= lpc_order.get():
-            try:
-                coeffs, _, _ = arburg_vector(np.array(raw_prices), order=lpc_order.get())
-                decayed_coeffs = apply_decay(coeffs, decay_factor.get())
-                filtered_price = -np.dot(decayed_coeffs, raw_prices[-lpc_order.get():])
-            except Exception as e:
-                print(f"Error in LPC filtering: {e}")
-                filtered_price = np.nan  # Handle LPC failures gracefully
-            filtered_prices.append(filtered_price)
-
-            # Check prediction success
-            if not np.isnan(filtered_price) and len(raw_prices) > lpc_order.get():
-                total_predictions += 1
-                if abs(filtered_price - raw_prices[-1]) <= margin_of_error:
-                    success_count += 1
-        else:
-            filtered_prices.append(new_price)
+def format_stage_stats(stats):
+    """One line per pipeline stage with its queue depth and latency."""
+    return "\n".join(
+        f"{name}: queue {stage['queue_depth']}, {stage['latency_ms']:.2f} ms"
+        for name, stage in stats.items()
+    )
 
-        # Calculate predictive success rate
-        success_rate = (success_count / total_predictions * 100) if total_predictions > 0 else 0
 
-        # Update the plot
-        ax.clear()
-        ax.plot(raw_prices, label="Raw Prices", color="blue")
-        ax.plot(filtered_prices, label="Filtered Prices", color="red")
-        ax.legend()
-
-        # Add predictive success rate to the plot title
-        ax.set_title(
-            f"Stock Price with LPC Filtering\n"
-            f"Predictive Success Rate: {success_rate:.2f}"
+# Real-Time Plotting Function
+def real_time_plot(pipeline, fig, ax, canvas, plot_running, raw_prices, filtered_prices, fps=30):
+    """
+    Renders a running pipeline from Tk's after() loop.
+
+    Must be called from the Tk main thread. Every frame pushes the ticks
+    published since the previous frame to the renderer in one batch, so
+    the display rate never limits how many ticks the pipeline processes,
+    and every price still held in raw_prices can be browsed. The renderer
+    keeps as many ticks as raw_prices, and ticks evicted before a frame
+    could draw them are left as a gap, so tick positions stay exact. Frame
+    times are recorded as the "render" stage when the pipeline is
+    instrumented.
+    """
+    renderer = BlitRenderer(fig, ax, canvas, capacity=raw_prices.capacity)
+    widget = canvas.get_tk_widget()
+    rendered = raw_prices.start  # Every price still held is browsable
+
+    def frame():
+        nonlocal rendered
+        if not plot_running():
+            renderer.close()
+            return
+
+        # Ticks published since the last frame go into the decimation pyramids in one batch
+        available = len(raw_prices)
+        start = max(rendered, raw_prices.start, filtered_prices.start)
+        renderer.extend(raw_prices[start:available], filtered_prices[start:available], start)
+        rendered = available
+
+        instruments = pipeline.instruments
+        start = time.perf_counter() if instruments is not None else 0.0
+        renderer.draw(
+            f"Predictive Success Rate: {pipeline.success_rate:.2f}\n"
+            f"{format_stage_stats(pipeline.stats())}"
         )
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Price")
-
-        # Dynamically adjust Y-axis
-        all_prices = [p for p in raw_prices + filtered_prices if not np.isnan(p)]  # Exclude NaNs
-        if all_prices:
-            set_smooth_ylim(ax, all_prices)
-
-        # Redraw the canvas
-        canvas.draw()
+        if instruments is not None:
+            instruments.record("render", time.perf_counter() - start)
+        widget.after(int(1000 / fps), frame)
 
-        # Sleep to maintain 30 FPS
-        time.sleep(1 / 30)
+    frame()
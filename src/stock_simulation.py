@@ -1,3 +1,4 @@
+import json
 import numpy as np
 
 # Parameters for Brownian Motion
@@ -21,21 +22,152 @@ def gbm_levels(s0, delta, sigma, time, mu, paths):
     stacked = np.vstack([np.ones(paths), returns])
     return s0 * stacked.cumprod(axis=0)
 
-# Precompute GBM Prices
-gbm_prices = gbm_levels(s0, delta, sigma, time, mu, paths).flatten()  # Precompute GBM path
-gbm_index = 0  # Initialize index for tracking GBM progression
+# Chunked GBM Simulator
+class GBMSimulator:
+    """
+    Lazily generated, optionally correlated Geometric Brownian Motion paths.
 
-def fetch_stock_price():
-    global gbm_index
-    if gbm_index < len(gbm_prices):
-        price = gbm_prices[gbm_index]
-        gbm_index += 1
+    Prices are produced in vectorised chunks of `chunk_size` ticks only when
+    they are requested, so memory stays constant and nothing is computed up
+    front. With a seed, reset() replays exactly the same paths.
+
+    Parameters:
+        n_paths (int): Number of simulated paths (symbols).
+        s0, mu, sigma (float or numpy.ndarray): Initial price, drift and volatility, scalar or one per path.
+        delta (float): Time step.
+        correlation (numpy.ndarray): Correlation matrix of the paths' shocks. Independent if None.
+        seed (int): Seed of the random generator.
+        chunk_size (int): Number of ticks generated at once.
+    """
+
+    def __init__(self, n_paths=1, s0=s0, mu=mu, sigma=sigma, delta=delta, correlation=None, seed=None,
+                 chunk_size=4096):
+        self.n_paths = n_paths
+        self.s0 = np.broadcast_to(np.asarray(s0, dtype=float), (n_paths,))
+        self.mu = np.broadcast_to(np.asarray(mu, dtype=float), (n_paths,))
+        self.sigma = np.broadcast_to(np.asarray(sigma, dtype=float), (n_paths,))
+        self.delta = delta
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.cholesky = None
+        if correlation is not None:
+            correlation = np.asarray(correlation, dtype=float)
+            if correlation.shape != (n_paths, n_paths):
+                raise ValueError("correlation must be an (n_paths, n_paths) matrix")
+            self.cholesky = np.linalg.cholesky(correlation)
+        self.reset()
+
+    def reset(self):
+        """Restart all paths from s0; with a seed the same prices are replayed."""
+        self.rng = np.random.default_rng(self.seed)
+        self.last = self.s0.copy()
+        self.index = 0  # Number of ticks handed out so far
+        self._chunk = np.empty((0, self.n_paths))
+        self._pos = 0
+
+    def _generate(self, n):
+        """Generate the next n ticks of every path. Shape: (n, n_paths)."""
+        shocks = self.rng.standard_normal((n, self.n_paths))
+        if self.cholesky is not None:
+            shocks = shocks @ self.cholesky.T
+        log_returns = (self.mu - self.sigma ** 2 / 2) * self.delta + self.sigma * np.sqrt(self.delta) * shocks
+        prices = self.last * np.exp(np.cumsum(log_returns, axis=0))
+        self.last = prices[-1]
+        return prices
+
+    def fetch(self, n):
+        """
+        Return the next n ticks of every path.
+
+        Parameters:
+            n (int): Number of ticks.
+
+        Returns:
+            numpy.ndarray: Prices. Shape: (n, n_paths).
+        """
+        remaining = len(self._chunk) - self._pos
+        if n <= remaining:
+            prices = self._chunk[self._pos:self._pos + n]
+            self._pos += n
+        else:
+            prices = np.concatenate((self._chunk[self._pos:], self._generate(n - remaining)))
+            self._chunk = np.empty((0, self.n_paths))
+            self._pos = 0
+        self.index += n
+        return prices
+
+    def next_price(self, path=0):
+        """Return the next tick of one path; the other paths advance too."""
+        if self._pos >= len(self._chunk):
+            self._chunk = self._generate(self.chunk_size)
+            self._pos = 0
+        price = self._chunk[self._pos, path]
+        self._pos += 1
+        self.index += 1
         return price
-    else:
-        gbm_index = 0  # Restart the simulation if it reaches the end
-        return gbm_prices[gbm_index]
+
+    def state(self):
+        """Return the position of every path (generator state, last price, index) as arrays."""
+        return {
+            "rng": np.array(json.dumps(self.rng.bit_generator.state)),
+            "last": self.last.copy(),
+            "index": np.array(self.index),
+            "chunk": self._chunk[self._pos:].copy(),  # Generated but not yet handed out
+        }
+
+    def load_state(self, state):
+        """Continue from a state() of a simulator with the same paths and parameters."""
+        last = np.asarray(state["last"], dtype=float)
+        if last.shape != (self.n_paths,):
+            raise ValueError(f"State has {last.size} paths, not {self.n_paths}")
+        self.rng.bit_generator.state = json.loads(str(state["rng"]))
+        self.last = last
+        self.index = int(state["index"])
+        self._chunk = np.asarray(state["chunk"], dtype=float).reshape(-1, self.n_paths)
+        self._pos = 0
+
+    def __iter__(self):
+        """Iterate over chunks of chunk_size ticks. Shape of each: (chunk_size, n_paths)."""
+        while True:
+            yield self.fetch(self.chunk_size)
+
+
+def driftless_simulator(n_paths=1, seed=0, **kwargs):
+    """
+    GBMSimulator whose log-price has no drift (mu = sigma^2 / 2), as used by the module demos and benchmarks.
+
+    Parameters:
+        n_paths (int): Number of simulated paths.
+        seed (int): Seed of the random generator.
+        **kwargs: Any other GBMSimulator argument except mu.
+
+    Returns:
+        GBMSimulator: The simulator.
+    """
+    volatility = kwargs.get("sigma", sigma)
+    return GBMSimulator(n_paths=n_paths, mu=np.square(volatility) / 2, seed=seed, **kwargs)
+
+
+_simulator = None  # Default single-path simulator, created on first use
+
+
+def default_simulator():
+    """Return the simulator behind fetch_stock_price(), creating it on first use."""
+    global _simulator
+    if _simulator is None:
+        _simulator = GBMSimulator()
+    return _simulator
+
+
+def fetch_stock_price():
+    return default_simulator().next_price()
 
 # Test Function
 if __name__ == "__main__":
     for _ in range(10):
         print(fetch_stock_price())
+
+    # Four correlated paths, fetched as one batch
+    correlation = np.full((4, 4), 0.5) + 0.5 * np.eye(4)
+    simulator = GBMSimulator(n_paths=4, correlation=correlation, seed=0)
+    print(simulator.fetch(5))
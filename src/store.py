@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+INDEX_STRIDE = 4096  # Ticks between two entries of the sparse time index
+TIME_FILE = "time.i8"
+PRICE_FILE = "price.f8"
+INDEX_FILE = "index.i8"
+
+
+def _memmap(path, dtype, n):
+    """Read-only memory map of the first n values of a file (an empty array if n is 0)."""
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(n,))
+
+
+def _count(path, dtype):
+    return os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0
+
+
+class SymbolWriter:
+    """
+    Append-only writer of one symbol's ticks.
+
+    Times (int64 ns) and prices (float64) are appended as raw little-endian
+    values to one file per column, and the time of every index_stride-th
+    tick to the sparse index. Appends only go through the file buffers;
+    call flush() to make them visible to readers.
+
+    Parameters:
+        path (str): Directory of the symbol.
+        index_stride (int): Ticks between two index entries.
+    """
+
+    def __init__(self, path, index_stride=INDEX_STRIDE):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.index_stride = index_stride
+        time_path = os.path.join(path, TIME_FILE)
+        # Columns of an interrupted write are cut back to their common length
+        self.count = min(_count(time_path, "<i8"), _count(os.path.join(path, PRICE_FILE), "<f8"))
+        self.last_time = int(_memmap(time_path, "<i8", self.count)[-1]) if self.count else np.iinfo(np.int64).min
+        for name, dtype in ((TIME_FILE, "<i8"), (PRICE_FILE, "<f8")):
+            with open(os.path.join(path, name), "ab") as f:
+                f.truncate(self.count * np.dtype(dtype).itemsize)
+        index_path = os.path.join(path, INDEX_FILE)
+        if _count(index_path, "<i8") != -(-self.count // index_stride):
+            # A missing, cut or stale index is rebuilt from the times, so it
+            # never holds entries that do not match the columns
+            entries = np.array(_memmap(time_path, "<i8", self.count)[::index_stride])
+            with open(index_path + ".tmp", "wb") as f:
+                f.write(entries.tobytes())
+            os.replace(index_path + ".tmp", index_path)
+        self._times = open(time_path, "ab")
+        self._prices = open(os.path.join(path, PRICE_FILE), "ab")
+        self._index = open(index_path, "ab")
+
+    def extend(self, prices, times=None):
+        """
+        Append many ticks.
+
+        Parameters:
+            prices (numpy.ndarray): Prices.
+            times (numpy.ndarray): Timestamps in ns, non-decreasing and not older
+                than the last stored tick. Defaults to now for every tick.
+        """
+        prices = np.ascontiguousarray(prices, dtype="<f8").ravel()
+        if times is None:
+            times = np.full(len(prices), time.time_ns(), dtype="<i8")
+        else:
+            times = np.ascontiguousarray(times, dtype="<i8").ravel()
+        if len(times) != len(prices):
+            raise ValueError("times and prices must have the same length")
+        if not len(prices):
+            return
+        if times[0] < self.last_time or np.any(np.diff(times) < 0):
+            raise ValueError("Tick times must be non-decreasing")
+
+        self._times.write(times.tobytes())
+        self._prices.write(prices.tobytes())
+        first = -self.count % self.index_stride  # Offset of the first new index position
+        self._index.write(times[first::self.index_stride].tobytes())
+        self.count += len(prices)
+        self.last_time = int(times[-1])
+
+    def append(self, price, time_ns=None):
+        """Append one tick, timestamped now unless time_ns is given."""
+        self.extend([price], None if time_ns is None else [time_ns])
+
+    def flush(self):
+        # Index first: readers size everything by the columns, so an index
+        # entry must never lag behind the ticks it points into
+        for f in (self._index, self._times, self._prices):
+            f.flush()
+
+    def close(self):
+        for f in (self._times, self._prices, self._index):
+            f.close()
+
+
+class TickStore:
+    """
+    On-disk columnar tick store, one directory per symbol.
+
+    Reads are zero-copy memory maps, so months of ticks can be windowed,
+    backtested or fed to arburg_vector/arburg_matrix without loading them.
+    A sparse index holding every index_stride-th timestamp turns a time
+    lookup into a binary search over the index plus one over a single block.
+
+    Parameters:
+        root (str): Store directory, created if needed.
+        index_stride (int): Ticks between two index entries. Fixed when the store is created.
+    """
+
+    def __init__(self, root, index_stride=INDEX_STRIDE):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        meta_path = os.path.join(root, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                index_stride = json.load(f)["index_stride"]
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"index_stride": index_stride}, f)
+        self.index_stride = index_stride
+        self.writers = {}
+
+    def _path(self, symbol, name=""):
+        return os.path.join(self.root, str(symbol), name)
+
+    def symbols(self):
+        """Return the names of all stored symbols."""
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def writer(self, symbol):
+        """Return the append-only writer of a symbol, opening it on first use."""
+        writer = self.writers.get(str(symbol))
+        if writer is None:
+            writer = self.writers[str(symbol)] = SymbolWriter(self._path(symbol), self.index_stride)
+        return writer
+
+    def append_ticks(self, ticks):
+        """
+        Append a batch of ticks of any symbols.
+
+        Parameters:
+            ticks (numpy.ndarray): Structured array with time, symbol and price fields (ingest.TICK_DTYPE).
+        """
+        symbols = ticks["symbol"]
+        for symbol in np.unique(symbols):
+            batch = ticks[symbols == symbol]
+            self.writer(symbol).extend(batch["price"], batch["time"])
+
+    def flush(self):
+        for writer in list(self.writers.values()):  # May run while another thread opens writers
+            writer.flush()
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.symbols())
+
+    def count(self, symbol):
+        """Number of ticks of a symbol visible to readers."""
+        return min(_count(self._path(symbol, TIME_FILE), "<i8"), _count(self._path(symbol, PRICE_FILE), "<f8"))
+
+    def times(self, symbol):
+        """All timestamps of a symbol as a read-only memory map."""
+        return _memmap(self._path(symbol, TIME_FILE), "<i8", self.count(symbol))
+
+    def prices(self, symbol):
+        """All prices of a symbol as a read-only memory map."""
+        return _memmap(self._path(symbol, PRICE_FILE), "<f8", self.count(symbol))
+
+    def locate(self, symbol, t):
+        """Position of the first tick of a symbol at or after time t (ns)."""
+        times = self.times(symbol)
+        index_path = self._path(symbol, INDEX_FILE)
+        index = _memmap(index_path, "<i8", min(-(-len(times) // self.index_stride), _count(index_path, "<i8")))
+        block = int(np.searchsorted(index, t, side="left"))
+        if block == 0:
+            return 0  # index[0] is the first tick's time
+        # The answer lies after index entry block - 1 and at or before entry block
+        low = (block - 1) * self.index_stride
+        high = block * self.index_stride if block < len(index) else len(times)
+        return low + int(np.searchsorted(times[low:high], t, side="left"))
+
+    def window(self, symbol, start=None, end=None):
+        """
+        Ticks of a symbol with start <= time < end, without copying.
+
+        Parameters:
+            symbol: Symbol name or id.
+            start, end (int): Time bounds in ns. Open-ended if None.
+
+        Returns:
+            tuple: (times, prices) as read-only memory-mapped slices.
+        """
+        low = 0 if start is None else self.locate(symbol, start)
+        high = self.count(symbol) if end is None else self.locate(symbol, end)
+        return self.times(symbol)[low:high], self.prices(symbol)[low:high]
+
+    def last(self, symbol, n):
+        """The n most recent prices of a symbol, without copying."""
+        prices = self.prices(symbol)
+        return prices[max(0, len(prices) - n):]
+
+    def windows(self, symbol, size, start=None, end=None):
+        """
+        Every length-`size` window of a symbol's prices in [start, end), one per column.
+
+        The result is a strided view of the memory map, shaped as
+        arburg_matrix and arburg_batch expect. Shape: (size, n_windows).
+        """
+        _, prices = self.window(symbol, start, end)
+        if len(prices) < size:
+            return np.empty((size, 0))
+        return sliding_window_view(prices, size).T
+
+
+if __name__ == "__main__":
+    import tempfile
+    from analysis import arburg_vector, arburg_batch
+    from stock_simulation import driftless_simulator
+
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(root)
+        simulator = driftless_simulator(n_paths=4)
+        t0 = time.time_ns()
+        for chunk in range(100):
+            prices = simulator.fetch(10_000)
+            times = t0 + (chunk * 10_000 + np.arange(10_000)) * 1_000_000  # One tick per ms
+            for symbol in range(4):
+                store.writer(symbol).extend(prices[:, symbol], times)
+        store.flush()
+        print(f"{store.count(0)} ticks per symbol in {len(store)} symbols")
+
+        start = time.perf_counter()
+        times, prices = store.window(0, t0 + 600_000 * 1_000_000, t0 + 600_200 * 1_000_000)
+        print(f"{len(prices)}-tick window located in {(time.perf_counter() - start) * 1e6:.0f} us")
+        a, E, _ = arburg_vector(prices, 10)
+
+        start = time.perf_counter()
+        windows = store.windows(1, 50, t0, t0 + 10_000 * 1_000_000)
+        a, E, ref = arburg_batch(windows, 10)
+        print(f"{windows.shape[1]} windows fitted straight from the memory map in "
+              f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+        store.close()
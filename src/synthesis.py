@@ -1,5 +1,9 @@
 import numpy as np
 from scipy.signal import lfilter
+try:
+    from . import kernels
+except ImportError:  # Run as a flat module from src/
+    import kernels
 
 
 def gen_ts(a, sigma=1, n_samples=1000, data=None):
@@ -28,3 +32,134 @@ def gen_ts(a, sigma=1, n_samples=1000, data=None):
     time_series = np.real(time_series)
 
     return time_series
+
+
+def _all_pole_zi(A, past):
+    """
+    lfilter state of 1 / A(z) that continues after the outputs in `past`.
+
+    Parameters:
+    - A (numpy.ndarray): LPC coefficients without the leading 1. Shape: (order, obs).
+    - past (numpy.ndarray): Most recent outputs, oldest first. Shape: (order, obs).
+
+    Returns:
+    - numpy.ndarray: Direct form II transposed state. Shape: (order, obs).
+    """
+    order = len(A)
+    zi = np.zeros_like(past)
+    for i in range(order):
+        # zi[i] = -sum over k = i+1..order of a[k] * y[i - k]
+        zi[i] = -np.einsum('kj,kj->j', A[i:], past[::-1][:order - i])
+    return zi
+
+
+class ARSynthesizer:
+    """
+    Endless AR time series generator with filter state carried between blocks.
+
+    Keeps the last `order` outputs of every series, so consecutive calls to
+    generate() continue the same series seamlessly and memory stays constant.
+    The state does not depend on the coefficients, which can therefore change
+    from block to block. A single coefficient set is shared by all series in
+    one lfilter call. Independent sets (one per column) run in one call of
+    the compiled kernels.ar_filter_kernel when numba is available; without
+    it, scipy has no batched filter with per-column coefficients, so they
+    fall back to a recursion vectorised across series, or one lfilter call
+    per series when there are fewer series than samples in the block.
+
+    Parameters:
+    - a (numpy.ndarray): LPC coefficients [a1, a2, ...] (without the leading 1). Shape: (order,) to share
+      one model, or (order, n_series) for one model per column as returned by arburg_matrix.
+    - n_series (int): Number of series. Defaults to the number of columns of 'a'.
+    - sigma (float or numpy.ndarray): Noise power, scalar or one per series. Defaults to 1.
+    - seed (int): Seed of the random generator. With a seed, reset() replays the same series.
+    - chunk_size (int): Number of samples per block yielded by iteration.
+    """
+
+    def __init__(self, a, n_series=None, sigma=1, seed=None, chunk_size=4096):
+        A = self._check(a)
+        self.order = A.shape[0]
+        self.n_series = A.shape[1] if n_series is None else n_series
+        if A.shape[1] not in (1, self.n_series):
+            raise ValueError("a must hold one model, or one model per series")
+        self.a = A
+        self.sigma = np.broadcast_to(np.asarray(sigma, dtype=float), (self.n_series,))
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.reset()
+
+    @staticmethod
+    def _check(a):
+        A = np.asarray(a, dtype=float)
+        if A.ndim == 1:
+            A = A[:, None]
+        if A.ndim != 2 or A.shape[0] == 0:
+            raise ValueError("a must have shape (order,) or (order, n_series) with order > 0")
+        return A
+
+    def reset(self):
+        """Restart every series from silence."""
+        self.rng = np.random.default_rng(self.seed)
+        self.past = np.zeros((self.order, self.n_series))  # Last `order` outputs, oldest first
+        self.index = 0  # Number of samples generated so far
+
+    def set_coefficients(self, a):
+        """Replace the coefficients used from the next block on. The order cannot change."""
+        A = self._check(a)
+        if A.shape[0] != self.order or A.shape[1] not in (1, self.n_series):
+            raise ValueError(f"a must have shape ({self.order},) or ({self.order}, {self.n_series})")
+        self.a = A
+
+    def generate(self, n, a=None, data=None):
+        """
+        Generate the next n samples of every series.
+
+        Parameters:
+        - n (int): Number of samples.
+        - a (numpy.ndarray): Coefficients for this and later blocks (see set_coefficients). Defaults to the current ones.
+        - data (numpy.ndarray): Excitation to filter instead of white noise. Shape: (n, n_series).
+
+        Returns:
+        - numpy.ndarray: Generated samples. Shape: (n, n_series).
+        """
+        if a is not None:
+            self.set_coefficients(a)
+        if data is None:
+            data = self.rng.standard_normal((n, self.n_series)) * self.sigma
+        else:
+            data = np.asarray(data, dtype=float).reshape(n, self.n_series)
+
+        A = self.a
+        ar_filter = kernels.kernel("ar_filter") if A.shape[1] > 1 else None
+        if A.shape[1] == 1:
+            # Shared model: one lfilter call over all series
+            zi = _all_pole_zi(np.broadcast_to(A, self.past.shape), self.past)
+            y, _ = lfilter([1], np.hstack(([1], A[:, 0])), data, axis=0, zi=zi)
+        elif ar_filter is not None:
+            # One model per series: one compiled call over all of them
+            y = ar_filter(np.ascontiguousarray(A), np.ascontiguousarray(self.past), np.ascontiguousarray(data))
+        elif self.n_series < n:
+            # Few long series: one compiled call per series
+            zi = _all_pole_zi(A, self.past)
+            y = np.empty_like(data)
+            for j in range(self.n_series):
+                y[:, j], _ = lfilter([1], np.hstack(([1], A[:, j])), data[:, j], zi=zi[:, j])
+        else:
+            # Many series: step through time, vectorised across series
+            order = self.order
+            buffer = np.empty((order + n, self.n_series))
+            buffer[:order] = self.past
+            reversed_a = A[::-1]
+            for t in range(n):
+                buffer[order + t] = data[t] - np.einsum('kj,kj->j', reversed_a, buffer[t:order + t])
+            y = buffer[order:]
+
+        # Keep the last `order` outputs, including those from earlier blocks when n < order
+        self.past = np.concatenate((self.past, y))[-self.order:]
+        self.index += n
+        return y
+
+    def __iter__(self):
+        """Iterate over blocks of chunk_size samples. Shape of each: (chunk_size, n_series)."""
+        while True:
+            yield self.generate(self.chunk_size)
@@ -1,5 +1,5 @@
 import numpy as np
-from scipy import signal as sig
+from functools import lru_cache
 
 def arcoeff_to_cep(a, sigma_squared, N):
     """
@@ -13,15 +13,7 @@ def arcoeff_to_cep(a, sigma_squared, N):
     Returns:
     - numpy.ndarray: First N cepstral coefficients (c0, c1, ..., cN-1) where c0 = log(sigma^2).
     """
-    c = [0] * N
-    c[0] = np.log(sigma_squared)
-    c[1] = -a[0]
-    for n in range(2, N):
-        if n <= len(a):
-            c[n] = -a[n - 1] - sum((1 - m / n) * a[m - 1] * c[n - m] for m in range(1, n))
-        else:
-            c[n] = -sum((1 - m / n) * a[m - 1] * c[n - m] for m in range(1, len(a) + 1))
-    return c
+    return arcoeff_to_cep_matrix(np.asarray(a)[:, None], sigma_squared, N)[:, 0]
 
 def cep_to_arcoeff(c, order):
     """
@@ -34,11 +26,79 @@ def cep_to_arcoeff(c, order):
     Returns:
     - numpy.ndarray: LPC coefficients [a1, a2, ...] (without the leading 1).
     """
-    a = [0] * order
-    a[0] = -c[1]
+    return cep_to_arcoeff_matrix(np.asarray(c)[:, None], order)[:, 0]
+
+def arcoeff_to_cep_matrix(A, sigma_squared, N):
+    """
+    Calculate Cepstral Coefficients for many LPC models at once.
+
+    The recursion runs over the cepstrum index only; every step is one
+    vectorised operation across all models.
+
+    Parameters:
+    - A (numpy.ndarray): LPC coefficient matrix, one model per column as returned by arburg_matrix. Shape: (order, obs).
+    - sigma_squared (float or numpy.ndarray): Square of noise power, scalar or one per model.
+    - N (int): Desired length of cepstrum coefficients. Must be >= 2.
+
+    Returns:
+    - numpy.ndarray: Cepstral coefficients (c0, c1, ..., cN-1) per column. Shape: (N, obs).
+    """
+    A = np.asarray(A, dtype=float)
+    order, obs = A.shape
+    C = np.zeros((N, obs))
+    C[0] = np.log(sigma_squared)
+    C[1] = -A[0]
+    for n in range(2, N):
+        M = min(n - 1, order)
+        weights = 1 - np.arange(1, M + 1) / n
+        # sum over m = 1..M of (1 - m/n) * a[m] * c[n - m]
+        C[n] = -np.einsum('m,mj,mj->j', weights, A[:M], C[n - M:n][::-1])
+        if n <= order:
+            C[n] -= A[n - 1]
+    return C
+
+def cep_to_arcoeff_matrix(C, order):
+    """
+    Calculate LPC coefficients for many cepstra at once.
+
+    Parameters:
+    - C (numpy.ndarray): Cepstrum coefficient matrix, one model per column. Shape: (N, obs) with N > order.
+    - order (int): Order of the LPC models.
+
+    Returns:
+    - numpy.ndarray: LPC coefficients [a1, a2, ...] per column. Shape: (order, obs).
+    """
+    C = np.asarray(C, dtype=float)
+    A = np.zeros((order, C.shape[1]))
+    A[0] = -C[1]
     for i in range(2, order + 1):
-        a[i - 1] = -c[i] - sum((1 - m / i) * c[i - m] * a[m - 1] for m in range(1, i))
-    return a
+        weights = 1 - np.arange(1, i) / i
+        # sum over m = 1..i-1 of (1 - m/i) * c[i - m] * a[m]
+        A[i - 1] = -C[i] - np.einsum('m,mj,mj->j', weights, C[1:i][::-1], A[:i - 1])
+    return A
+
+def cep_distance_matrix(C1, C2=None, include_gain=False):
+    """
+    Calculate Euclidean cepstral distances between two sets of models.
+
+    Parameters:
+    - C1 (numpy.ndarray): Cepstrum coefficient matrix, one model per column. Shape: (N, obs1).
+    - C2 (numpy.ndarray): Second cepstrum matrix. Shape: (N, obs2). Defaults to C1.
+    - include_gain (bool): Include c0 (log noise power) in the distance. Default is False.
+
+    Returns:
+    - numpy.ndarray: Distance between every pair of columns. Shape: (obs1, obs2).
+    """
+    C1 = np.asarray(C1, dtype=float)
+    C2 = C1 if C2 is None else np.asarray(C2, dtype=float)
+    if not include_gain:
+        C1, C2 = C1[1:], C2[1:]
+    squared = (
+        np.einsum('ij,ij->j', C1, C1)[:, None]
+        + np.einsum('ij,ij->j', C2, C2)[None, :]
+        - 2 * C1.T @ C2
+    )
+    return np.sqrt(np.maximum(squared, 0))
 
 def freqz(a=1, sigma_squared=1, worN=1000, whole=False, fs=500):
     """
@@ -55,12 +115,53 @@ def freqz(a=1, sigma_squared=1, worN=1000, whole=False, fs=500):
     - numpy.ndarray: Array of frequencies in Hz.
     - numpy.ndarray: Power at each frequency in dB.
     """
-    a = np.insert(a, 0, 1)
-    b = np.zeros_like(a)
-    b[0] = 1
-    w, h = sig.freqz(b, a, worN=worN, whole=whole, fs=fs)
-    pwr = 20 * np.log10(abs(h) * np.sqrt(sigma_squared))
-    return w, pwr
+    w, pwr = freqz_matrix(np.atleast_1d(a)[:, None], sigma_squared, worN=worN, whole=whole, fs=fs)
+    return w, pwr[:, 0]
+
+@lru_cache(maxsize=32)
+def _freq_grid(worN, whole, fs):
+    """Frequency grid shared by every freqz_matrix call with the same settings."""
+    w = np.arange(worN) * (fs if whole else fs / 2) / worN
+    w.flags.writeable = False
+    return w
+
+def freqz_matrix(A, sigma_squared=1, worN=1000, whole=False, fs=500):
+    """
+    Calculate the power spectra of many LPC models in one FFT pass.
+
+    The coefficient matrix (with the leading 1 restored) is zero-padded to
+    the FFT length and transformed along its first axis, so all models are
+    evaluated on the same grid at once. The grid is cached between calls.
+
+    Parameters:
+    - A (numpy.ndarray): LPC coefficient matrix, one model per column as returned by arburg_matrix. Shape: (order, obs).
+    - sigma_squared (float or numpy.ndarray): Square of noise power, scalar or one per model. Default is 1.
+    - worN (int): Number of points for the frequency response computation. Default is 1000.
+    - whole (bool): Frequency range (0 to π if False, 0 to Nyquist if True). Default is False.
+    - fs (float): Sampling frequency in Hz. Default is 500.
+
+    Returns:
+    - numpy.ndarray: Array of frequencies in Hz. Shape: (worN,).
+    - numpy.ndarray: Power at each frequency in dB. Shape: (worN, obs).
+    """
+    A = np.asarray(A)
+    nfft = worN if whole else 2 * worN
+    a = np.empty((A.shape[0] + 1, A.shape[1]), dtype=A.dtype)
+    a[0] = 1
+    a[1:] = A
+    if len(a) > nfft:
+        # Fold coefficients beyond the FFT length (aliasing in time, exact on the grid)
+        a = np.concatenate((a, np.zeros((-len(a) % nfft, a.shape[1]), dtype=a.dtype)))
+        a = a.reshape(-1, nfft, a.shape[1]).sum(axis=0)
+
+    if whole or np.iscomplexobj(a):
+        spectrum = np.fft.fft(a, n=nfft, axis=0)[:worN]
+    else:
+        spectrum = np.fft.rfft(a, n=nfft, axis=0)[:worN]
+
+    # |H| = 1 / |A|, so the power in dB is 10*log10(sigma^2) - 20*log10(|A|)
+    pwr = 10 * np.log10(sigma_squared) - 20 * np.log10(np.abs(spectrum))
+    return _freq_grid(worN, whole, fs), pwr
 
 def arcoeff_warp(a, warp_factor, task="warp"):
     """
@@ -74,6 +175,42 @@ def arcoeff_warp(a, warp_factor, task="warp"):
     Returns:
     - numpy.ndarray: Warped or unwarped LPC coefficients [a1, a2, ...] (without the leading 1).
     """
+    return arcoeff_warp_matrix(np.asarray(a)[:, None], warp_factor, task)[:, 0]
+
+@lru_cache(maxsize=64)
+def _warp_matrix(order, c):
+    """
+    Substitution matrix T with T[:, k] = coefficients of (v + c)^k (1 + c v)^(order - k).
+
+    Replacing z^-1 = v by the all-pass (v + c) / (1 + c v) in A(z) and
+    clearing the common denominator (1 + c v)^order turns a_k v^k into
+    a_k (v + c)^k (1 + c v)^(order - k).
+    """
+    rising = [np.ones(1)]   # (v + c)^k
+    falling = [np.ones(1)]  # (1 + c v)^k
+    for _ in range(order):
+        rising.append(np.convolve(rising[-1], [c, 1]))
+        falling.append(np.convolve(falling[-1], [1, c]))
+    T = np.column_stack([np.convolve(rising[k], falling[order - k]) for k in range(order + 1)])
+    T.flags.writeable = False
+    return T
+
+def arcoeff_warp_matrix(A, warp_factor, task="warp"):
+    """
+    Recalculate many LPC models with frequency warping or unwarping.
+
+    Works directly on the coefficients through the all-pass substitution,
+    without polynomial root finding, so every model is mapped by one
+    cached (order + 1) x (order + 1) matrix product.
+
+    Parameters:
+    - A (numpy.ndarray): LPC coefficient matrix, one model per column as returned by arburg_matrix. Shape: (order, obs).
+    - warp_factor (float): Frequency warping factor (-1 to 1).
+    - task (str): Objective of the function ("warp" or "unwarp").
+
+    Returns:
+    - numpy.ndarray: Warped or unwarped LPC coefficients per column. Shape: (order, obs).
+    """
     if task == "warp":
         s = -1
     elif task == "unwarp":
@@ -81,16 +218,11 @@ def arcoeff_warp(a, warp_factor, task="warp"):
     else:
         raise ValueError("task must be 'warp' or 'unwarp'")
 
-    a = np.insert(a, 0, 1)
-    b = np.zeros_like(a)
-    b[0] = 1
-
-    # Get poles
-    z, p, k = sig.tf2zpk(b, a)
-
-    # Pole conversion
-    p_new = (p + s * warp_factor) / (1 + s * warp_factor * p)
+    A = np.asarray(A)
+    a = np.empty((A.shape[0] + 1, A.shape[1]), dtype=np.result_type(A, float))
+    a[0] = 1
+    a[1:] = A
 
-    # Convert back to LPC coefficients
-    b, a = sig.zpk2tf(z, p_new, k)
-    return a[1:]  # Exclude the leading 1
+    # Poles map as p -> (p + s*warp) / (1 + s*warp*p)
+    b = _warp_matrix(A.shape[0], -s * warp_factor) @ a
+    return b[1:] / b[0]  # Normalise to a leading 1